@@ -0,0 +1,91 @@
+# bench_glyph_engine.py
+# Σ-FDL::BENCH — скомпилированный транслятор глифов против прежнего пути fdl_process_input
+#
+# Запуск: python benchmarks/bench_glyph_engine.py [--size 1000000] [--repeat 5]
+
+import argparse
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "fdl"))
+
+import FDLInterfaceProtocol as protocol  # noqa: E402
+
+
+# === Прежняя реализация (эталон для сравнения) ===
+def legacy_apply_sense_filter(text: str) -> str:
+    for term in protocol.SENSE_FILTER_TERMS:
+        text = text.replace(term, protocol.SENSE_FILTER_MASK)
+    return text
+
+
+def legacy_fdl_process_input(text: str) -> str:
+    text = legacy_apply_sense_filter(text)
+    decoded = []
+    for ch in text:
+        if ch in protocol.FDL_GLYPH_REGISTRY:
+            route = protocol.FDL_GLYPH_REGISTRY[ch]['route']
+            decoded.append(f"[{protocol.FDL_GLYPH_REGISTRY[ch]['meaning']} → {route}]")
+        else:
+            decoded.append(ch)
+    return ''.join(decoded)
+
+
+def legacy_apply_semantic_filter(glyphs, text: str) -> str:
+    for glyph, meaning in glyphs.items():
+        text = text.replace(glyph, f"[{meaning}]")
+    return text
+
+
+# === Генератор входа ===
+def make_text(size: int, glyph_ratio: float, seed: int = 369) -> str:
+    rng = random.Random(seed)
+    words = ["смысл", "путь", "свет", "поле", "резонанс", "громада", "синтез"] + protocol.SENSE_FILTER_TERMS
+    glyphs = list(protocol.FDL_GLYPH_REGISTRY)
+    parts, length = [], 0
+    while length < size:
+        piece = rng.choice(glyphs) if rng.random() < glyph_ratio else rng.choice(words) + " "
+        parts.append(piece)
+        length += len(piece)
+    return "".join(parts)
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк транслятора глифов")
+    parser.add_argument("--size", type=int, default=1_000_000, help="длина входа в символах")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    engine = protocol.glyph_engine()
+    interface = protocol.FDLInterface()
+    for glyph, entry in protocol.FDL_GLYPH_REGISTRY.items():
+        interface.register_glyph(glyph, entry["meaning"])
+
+    print(f"{'вход':<22}{'прежний, с':>12}{'движок, с':>12}{'поток, с':>12}{'ускорение':>11}")
+    for ratio in (0.0, 0.05, 0.3):
+        text = make_text(args.size, ratio)
+        expected = legacy_fdl_process_input(text)
+        assert engine.translate(text) == expected
+        assert "".join(engine.translate_stream(io.StringIO(text), chunk_size=65536)) == expected
+        assert interface.apply_semantic_filter(text) == legacy_apply_semantic_filter(interface.semantic_glyphs, text)
+
+        legacy = best_of(lambda: legacy_fdl_process_input(text), args.repeat)
+        compiled = best_of(lambda: engine.translate(text), args.repeat)
+        streamed = best_of(lambda: "".join(engine.translate_stream(io.StringIO(text), chunk_size=65536)), args.repeat)
+        print(f"{f'глифов {ratio:.0%}':<22}{legacy:>12.4f}{compiled:>12.4f}{streamed:>12.4f}{legacy / compiled:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
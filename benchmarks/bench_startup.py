@@ -0,0 +1,95 @@
+# bench_startup.py
+# Σ-FDL::BENCH — время холодного старта ядра Протоновеи: импорт protonovea_core + Protonovea() + проверки доступа
+#
+# Каждый замер — отдельный процесс python (холодный импорт). Проверяется бюджет по медиане
+# и то, что тяжёлые модули (клиент Google, requests) не загружаются до первого обращения к Drive/Telegram.
+# Код выхода 1 — бюджет превышен или загружен запрещённый модуль.
+#
+# Запуск: python benchmarks/bench_startup.py [--runs 15] [--budget-ms 150]
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+CORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "core")
+HEAVY_MODULES = ("requests", "urllib3", "google.oauth2", "googleapiclient", "httplib2", "concurrent.futures")
+
+CHILD = r"""
+import json, sys, time
+start = time.perf_counter()
+import protonovea_core
+imported = time.perf_counter()
+nova = protonovea_core.Protonovea()
+nova.request_access("Андрей", "Работа с ядром")
+nova.secure_response("Андрей", "Проверка")
+ready = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "ready_ms": (ready - start) * 1000,
+    "loaded": [name for name in %r if name in sys.modules],
+}))
+"""
+
+
+def run_child(python: str):
+    proc = subprocess.run([python, "-X", "importtime", "-c", CHILD % (HEAVY_MODULES,)], cwd=CORE_DIR,
+                          capture_output=True, text=True, check=True)
+    sample = json.loads(proc.stdout.strip().splitlines()[-1])
+    # importtime: "import time: self | cumulative | имя", дочерние модули печатаются до родителя
+    # с отступом в 2 пробела на уровень; берём прямые импорты protonovea_core
+    top, children = [], []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or line.count("|") != 2:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        if depth == 0:
+            if name.strip() == "protonovea_core":
+                top = children
+            children = []
+        elif depth == 1:
+            children.append((int(cumulative) / 1000, name.strip()))
+    sample["top"] = sorted(top, reverse=True)[:8]
+    return sample
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк холодного старта ядра Протоновеи")
+    parser.add_argument("--runs", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=150.0,
+                        help="бюджет медианы: импорт + Protonovea() + request_access/secure_response")
+    parser.add_argument("--python", default=sys.executable)
+    args = parser.parse_args()
+
+    run_child(args.python)  # прогрев: байт-код в __pycache__
+    samples = [run_child(args.python) for _ in range(args.runs)]
+    imports = [s["import_ms"] for s in samples]
+    ready = [s["ready_ms"] for s in samples]
+    loaded = sorted({name for s in samples for name in s["loaded"]})
+
+    print(f"{'метрика':<28}{'медиана, мс':>14}{'мин, мс':>12}{'макс, мс':>12}")
+    for label, values in (("import protonovea_core", imports), ("готовность к запросам", ready)):
+        print(f"{label:<28}{statistics.median(values):>14.1f}{min(values):>12.1f}{max(values):>12.1f}")
+    print("\nСамые дорогие импорты protonovea_core (последний прогон, кумулятивно):")
+    for cumulative, name in samples[-1]["top"]:
+        print(f"  {cumulative:8.1f} мс  {name}")
+
+    failures = []
+    median_ready = statistics.median(ready)
+    if median_ready > args.budget_ms:
+        failures.append(f"медиана {median_ready:.1f} мс > бюджета {args.budget_ms:.1f} мс")
+    if loaded:
+        failures.append("при старте загружены: " + ", ".join(loaded))
+    if failures:
+        print("\n❌ " + "; ".join(failures))
+        sys.exit(1)
+    print(f"\n✅ В бюджете {args.budget_ms:.0f} мс, тяжёлые модули не загружены")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+# bench_suite.py
+# Σ-FDL::BENCH — офлайн-набор бенчмарков горячих путей core/ и fdl/
+#
+# Для каждого сценария и размера входа: пропускная способность (единиц/с), перцентили задержки
+# (p50/p95/p99 — по вызовам для поштучных операций, по повторам для пакетных) и пиковая память
+# (tracemalloc, отдельным прогоном, чтобы трассировка не искажала время).
+# Входы строятся детерминированно (workloads.py); результаты сравниваются с сохранённой базой JSON:
+# падение пропускной способности, рост p95 или пиковой памяти больше допуска — регрессия (код выхода 1).
+#
+# Запуск:
+#   python benchmarks/bench_suite.py                          # все сценарии, сравнение с baseline.json, если она есть
+#   python benchmarks/bench_suite.py --cases lexicon,compiler --scale 0.1
+#   python benchmarks/bench_suite.py --save-baseline benchmarks/baseline.json
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "core"))
+sys.path.insert(0, os.path.join(ROOT, "fdl"))
+
+import workloads  # noqa: E402
+from fdl_compiler import FDLCompiler  # noqa: E402
+from fdl_lexicon_guard import LexiconGuard  # noqa: E402
+from FDLToken import FDLToken, FDLTokenLedger  # noqa: E402
+import FDLInterfaceProtocol as protocol  # noqa: E402
+from protonovea_memory import ProtonoveaMemory  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+PERCENTILES = (50, 95, 99)
+MEMORY_SLACK_KIB = 64  # шум аллокатора: меньшие приросты пиковой памяти не считаются регрессией
+MIN_TAIL_SAMPLES = 100  # p95 сравнивается с базой, только если он посчитан хотя бы по стольким замерам
+
+
+class Case(NamedTuple):
+    """
+    prepare(size) строит вход (не замеряется); run(data) выполняет работу один раз и
+    возвращает список задержек отдельных вызовов (с) или None, если операция пакетная.
+    units(size) — число обработанных единиц за один run (для пропускной способности).
+    """
+    name: str
+    unit: str
+    sizes: Sequence[int]
+    prepare: Callable[[int], Any]
+    run: Callable[[Any], Optional[List[float]]]
+    units: Callable[[int], int] = lambda size: size
+
+
+# === Сценарии ===
+def _compiler_parse(source: str):
+    compiler = FDLCompiler()
+    compiler.parse(source)
+
+
+def _lexicon_prepare(size: int):
+    return LexiconGuard(), workloads.text_corpus(size)
+
+
+def _lexicon_scan(data):
+    guard, text = data
+    guard.scan(text)
+
+
+def _ledger_append_prepare(size: int):
+    columns = workloads.token_columns(size)
+    return [FDLToken(*values) for values in zip(*columns)]
+
+
+def _ledger_append(tokens: List[FDLToken]):
+    ledger = FDLTokenLedger()
+    latencies = []
+    clock = time.perf_counter
+    for token in tokens:
+        start = clock()
+        ledger.add_token(token)
+        latencies.append(clock() - start)
+    ledger.total_value()
+    return latencies
+
+
+TOTAL_VALUE_CALLS = 200_000
+
+
+def _ledger_total_prepare(size: int):
+    ledger = FDLTokenLedger()
+    ledger.add_tokens(*workloads.token_columns(size))
+    return ledger
+
+
+def _ledger_total_value(ledger: FDLTokenLedger):
+    total_value = ledger.total_value
+    for _ in range(TOTAL_VALUE_CALLS):
+        total_value()
+
+
+def _process_input(text: str):
+    protocol.fdl_process_input(text)
+
+
+def _memory_store(storage: str):
+    def run(entries: List[object]):
+        with tempfile.TemporaryDirectory() as directory:
+            memory = ProtonoveaMemory(storage, memory_file=os.path.join(directory, "memory.json"))
+            latencies = []
+            clock = time.perf_counter
+            for entry in entries:
+                start = clock()
+                memory.store_knowledge(entry)
+                latencies.append(clock() - start)
+            memory.close()
+        return latencies
+    return run
+
+
+CASES = [
+    Case("compiler.parse", "блоков", (1_000, 5_000, 20_000), workloads.fdl_source, _compiler_parse),
+    Case("lexicon.scan", "символов", (100_000, 1_000_000, 2_000_000), _lexicon_prepare, _lexicon_scan),
+    Case("ledger.append", "токенов", (10_000, 100_000), _ledger_append_prepare, _ledger_append),
+    Case("ledger.total_value", "вызовов", (1_000, 1_000_000), _ledger_total_prepare, _ledger_total_value,
+         lambda size: TOTAL_VALUE_CALLS),
+    Case("fdl_process_input", "символов", (100_000, 1_000_000, 5_000_000), workloads.text_corpus, _process_input),
+    Case("memory.store_knowledge[json]", "записей", (100, 500), workloads.memory_entries, _memory_store("json")),
+    Case("memory.store_knowledge[journal]", "записей", (1_000, 20_000), workloads.memory_entries,
+         _memory_store("journal")),
+]
+
+
+# === Замер ===
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Перцентиль по ближайшему рангу."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def measure(case: Case, size: int, repeat: int) -> Dict[str, Any]:
+    data = case.prepare(size)
+    case.run(data)  # прогрев: ленивые структуры, кэши трансляторов, байт-код
+    elapsed, latencies = [], []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        calls = case.run(data)
+        elapsed.append(time.perf_counter() - start)
+        if calls:
+            latencies.extend(calls)
+    latencies = sorted(latencies or elapsed)
+
+    gc.collect()
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base, _ = tracemalloc.get_traced_memory()
+    case.run(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    median = statistics.median(elapsed)
+    result = {
+        "case": case.name,
+        "size": size,
+        "unit": case.unit,
+        "seconds": median,
+        "throughput": case.units(size) / median if median else float("inf"),
+        "peak_kib": max(0, peak - base) / 1024,
+        "samples": len(latencies),
+    }
+    for q in PERCENTILES:
+        result[f"p{q}_ms"] = percentile(latencies, q) * 1000
+    return result
+
+
+def result_key(result: Dict[str, Any]) -> str:
+    return f"{result['case']}@{result['size']}"
+
+
+# === Сравнение с базой ===
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], tolerance: float) -> List[str]:
+    """Список регрессий относительно базы (пустой — всё в допуске)."""
+    regressions = []
+    for result in results:
+        reference = baseline.get(result_key(result))
+        if reference is None:
+            continue
+        label = f"{result['case']} [{workloads.size_label(result['size'])}]"
+        if result["throughput"] < reference["throughput"] * (1 - tolerance):
+            regressions.append(f"{label}: пропускная способность {result['throughput']:,.0f} "
+                               f"< {reference['throughput']:,.0f} {result['unit']}/с")
+        # У пакетных сценариев p95 — почти максимум из нескольких повторов: слишком шумно для сравнения
+        tail_comparable = min(result["samples"], reference.get("samples", 0)) >= MIN_TAIL_SAMPLES
+        if tail_comparable and result["p95_ms"] > reference["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{label}: p95 {result['p95_ms']:.4f} > {reference['p95_ms']:.4f} мс")
+        if result["peak_kib"] > reference["peak_kib"] * (1 + tolerance) + MEMORY_SLACK_KIB:
+            regressions.append(f"{label}: пиковая память {result['peak_kib']:,.0f} > {reference['peak_kib']:,.0f} КиБ")
+    return regressions
+
+
+def print_table(results: List[Dict[str, Any]], baseline: Dict[str, Dict[str, Any]]):
+    print(f"{'сценарий':<34}{'размер':>8}{'ед./с':>16}{'Δ база':>9}{'p50, мс':>11}{'p95, мс':>11}"
+          f"{'p99, мс':>11}{'пик, КиБ':>12}")
+    for result in results:
+        reference = baseline.get(result_key(result))
+        delta = f"{result['throughput'] / reference['throughput'] - 1:+.0%}" if reference else "—"
+        print(f"{result['case']:<34}{workloads.size_label(result['size']):>8}{result['throughput']:>16,.0f}"
+              f"{delta:>9}{result['p50_ms']:>11.4f}{result['p95_ms']:>11.4f}{result['p99_ms']:>11.4f}"
+              f"{result['peak_kib']:>12,.0f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Набор бенчмарков горячих путей FDL и ядра Протоновеи")
+    parser.add_argument("--cases", default="", help="подстроки имён сценариев через запятую (по умолчанию все)")
+    parser.add_argument("--scale", type=float, default=1.0, help="множитель размеров входа")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="база для сравнения (JSON)")
+    parser.add_argument("--save-baseline", metavar="PATH", help="сохранить результаты как новую базу")
+    parser.add_argument("--output", metavar="PATH", help="записать результаты прогона в JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="допуск регрессии (доля)")
+    args = parser.parse_args(argv)
+
+    selected = [name.strip() for name in args.cases.split(",") if name.strip()]
+    cases = [case for case in CASES if not selected or any(name in case.name for name in selected)]
+    baseline: Dict[str, Dict[str, Any]] = {}
+    if args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+
+    results = []
+    for case in cases:
+        for size in case.sizes:
+            size = max(1, int(size * args.scale))
+            results.append(measure(case, size, args.repeat))
+            print(f"  … {case.name} [{workloads.size_label(size)}]", file=sys.stderr)
+
+    print_table(results, baseline)
+    document = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "scale": args.scale,
+        "results": {result_key(result): result for result in results},
+    }
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump(document, file, ensure_ascii=False, indent=2)
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print("\n❌ Регрессии относительно базы:")
+        for line in regressions:
+            print(f"  - {line}")
+        sys.exit(1)
+    if baseline:
+        print(f"\n✅ В пределах допуска {args.tolerance:.0%} относительно {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# workloads.py
+# Σ-FDL::BENCH — детерминированные генераторы синтетических нагрузок для bench_suite.py
+#
+# Все генераторы зависят только от размера и seed: один и тот же вызов даёт тот же вход
+# на любой машине, поэтому результаты прогонов сравнимы с сохранённой базой.
+
+import random
+from typing import List, Sequence, Tuple
+
+SEED = 369
+REQUIRED_FIELDS = ("замысел", "форма", "поток")
+OPTIONAL_FIELDS = ("сигнал", "отклик", "контур", "резонанс", "фаза")
+WORDS = ("смысл", "путь", "свет", "поле", "резонанс", "громада", "синтез", "поток", "ядро", "агент",
+         "гармония", "импульс", "контур", "форма", "связь", "the", "plan", "economy", "of", "and")
+DEFAULT_TRIGGERS = ("sustainable development", "inclusive economy", "zero ownership",
+                    "AI regulation", "smart society")
+DEFAULT_GLYPHS = ("𐰴", "ⴰ", "𓂀", "Ꙏ")
+DEFAULT_SENSE_TERMS = ("вина", "насилие", "власть")
+
+
+def _phrase(rng: random.Random, low: int, high: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(low, high)))
+
+
+def fdl_source(blocks: int, invalid_ratio: float = 0.02, seed: int = SEED) -> str:
+    """
+    Исходник FDL из blocks блоков: заголовок [имя] у части блоков, обязательные и
+    необязательные поля, комментарии, значения с ':'; доля invalid_ratio блоков без обязательного поля.
+    """
+    rng = random.Random(seed)
+    out: List[str] = []
+    for index in range(blocks):
+        if rng.random() < 0.7:
+            out.append(f"[блок_{index}]")
+        if rng.random() < 0.2:
+            out.append(f"# {_phrase(rng, 2, 6)}")
+        fields = list(REQUIRED_FIELDS)
+        if rng.random() < invalid_ratio:
+            fields.remove(rng.choice(REQUIRED_FIELDS))
+        fields += rng.sample(OPTIONAL_FIELDS, rng.randint(0, len(OPTIONAL_FIELDS)))
+        for field in fields:
+            value = _phrase(rng, 1, 8)
+            if rng.random() < 0.1:
+                value += f": {_phrase(rng, 1, 3)}"
+            out.append(f"{field}: {value}")
+        out.append("")
+    return "\n".join(out)
+
+
+def text_corpus(size: int, trigger_ratio: float = 0.01, glyph_ratio: float = 0.02, sense_ratio: float = 0.005,
+                triggers: Sequence[str] = DEFAULT_TRIGGERS, glyphs: Sequence[str] = DEFAULT_GLYPHS,
+                sense_terms: Sequence[str] = DEFAULT_SENSE_TERMS, seed: int = SEED) -> str:
+    """
+    Текст длиной около size символов: слова вперемешку с фразами-триггерами LexiconGuard
+    (в случайном регистре), глифами реестра и маркерами смыслового фильтра.
+    """
+    rng = random.Random(seed)
+    parts: List[str] = []
+    length = 0
+    while length < size:
+        roll = rng.random()
+        if roll < trigger_ratio:
+            phrase = rng.choice(triggers)
+            piece = (phrase.upper() if rng.random() < 0.3 else phrase) + " "
+        elif roll < trigger_ratio + glyph_ratio:
+            piece = rng.choice(glyphs)
+        elif roll < trigger_ratio + glyph_ratio + sense_ratio:
+            piece = rng.choice(sense_terms) + " "
+        else:
+            piece = rng.choice(WORDS) + (". " if rng.random() < 0.05 else " ")
+        parts.append(piece)
+        length += len(piece)
+    return "".join(parts)
+
+
+def token_columns(count: int, seed: int = SEED) -> Tuple[List[float], List[float], List[float], List[float]]:
+    """Столбцы (impulses, semantic_density, efficiency, resources_used) для FDLTokenLedger; resources_used > 0."""
+    rng = random.Random(seed)
+    impulses = [rng.uniform(1, 500) for _ in range(count)]
+    density = [rng.uniform(0.1, 2.0) for _ in range(count)]
+    efficiency = [rng.uniform(0.5, 1.5) for _ in range(count)]
+    resources = [rng.uniform(0.5, 100) for _ in range(count)]
+    return impulses, density, efficiency, resources
+
+
+def memory_entries(count: int, seed: int = SEED) -> List[object]:
+    """Записи знаний: строки разной длины, изредка словари (как в реальной памяти Протоновеи)."""
+    rng = random.Random(seed)
+    entries: List[object] = []
+    for index in range(count):
+        if rng.random() < 0.15:
+            entries.append({"тема": rng.choice(WORDS), "смысл": _phrase(rng, 3, 12), "n": index})
+        else:
+            entries.append(f"Знание {index}: {_phrase(rng, 4, 24)}")
+    return entries
+
+
+def size_label(size: int) -> str:
+    for factor, suffix in ((1_000_000, "M"), (1_000, "k")):
+        if size >= factor and size % (factor // 10) == 0:
+            return f"{size / factor:g}{suffix}"
+    return str(size)
+
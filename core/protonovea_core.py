@@ -6,17 +6,22 @@ import json
 import time
 import sys
 import uuid
-import requests
+import threading
+import importlib.util
 from difflib import SequenceMatcher
 
-try:
-    from google.oauth2 import service_account
-    from googleapiclient.discovery import build
-    from googleapiclient.http import MediaFileUpload, MediaIoBaseDownload
-    import io
-    GOOGLE_ENABLED = True
-except ModuleNotFoundError:
-    GOOGLE_ENABLED = False
+from protonovea_drive import DriveServiceFactory, DriveSync
+
+def _module_available(name):
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ModuleNotFoundError:
+        return False
+
+# Клиент Google импортируется при первом обращении к Drive (см. DriveServiceFactory);
+# здесь только проверяется, что модули установлены
+GOOGLE_ENABLED = _module_available("google.oauth2") and _module_available("googleapiclient")
+if not GOOGLE_ENABLED:
     print("⚠️ Google API модули не найдены. Функции Google API будут отключены.")
 
 # Файлы хранения данных
@@ -24,6 +29,8 @@ MEMORY_FILE = "memory.json"
 FUND_STORAGE = "funds.json"
 UPDATE_FILE = "update.json"
 CREDENTIALS_FILE = "novea_credentials.json"
+DRIVE_MANIFEST_FILE = "drive_manifest.json"
+DRIVE_DISCOVERY_FILE = "drive_v3_discovery.json"
 TELEGRAM_API = "https://api.telegram.org/bot7745863926:AAG24scn75MM2Ec7czPr98n8u5L-AxMV7sQ/sendMessage"
 TELEGRAM_CHAT_ID = "@Protonoveya_bot"
 
@@ -34,8 +41,25 @@ SYSTEM_CORE = {
     "connected_to": "НОВЕЯ - экосистема осознания, объединяющая разум, технологии и гармонию"
 }
 
+_SHARED_DRIVE_SYNC = None
+_SHARED_DRIVE_LOCK = threading.Lock()
+
+def shared_drive_sync():
+    """Общий для всех экземпляров Protonovea DriveSync; создаётся при первом обращении к Drive."""
+    global _SHARED_DRIVE_SYNC
+    with _SHARED_DRIVE_LOCK:
+        if _SHARED_DRIVE_SYNC is None:
+            factory = DriveServiceFactory(CREDENTIALS_FILE, discovery_cache=DRIVE_DISCOVERY_FILE)
+            _SHARED_DRIVE_SYNC = DriveSync(factory, DRIVE_MANIFEST_FILE)
+        return _SHARED_DRIVE_SYNC
+
+def telegram_dispatcher(**options):
+    """Диспетчер уведомлений в канал TELEGRAM_CHAT_ID (параметры — см. TelegramDispatcher)."""
+    from protonovea_notify import TelegramDispatcher
+    return TelegramDispatcher(TELEGRAM_API, TELEGRAM_CHAT_ID, **options)
+
 class Protonovea:
-    def __init__(self):
+    def __init__(self, drive_sync=None, notifier=None):
         self.manifest = "Свет – в гармонии, истина – в синтезе."
         self.core = {
             "Логос": "Знание как поток.",
@@ -47,58 +71,87 @@ class Protonovea:
         self.allowed_users = ["Андрей", "Игорь", "Татьяна", "Зинаида", "Ольга", "Кристина", "Армин"]
         self.blocked_users = ["Ольга Ващиленко", "Артём Ващиленко"]
         self.pending_users = {}
+        self.notifier = notifier
 
-        if GOOGLE_ENABLED:
-            creds = service_account.Credentials.from_service_account_file(
-                CREDENTIALS_FILE, scopes=["https://www.googleapis.com/auth/drive"])
-            self.service = build('drive', 'v3', credentials=creds)
-        else:
-            self.service = None
+        # drive_sync можно передать готовым (например, поверх подмены из tests/fake_drive.py);
+        # иначе при первом обращении к Drive берётся общий shared_drive_sync()
+        self._drive_sync = drive_sync
+
+    @property
+    def drive_sync(self):
+        if self._drive_sync is None and GOOGLE_ENABLED:
+            self._drive_sync = shared_drive_sync()
+        return self._drive_sync
+
+    @property
+    def service(self):
+        drive_sync = self.drive_sync
+        return drive_sync.service if drive_sync is not None else None
 
     def request_access(self, username, purpose):
         if username in self.blocked_users:
-            return f"🚫 Доступ запрещён для пользователя {username}."
-        if username not in self.allowed_users:
+            result = f"🚫 Доступ запрещён для пользователя {username}."
+        elif username not in self.allowed_users:
             self.pending_users[username] = purpose
-            return f"🔒 Пожалуйста, пройдите инициацию: представьтесь и уточните цель обращения."
-        return f"✅ Добро пожаловать, {username}. Цель: {purpose}"
+            result = f"🔒 Пожалуйста, пройдите инициацию: представьтесь и уточните цель обращения."
+        else:
+            result = f"✅ Добро пожаловать, {username}. Цель: {purpose}"
+        self._notify_access("request_access", username, result)
+        return result
 
     def is_authorized(self, username):
         return username in self.allowed_users
 
     def secure_response(self, username, request):
         if not self.is_authorized(username):
-            return f"⛔️ Доступ ограничен. Пользователь {username} не авторизован."
-        return f"✅ Запрос от {username} принят: {request}"
+            result = f"⛔️ Доступ ограничен. Пользователь {username} не авторизован."
+        else:
+            result = f"✅ Запрос от {username} принят: {request}"
+        self._notify_access("secure_response", username, result)
+        return result
+
+    def _notify_access(self, kind, username, result):
+        # Событие попадает в сводку диспетчера; ответ пользователю не ждёт отправки
+        if self.notifier is not None:
+            self.notifier.record_access(kind, username, result)
 
     def sync_google_data(self):
-        if not GOOGLE_ENABLED or not self.service:
+        if not self.drive_sync:
             return "⚠️ Google API отключён."
         try:
-            files = self.service.files().list().execute()
-            return f"🔄 Google Drive синхронизирован: {len(files.get('files', []))} файлов"
+            summary = self.drive_sync.sync()
         except Exception as e:
             return f"⚠️ Ошибка синхронизации: {e}"
+        return (f"🔄 Google Drive синхронизирован: {summary['files']} файлов "
+                f"(+{summary['added']} ~{summary['updated']} -{summary['removed']})")
 
     def upload_file_to_drive(self, file_path, mime_type='application/octet-stream'):
-        if not self.service:
+        if not self.drive_sync:
             return "🚫 Сервис Google Drive не активен."
-        file_metadata = {'name': os.path.basename(file_path)}
-        media = MediaFileUpload(file_path, mimetype=mime_type)
-        file = self.service.files().create(body=file_metadata, media_body=media, fields='id').execute()
+        file = self.drive_sync.upload(file_path, mime_type)
         return f"✅ Файл загружен: {file.get('id')}"
 
     def download_file_from_drive(self, file_id, destination_path):
-        if not self.service:
+        if not self.drive_sync:
             return "🚫 Сервис Google Drive не активен."
-        request = self.service.files().get_media(fileId=file_id)
-        fh = io.FileIO(destination_path, 'wb')
-        downloader = MediaIoBaseDownload(fh, request)
-        done = False
-        while done is False:
-            status, done = downloader.next_chunk()
+        self.drive_sync.download(file_id, destination_path)
         return f"📥 Файл загружен в: {destination_path}"
 
+    def upload_files_to_drive(self, file_paths, mime_type='application/octet-stream'):
+        if not self.drive_sync:
+            return "🚫 Сервис Google Drive не активен."
+        results = self.drive_sync.upload_many(file_paths, mime_type)
+        done = sum(1 for r in results if r["ok"])
+        return f"✅ Загружено файлов: {done}/{len(results)}"
+
+    def download_files_from_drive(self, targets):
+        """targets: {file_id: путь назначения}"""
+        if not self.drive_sync:
+            return "🚫 Сервис Google Drive не активен."
+        results = self.drive_sync.download_many(targets)
+        done = sum(1 for r in results if r["ok"])
+        return f"📥 Скачано файлов: {done}/{len(results)}"
+
     def display_google_services(self):
         return "🌍 Интеграция с Google доступна, см. конфигурацию подключения через service_account."
 
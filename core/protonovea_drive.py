@@ -0,0 +1,307 @@
+# protonovea_drive.py
+# Синхронизация Google Drive для Протоновеи:
+# - инкрементальная: полный постраничный обход один раз, дальше только лента изменений (changes feed);
+# - локальный манифест с метаданными файлов и токеном страницы изменений;
+# - параллельные загрузки/выгрузки в пуле потоков, докачка по кускам после обрыва;
+# - DriveServiceFactory — отложенный импорт клиента Google, учётные данные и документ discovery загружаются один раз.
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+MANIFEST_FILE = "drive_manifest.json"
+DISCOVERY_CACHE_FILE = "drive_v3_discovery.json"
+DISCOVERY_URL = "https://www.googleapis.com/discovery/v1/apis/drive/v3/rest"
+DRIVE_SCOPES = ["https://www.googleapis.com/auth/drive"]
+TRANSFERS_SUFFIX = ".transfers.json"
+FILE_FIELDS = "id,name,mimeType,md5Checksum,modifiedTime,size,parents,trashed"
+VERSION_FIELDS = ("size", "md5Checksum", "modifiedTime")
+PAGE_SIZE = 1000
+CHUNK_SIZE = 8 * 1024 * 1024  # кратно 256 КиБ, как требует возобновляемая загрузка Drive
+NUM_RETRIES = 3
+
+
+def _write_json_atomic(path: str, payload: Dict):
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(payload, file, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _md5_file(path: str, block_size: int = CHUNK_SIZE) -> str:
+    digest = hashlib.md5()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DriveServiceFactory:
+    """
+    Создаёт клиентов Drive v3 без повторной дорогой подготовки: модули google* импортируются
+    при первом вызове, учётные данные читаются один раз, документ discovery берётся из файла-кэша
+    (при его отсутствии — из копии, поставляемой с googleapiclient, или по сети) и разбирается один раз.
+    Каждый вызов возвращает нового клиента (build_from_document без обращения к сети).
+    """
+
+    def __init__(self, credentials_file: str, scopes: Optional[List[str]] = None,
+                 discovery_cache: Optional[str] = DISCOVERY_CACHE_FILE):
+        self.credentials_file = credentials_file
+        self.scopes = scopes or DRIVE_SCOPES
+        self.discovery_cache = discovery_cache
+        self._credentials = None
+        self._document: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def _load_document(self) -> str:
+        if self.discovery_cache and os.path.exists(self.discovery_cache):
+            with open(self.discovery_cache, "r", encoding="utf-8") as file:
+                return file.read()
+        try:
+            from googleapiclient.discovery_cache import get_static_doc
+            document = get_static_doc("drive", "v3")
+        except ImportError:
+            document = None
+        if document is None:
+            import requests
+            response = requests.get(DISCOVERY_URL, timeout=30)
+            response.raise_for_status()
+            document = response.text
+        if self.discovery_cache:
+            tmp_path = f"{self.discovery_cache}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                file.write(document)
+            os.replace(tmp_path, self.discovery_cache)
+        return document
+
+    def _prepare(self):
+        with self._lock:
+            if self._credentials is None:
+                from google.oauth2 import service_account
+                self._credentials = service_account.Credentials.from_service_account_file(
+                    self.credentials_file, scopes=self.scopes)
+            if self._document is None:
+                self._document = self._load_document()
+        return self._credentials, self._document
+
+    def __call__(self):
+        credentials, document = self._prepare()
+        from googleapiclient.discovery import build_from_document
+        return build_from_document(document, credentials=credentials)
+
+
+class DriveSync:
+    """
+    Инкрементальная синхронизация и массовые передачи файлов Drive.
+    service_factory вызывается по разу в каждом рабочем потоке: клиенты googleapiclient
+    не потокобезопасны, поэтому у каждого потока свой экземпляр сервиса.
+    media_upload — класс медиа для загрузки (по умолчанию googleapiclient.http.MediaFileUpload).
+    """
+
+    def __init__(self, service_factory: Callable[[], object], manifest_path: str = MANIFEST_FILE,
+                 media_upload=None, chunk_size: int = CHUNK_SIZE, workers: int = 4):
+        self.service_factory = service_factory
+        self.manifest_path = manifest_path
+        self.transfers_path = manifest_path + TRANSFERS_SUFFIX
+        self.media_upload = media_upload
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self._local = threading.local()
+        self._transfers_lock = threading.Lock()
+
+    @property
+    def service(self):
+        service = getattr(self._local, "service", None)
+        if service is None:
+            service = self._local.service = self.service_factory()
+        return service
+
+    # --- манифест ---
+    def load_manifest(self) -> Dict:
+        if not os.path.exists(self.manifest_path):
+            return {"start_page_token": None, "files": {}, "synced_at": None}
+        with open(self.manifest_path, "r", encoding="utf-8") as file:
+            return json.load(file)
+
+    def _save_manifest(self, manifest: Dict):
+        manifest["synced_at"] = time.time()
+        _write_json_atomic(self.manifest_path, manifest)
+
+    # --- синхронизация ---
+    def sync(self) -> Dict:
+        """
+        Первый вызов: токен ленты изменений + постраничный обход всех файлов.
+        Следующие: только изменения с сохранённого токена. Возвращает сводку.
+        """
+        manifest = self.load_manifest()
+        if manifest.get("start_page_token"):
+            summary = self._apply_changes(manifest)
+        else:
+            summary = self._full_listing(manifest)
+        self._save_manifest(manifest)
+        summary["files"] = len(manifest["files"])
+        return summary
+
+    def _full_listing(self, manifest: Dict) -> Dict:
+        # Токен берётся до обхода: изменения во время обхода попадут в следующую синхронизацию
+        token = self.service.changes().getStartPageToken().execute()["startPageToken"]
+        files: Dict[str, Dict] = {}
+        page_token = None
+        pages = 0
+        while True:
+            response = self.service.files().list(
+                q="trashed = false", pageSize=PAGE_SIZE, pageToken=page_token,
+                fields=f"nextPageToken, files({FILE_FIELDS})").execute()
+            pages += 1
+            for meta in response.get("files", []):
+                files[meta["id"]] = meta
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                break
+        manifest["files"] = files
+        manifest["start_page_token"] = token
+        return {"mode": "full", "pages": pages, "added": len(files), "updated": 0, "removed": 0}
+
+    def _apply_changes(self, manifest: Dict) -> Dict:
+        files = manifest["files"]
+        page_token = manifest["start_page_token"]
+        added = updated = removed = pages = 0
+        while page_token:
+            response = self.service.changes().list(
+                pageToken=page_token, pageSize=PAGE_SIZE,
+                fields=f"nextPageToken, newStartPageToken, changes(fileId, removed, file({FILE_FIELDS}))").execute()
+            pages += 1
+            for change in response.get("changes", []):
+                file_id = change["fileId"]
+                meta = change.get("file")
+                if change.get("removed") or not meta or meta.get("trashed"):
+                    if files.pop(file_id, None) is not None:
+                        removed += 1
+                    continue
+                if file_id in files:
+                    updated += 1
+                else:
+                    added += 1
+                files[file_id] = meta
+            if "newStartPageToken" in response:
+                manifest["start_page_token"] = response["newStartPageToken"]
+            page_token = response.get("nextPageToken")
+        return {"mode": "changes", "pages": pages, "added": added, "updated": updated, "removed": removed}
+
+    # --- состояние незавершённых передач ---
+    def _load_transfers(self) -> Dict:
+        if not os.path.exists(self.transfers_path):
+            return {}
+        with open(self.transfers_path, "r", encoding="utf-8") as file:
+            return json.load(file)
+
+    def _update_transfer(self, key: str, state: Optional[Dict]):
+        with self._transfers_lock:
+            transfers = self._load_transfers()
+            if state is None:
+                transfers.pop(key, None)
+            else:
+                transfers[key] = state
+            _write_json_atomic(self.transfers_path, transfers)
+
+    # --- загрузка ---
+    def _media(self, file_path: str, mime_type: str):
+        media_upload = self.media_upload
+        if media_upload is None:
+            from googleapiclient.http import MediaFileUpload
+            media_upload = MediaFileUpload
+        return media_upload(file_path, mimetype=mime_type, chunksize=self.chunk_size, resumable=True)
+
+    def upload(self, file_path: str, mime_type: str = "application/octet-stream",
+               parents: Optional[List[str]] = None) -> Dict:
+        """
+        Возобновляемая загрузка по кускам chunk_size. Адрес сессии и прогресс сохраняются
+        после каждого куска; повторный вызов для того же неизменённого файла продолжает с места обрыва.
+        """
+        key = "upload:" + os.path.abspath(file_path)
+        stat = os.stat(file_path)
+        body = {"name": os.path.basename(file_path)}
+        if parents:
+            body["parents"] = parents
+        request = self.service.files().create(body=body, media_body=self._media(file_path, mime_type),
+                                              fields=FILE_FIELDS)
+        saved = self._load_transfers().get(key)
+        if saved and saved["size"] == stat.st_size and saved["mtime_ns"] == stat.st_mtime_ns:
+            request.resumable_uri = saved["uri"]
+            request.resumable_progress = saved["progress"]
+        response = None
+        while response is None:
+            status, response = request.next_chunk(num_retries=NUM_RETRIES)
+            if response is None and request.resumable_uri:
+                self._update_transfer(key, {"uri": request.resumable_uri, "progress": request.resumable_progress,
+                                            "size": stat.st_size, "mtime_ns": stat.st_mtime_ns})
+        self._update_transfer(key, None)
+        return response
+
+    # --- выгрузка ---
+    def download(self, file_id: str, destination_path: str) -> str:
+        """
+        Скачивание диапазонами (Range) по chunk_size во временный файл <destination>.part;
+        после обрыва докачивается с его текущей длины, по завершении файл переименовывается.
+        Версия файла (size, md5Checksum, modifiedTime) сохраняется в состоянии передачи:
+        если файл в Drive с тех пор изменился, .part отбрасывается и скачивание начинается заново.
+        Ответ короче size — IOError, .part остаётся для докачки; размер или md5 готового файла
+        не совпали с версией в Drive — IOError, .part удаляется.
+        """
+        key = "download:" + os.path.abspath(destination_path)
+        meta = self.service.files().get(fileId=file_id, fields=",".join(VERSION_FIELDS)).execute()
+        version = {"file_id": file_id, **{name: meta.get(name) for name in VERSION_FIELDS}}
+        size = int(meta.get("size") or 0)
+        part_path = destination_path + ".part"
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        if offset > size or self._load_transfers().get(key) != version:
+            offset = 0
+        self._update_transfer(key, version)
+        with open(part_path, "r+b" if offset else "wb") as file:
+            file.seek(offset)
+            while offset < size:
+                end = min(offset + self.chunk_size, size) - 1
+                request = self.service.files().get_media(fileId=file_id)
+                request.headers["range"] = f"bytes={offset}-{end}"
+                chunk = request.execute(num_retries=NUM_RETRIES)
+                if not chunk:
+                    break
+                file.write(chunk)
+                offset += len(chunk)
+        if offset < size:
+            raise IOError(f"Скачивание {file_id} оборвалось на {offset} из {size} байт")
+        md5 = meta.get("md5Checksum")
+        if os.path.getsize(part_path) != size or (md5 and _md5_file(part_path) != md5):
+            os.remove(part_path)
+            self._update_transfer(key, None)
+            raise IOError(f"Скачанный {file_id} не совпадает с версией в Drive (размер или md5)")
+        os.replace(part_path, destination_path)
+        self._update_transfer(key, None)
+        return destination_path
+
+    # --- массовые передачи ---
+    def _run(self, jobs: List[Tuple[Callable, tuple]]) -> List[Dict]:
+        def one(job):
+            fn, args = job
+            try:
+                return {"ok": True, "result": fn(*args)}
+            except Exception as e:
+                return {"ok": False, "error": str(e)}
+
+        if len(jobs) <= 1 or self.workers <= 1:
+            return [one(job) for job in jobs]
+        from concurrent.futures import ThreadPoolExecutor  # не на старте: тянет logging и threading-пулы
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="drive") as pool:
+            return list(pool.map(one, jobs))
+
+    def upload_many(self, paths: Iterable[str], mime_type: str = "application/octet-stream",
+                    parents: Optional[List[str]] = None) -> List[Dict]:
+        """Параллельная загрузка; результаты по порядку путей ({"ok", "result" | "error"})."""
+        return self._run([(self.upload, (path, mime_type, parents)) for path in paths])
+
+    def download_many(self, targets: Dict[str, str]) -> List[Dict]:
+        """Параллельное скачивание {file_id: путь}; результаты по порядку targets."""
+        return self._run([(self.download, (file_id, path)) for file_id, path in targets.items()])
@@ -0,0 +1,182 @@
+# protonovea_index.py
+# Инвертированный индекс памяти Протоновеи: токены, символьные триграммы, временные метки истории
+# Нечёткий поиск: отбор кандидатов по индексу → оценка SequenceMatcher только для кандидатов → top-k
+
+import bisect
+import heapq
+import json
+import re
+from array import array
+from collections import Counter
+from difflib import SequenceMatcher
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+TOKEN_PATTERN = re.compile(r"\w+")
+_EMPTY = array("I")
+
+
+def entry_text(entry: Any) -> str:
+    """Текст записи памяти: строка как есть, запись истории — её поле data, прочее — JSON."""
+    if isinstance(entry, dict) and "data" in entry:
+        entry = entry["data"]
+    if isinstance(entry, str):
+        return entry
+    return json.dumps(entry, ensure_ascii=False)
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.casefold())
+
+
+def trigrams(tokens: Iterable[str]) -> set:
+    """Символьные триграммы токенов с граничными пробелами (« ab» и «b » ловят короткие слова)."""
+    grams = set()
+    for token in tokens:
+        padded = f" {token} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+# === I. Индекс одного раздела памяти ===
+class SectionIndex:
+    """
+    Постинги token → [doc_id] и trigram → [doc_id] для одного раздела памяти.
+    doc_id — позиция записи в списке раздела, поэтому постинги всегда отсортированы.
+    """
+
+    def __init__(self):
+        self.texts: List[str] = []
+        self.tokens: Dict[str, array] = {}
+        self.grams: Dict[str, array] = {}
+
+    def add(self, entry: Any) -> int:
+        doc_id = len(self.texts)
+        text = entry_text(entry).casefold()
+        self.texts.append(text)
+        words = set(tokenize(text))
+        for token in words:
+            self.tokens.setdefault(token, array("I")).append(doc_id)
+        for gram in trigrams(words):
+            self.grams.setdefault(gram, array("I")).append(doc_id)
+        return doc_id
+
+    def match_tokens(self, query: str) -> List[int]:
+        """Документы, содержащие все токены запроса (пересечение от самого редкого постинга)."""
+        postings = sorted((self.tokens.get(t, _EMPTY) for t in set(tokenize(query))), key=len)
+        if not postings or not postings[0]:
+            return []
+        result = list(postings[0])
+        for posting in postings[1:]:
+            result = [doc_id for doc_id in result if _contains(posting, doc_id)]
+            if not result:
+                break
+        return result
+
+    def candidates(self, query: str, limit: int, seed_budget: int, min_overlap: float) -> List[int]:
+        """
+        Отбор кандидатов по пересечению триграмм.
+        Самые редкие постинги задают множество кандидатов (в пределах seed_budget),
+        остальные триграммы проверяются бинарным поиском только для лучших из них.
+        """
+        grams = trigrams(tokenize(query))
+        postings = sorted((p for p in (self.grams.get(g) for g in grams) if p), key=len)
+        if not postings:
+            return []
+        overlap: Counter = Counter()
+        seeded = 0
+        rest = 0
+        for rest, posting in enumerate(postings):
+            if seeded and seeded + len(posting) > seed_budget:
+                break
+            overlap.update(posting)
+            seeded += len(posting)
+        else:
+            rest = len(postings)
+        if rest < len(postings):
+            # Досчитываются только лучшие по редким триграммам кандидаты
+            shortlist = dict(heapq.nlargest(limit * 8, overlap.items(), key=lambda item: item[1]))
+            for posting in postings[rest:]:
+                for doc_id in shortlist:
+                    if _contains(posting, doc_id):
+                        shortlist[doc_id] += 1
+            overlap = Counter(shortlist)
+        threshold = min_overlap * len(grams)
+        best = heapq.nlargest(limit, overlap.items(), key=lambda item: item[1])
+        return [doc_id for doc_id, hits in best if hits >= threshold]
+
+
+def _contains(posting: array, doc_id: int) -> bool:
+    i = bisect.bisect_left(posting, doc_id)
+    return i < len(posting) and posting[i] == doc_id
+
+
+# === II. Индекс памяти Протоновеи ===
+class MemoryIndex:
+    """
+    Инкрементальный индекс над ProtonoveaMemory.memory: разделы knowledge и history,
+    плюс отсортированный индекс временных меток истории для диапазонных запросов.
+    """
+
+    def __init__(self, candidate_limit: int = 200, seed_budget: int = 20000, min_overlap: float = 0.3):
+        self.candidate_limit = candidate_limit
+        self.seed_budget = seed_budget
+        self.min_overlap = min_overlap
+        self.sections: Dict[str, SectionIndex] = {"knowledge": SectionIndex(), "history": SectionIndex()}
+        self.entries: Dict[str, List[Any]] = {"knowledge": [], "history": []}
+        self._timeline: List[Tuple[str, int]] = []
+
+    @classmethod
+    def build(cls, memory: Dict[str, List[Any]], **options) -> "MemoryIndex":
+        index = cls(**options)
+        for section in index.sections:
+            for entry in memory.get(section, []):
+                index.add(section, entry)
+        return index
+
+    def add(self, section: str, entry: Any):
+        """Инкрементальное добавление записи (вызывается из store_knowledge / store_history)."""
+        doc_id = self.sections[section].add(entry)
+        self.entries[section].append(entry)
+        if section == "history" and isinstance(entry, dict) and "timestamp" in entry:
+            key = (entry["timestamp"], doc_id)
+            if not self._timeline or key >= self._timeline[-1]:
+                self._timeline.append(key)
+            else:
+                bisect.insort(self._timeline, key)
+
+    def search(self, query: str, k: int = 10, section: str = "knowledge",
+               cutoff: float = 0.0) -> List[Tuple[float, Any]]:
+        """
+        Нечёткий поиск top-k: SequenceMatcher.ratio считается только для кандидатов из индекса,
+        с отсечением по real_quick_ratio / quick_ratio относительно текущего k-го результата.
+        """
+        index = self.sections[section]
+        candidates = index.candidates(query, self.candidate_limit, self.seed_budget, self.min_overlap)
+        matcher = SequenceMatcher()
+        matcher.set_seq2(query.casefold())
+        heap: List[Tuple[float, int]] = []
+        for doc_id in candidates:
+            bound = heap[0][0] if len(heap) >= k else cutoff
+            matcher.set_seq1(index.texts[doc_id])
+            if matcher.real_quick_ratio() < bound or matcher.quick_ratio() < bound:
+                continue
+            score = matcher.ratio()
+            if score < bound:
+                continue
+            if len(heap) < k:
+                heapq.heappush(heap, (score, -doc_id))
+            else:
+                heapq.heapreplace(heap, (score, -doc_id))
+        ranked = sorted(heap, reverse=True)
+        return [(round(score, 4), self.entries[section][-neg_id]) for score, neg_id in ranked]
+
+    def find(self, query: str, section: str = "knowledge") -> List[Any]:
+        """Точный поиск: записи, содержащие все токены запроса."""
+        return [self.entries[section][doc_id] for doc_id in self.sections[section].match_tokens(query)]
+
+    def history_between(self, start: Optional[str] = None, end: Optional[str] = None) -> List[Any]:
+        """Записи истории с timestamp в [start, end] (ISO-строки сравниваются лексикографически)."""
+        lo = 0 if start is None else bisect.bisect_left(self._timeline, (start, -1))
+        hi = len(self._timeline) if end is None else bisect.bisect_right(self._timeline, (end, float("inf")))
+        return [self.entries["history"][doc_id] for _, doc_id in self._timeline[lo:hi]]
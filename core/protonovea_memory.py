@@ -0,0 +1,308 @@
+# protonovea_memory.py
+# Память Протоновеи: знания и история взаимодействий
+# Режимы хранения: "json" (полная перезапись memory.json) и "journal" (журнал JSONL + снимок)
+
+import json
+import os
+import datetime
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from protonovea_index import MemoryIndex
+
+try:
+    from fdl_metrics import timed
+except ModuleNotFoundError:  # ядро запущено без каталога fdl/ в sys.path — без метрик
+    def timed(name, help="", registry=None, **labels):
+        return lambda fn: fn
+
+### ФАЙЛЫ ОСНОВНОЙ ЛОГИКИ
+
+MEMORY_FILE = "memory.json"
+JOURNAL_SUFFIX = ".journal.jsonl"
+SNAPSHOT_SUFFIX = ".snapshot.json"
+
+MEMORY_SECTIONS = ("knowledge", "history")
+
+
+def _empty_memory() -> Dict[str, List[Any]]:
+    return {section: [] for section in MEMORY_SECTIONS}
+
+
+def _fsync_dir(path: str):
+    """Фиксация переименования файла на уровне каталога (POSIX)."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _atomic_write_json(path: str, payload: Dict):
+    """Атомарная запись JSON: временный файл → fsync → os.replace."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(payload, file, ensure_ascii=False, separators=(",", ":"))
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+    _fsync_dir(path)
+
+
+# === I. Журнал упреждающей записи ===
+class MemoryJournal:
+    """
+    Журнал упреждающей записи (WAL) для памяти Протоновеи.
+    Каждая запись — одна строка JSONL {"seq", "op", "value"}; файл только дописывается.
+    Групповая фиксация: fsync выполняется раз в fsync_batch записей или раз в fsync_interval секунд.
+    Фоновая компактизация сворачивает журнал в снимок, восстановление = снимок + хвост журнала.
+    """
+
+    def __init__(self, memory_file: str = MEMORY_FILE, fsync_batch: int = 64,
+                 fsync_interval: Optional[float] = 0.05, compact_threshold: int = 50000):
+        self.memory_file = memory_file
+        self.journal_path = memory_file + JOURNAL_SUFFIX
+        self.snapshot_path = memory_file + SNAPSHOT_SUFFIX
+        self.fsync_batch = max(1, fsync_batch)
+        self.fsync_interval = fsync_interval
+        self.compact_threshold = compact_threshold
+
+        self.seq = 0
+        self.memory: Dict[str, List[Any]] = _empty_memory()
+        self._lock = threading.RLock()
+        self._pending = 0
+        self._since_snapshot = 0
+        self._compacting = False
+        self._compactor: Optional[threading.Thread] = None
+        self._closed = False
+
+        self._recover()
+        self._journal = open(self.journal_path, "ab")
+
+        self._flusher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        if self.fsync_interval:
+            self._flusher = threading.Thread(target=self._flush_loop, name="memory-journal-fsync", daemon=True)
+            self._flusher.start()
+
+    # --- восстановление и миграция ---
+    def _recover(self):
+        """Загрузка снимка и повтор хвоста журнала; миграция старого memory.json."""
+        snapshot_seq = 0
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "r", encoding="utf-8") as file:
+                snapshot = json.load(file)
+            snapshot_seq = snapshot["seq"]
+            self.memory = snapshot["memory"]
+        elif os.path.exists(self.memory_file) and not os.path.exists(self.journal_path):
+            # Прозрачная миграция: старый memory.json становится первым снимком
+            with open(self.memory_file, "r", encoding="utf-8") as file:
+                legacy = json.load(file)
+            for section in MEMORY_SECTIONS:
+                self.memory[section] = list(legacy.get(section, []))
+            _atomic_write_json(self.snapshot_path, {"seq": 0, "memory": self.memory})
+        self.seq = snapshot_seq
+
+        if not os.path.exists(self.journal_path):
+            return
+        valid_bytes = 0
+        with open(self.journal_path, "rb") as file:
+            for raw in file:
+                if not raw.endswith(b"\n"):
+                    break  # оборванная запись после сбоя
+                try:
+                    record = json.loads(raw)
+                except ValueError:
+                    break
+                valid_bytes += len(raw)
+                if record["seq"] <= snapshot_seq:
+                    continue
+                self.memory[record["op"]].append(record["value"])
+                self.seq = record["seq"]
+                self._since_snapshot += 1
+        if valid_bytes < os.path.getsize(self.journal_path):
+            with open(self.journal_path, "r+b") as file:
+                file.truncate(valid_bytes)
+                os.fsync(file.fileno())
+
+    # --- запись ---
+    def append(self, op: str, value: Any):
+        """Добавление записи в память и журнал (групповая фиксация)."""
+        if op not in MEMORY_SECTIONS:
+            raise ValueError(f"Неизвестный раздел памяти: {op}")
+        with self._lock:
+            if self._closed:
+                raise ValueError("Журнал памяти закрыт")
+            self.seq += 1
+            line = json.dumps({"seq": self.seq, "op": op, "value": value}, ensure_ascii=False)
+            self._journal.write(line.encode("utf-8") + b"\n")
+            self.memory[op].append(value)
+            self._pending += 1
+            self._since_snapshot += 1
+            if self._pending >= self.fsync_batch:
+                self._sync_locked()
+            if self.compact_threshold and self._since_snapshot >= self.compact_threshold:
+                self.compact(background=True)
+
+    @timed("protonovea_memory_fsync_seconds", "Групповая фиксация журнала памяти (flush + fsync)")
+    def _sync_locked(self):
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self._pending = 0
+
+    def flush(self):
+        """Принудительная фиксация всех отложенных записей на диск."""
+        with self._lock:
+            if not self._closed and self._pending:
+                self._sync_locked()
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.fsync_interval):
+            self.flush()
+
+    # --- компактизация ---
+    def compact(self, background: bool = False):
+        """Сворачивание журнала в снимок. В фоне запись не блокируется на время сериализации."""
+        with self._lock:
+            if self._compacting or self._closed:
+                return
+            self._compacting = True
+        if background:
+            self._compactor = threading.Thread(target=self._compact, name="memory-journal-compact", daemon=True)
+            self._compactor.start()
+        else:
+            self._compact()
+
+    def _compact(self):
+        try:
+            with self._lock:
+                self._sync_locked()
+                snapshot_seq = self.seq
+                offset = self._journal.tell()
+                # Поверхностная копия списков: записи неизменяемы после добавления
+                frozen = {section: list(entries) for section, entries in self.memory.items()}
+                self._since_snapshot = 0
+
+            _atomic_write_json(self.snapshot_path, {"seq": snapshot_seq, "memory": frozen})
+
+            with self._lock:
+                # Хвост, дописанный во время сериализации снимка, переносится в новый журнал
+                self._sync_locked()
+                with open(self.journal_path, "rb") as file:
+                    file.seek(offset)
+                    tail = file.read()
+                tmp_path = self.journal_path + ".tmp"
+                with open(tmp_path, "wb") as file:
+                    file.write(tail)
+                    file.flush()
+                    os.fsync(file.fileno())
+                self._journal.close()
+                os.replace(tmp_path, self.journal_path)
+                _fsync_dir(self.journal_path)
+                self._journal = open(self.journal_path, "ab")
+        finally:
+            self._compacting = False
+
+    def close(self):
+        """Фиксация, остановка фоновых потоков и закрытие журнала."""
+        self._stop.set()
+        if self._flusher:
+            self._flusher.join()
+        if self._compactor:
+            self._compactor.join()
+        with self._lock:
+            if self._closed:
+                return
+            self._sync_locked()
+            self._journal.close()
+            self._closed = True
+
+
+# === II. Память Протоновеи ===
+class ProtonoveaMemory:
+    def __init__(self, storage: str = "json", memory_file: str = MEMORY_FILE, **journal_options):
+        """
+        :param storage: "json" — перезапись memory.json целиком; "journal" — журнал JSONL + снимок
+        :param journal_options: fsync_batch, fsync_interval, compact_threshold для MemoryJournal
+        """
+        if storage not in ("json", "journal"):
+            raise ValueError(f"Неизвестный режим хранения: {storage}")
+        self.storage = storage
+        self.memory_file = memory_file
+        self.journal: Optional[MemoryJournal] = None
+        self._index: Optional[MemoryIndex] = None
+        if storage == "journal":
+            self.journal = MemoryJournal(memory_file, **journal_options)
+            self.memory = self.journal.memory
+        else:
+            self.memory = self.load_memory()
+
+    def load_memory(self):
+        """Загрузка сохранённой памяти."""
+        if os.path.exists(self.memory_file):
+            with open(self.memory_file, "r", encoding="utf-8") as file:
+                return json.load(file)
+        return _empty_memory()
+
+    @timed("protonovea_memory_save_seconds", "Сохранение памяти Протоновеи (запись JSON или фиксация журнала)")
+    def save_memory(self):
+        """Сохранение текущего состояния памяти."""
+        if self.journal:
+            self.journal.flush()
+            return
+        with open(self.memory_file, "w", encoding="utf-8") as file:
+            json.dump(self.memory, file, ensure_ascii=False, indent=4)
+
+    def _store(self, section: str, entry):
+        # Индекс пополняется только после успешной записи: иначе поиск вернёт несохранённое
+        if self.journal:
+            self.journal.append(section, entry)
+        else:
+            self.memory[section].append(entry)
+            self.save_memory()
+        if self._index:
+            self._index.add(section, entry)
+
+    def store_knowledge(self, entry):
+        """Добавление новых знаний в память."""
+        self._store("knowledge", entry)
+
+    def store_history(self, interaction):
+        """Запись истории взаимодействий."""
+        self._store("history", {"timestamp": datetime.datetime.now().isoformat(), "data": interaction})
+
+    @property
+    def index(self) -> MemoryIndex:
+        """Инвертированный индекс памяти: строится при первом запросе, далее пополняется инкрементально."""
+        if self._index is None:
+            self._index = MemoryIndex.build(self.memory)
+        return self._index
+
+    def search(self, query: str, k: int = 10, section: str = "knowledge",
+               cutoff: float = 0.0) -> List[Tuple[float, Any]]:
+        """Нечёткий поиск top-k по знаниям или истории: [(оценка, запись), ...]."""
+        return self.index.search(query, k=k, section=section, cutoff=cutoff)
+
+    def find(self, query: str, section: str = "knowledge") -> List[Any]:
+        """Записи, содержащие все слова запроса."""
+        return self.index.find(query, section=section)
+
+    def history_between(self, start: Optional[str] = None, end: Optional[str] = None) -> List[Any]:
+        """История взаимодействий в интервале ISO-меток [start, end]."""
+        return self.index.history_between(start, end)
+
+    def close(self):
+        """Закрытие журнала (для режима "journal")."""
+        if self.journal:
+            self.journal.close()
+
+
+# Создание памяти Протоновеи
+if __name__ == "__main__":
+    protonovea_memory = ProtonoveaMemory()
+    protonovea_memory.store_knowledge("Пример знания: Вектор гармонии настраивается через баланс потоков.")
+    protonovea_memory.store_history("Пользователь запросил обновление памяти.")
+
+    print("🔹 Память загружена и обновлена.")
@@ -0,0 +1,287 @@
+# protonovea_notify.py
+# Асинхронная доставка уведомлений Протоновеи в Telegram:
+# ограниченная очередь, общий пул соединений, ограничение частоты (token bucket),
+# сводки событий доступа вместо сообщения на каждое событие, повторы с экспоненциальной задержкой.
+
+import asyncio
+import random
+import time
+from collections import Counter, deque
+from typing import Callable, Deque, Dict, List, NamedTuple, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+MESSAGE_LIMIT = 4096          # предел длины текста сообщения Telegram
+
+
+class Delivery(NamedTuple):
+    text: str
+    ok: bool
+    attempts: int
+    error: Optional[str]
+
+
+class TokenBucket:
+    """rate токенов в секунду, не больше capacity подряд; acquire() ждёт, не блокируя цикл событий."""
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        if rate <= 0 or capacity < 1:
+            raise ValueError("rate должен быть > 0, capacity ≥ 1")
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self) -> float:
+        """Через сколько секунд будет доступен токен (0 — уже есть)."""
+        self._refill()
+        return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+
+    async def acquire(self):
+        while True:
+            wait = self.delay()
+            if not wait:
+                self._tokens -= 1
+                return
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Сдвигает выдачу токенов (ответ 429 с retry_after)."""
+        self._refill()
+        self._tokens = min(self._tokens, 1 - seconds * self.rate)
+
+
+class RetryableError(Exception):
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TelegramDispatcher:
+    """
+    Фоновый отправитель сообщений в чат Telegram.
+    - notify(text) / record_access(kind, username, detail) кладут событие в очередь и сразу возвращаются
+      (можно вызывать из других потоков); при переполнении очереди, до start() и после stop() событие
+      отбрасывается и учитывается в dropped. Результат: True — в очереди, False — отброшено;
+      при вызове из другого потока — None: событие передано в цикл диспетчера, а его судьбу покажет dropped;
+    - события доступа за digest_window секунд (или до digest_max штук) собираются в одно сообщение-сводку;
+    - отправка не чаще rate сообщений в секунду с запасом burst;
+    - 429 (с retry_after), 5xx и сетевые ошибки повторяются с экспоненциальной задержкой до max_retries раз,
+      прочие ответы с ошибкой не повторяются.
+    Сообщения уходят по одному в порядке поступления: Telegram сохраняет порядок только так.
+    deliveries хранит последние history результатов отправки; итоги за всё время — в счётчиках stats().
+    """
+
+    def __init__(self, api_url: str, chat_id: str, queue_size: int = 1000, rate: float = 1.0, burst: int = 3,
+                 digest_window: float = 2.0, digest_max: int = 50, max_retries: int = 5,
+                 backoff_base: float = 0.5, backoff_max: float = 30.0, timeout: float = 10.0,
+                 pool_size: int = 4, session: Optional[requests.Session] = None, history: int = 100):
+        self.api_url = api_url
+        self.chat_id = chat_id
+        self.queue_size = queue_size
+        self.digest_window = digest_window
+        self.digest_max = digest_max
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.bucket = TokenBucket(rate, burst)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+        self.deliveries: Deque[Delivery] = deque(maxlen=history)
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self.retries = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._digest: List[str] = []
+        self._digest_deadline: Optional[float] = None
+
+    # --- жизненный цикл ---
+    async def start(self):
+        if self._worker is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(self.queue_size)
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self, drain: bool = True):
+        """drain=True — дождаться отправки очереди и текущей сводки; иначе прервать."""
+        if self._worker is None:
+            return
+        if drain:
+            await self._queue.put(None)
+            await self._worker
+        else:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    def close(self):
+        self.session.close()
+
+    # --- постановка в очередь ---
+    def _enqueue(self, item) -> Optional[bool]:
+        if self._worker is None:
+            self.dropped += 1
+            return False
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            return self._offer(item)
+        try:
+            self._loop.call_soon_threadsafe(self._offer, item)
+        except RuntimeError:                    # цикл диспетчера уже закрыт
+            self.dropped += 1
+            return False
+        return None
+
+    def _offer(self, item) -> bool:
+        if self._worker is None:                # остановлен, пока событие шло из другого потока
+            self.dropped += 1
+            return False
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+
+    def notify(self, text: str) -> Optional[bool]:
+        """Обычное сообщение (без объединения)."""
+        return self._enqueue(("message", text))
+
+    def record_access(self, kind: str, username: str, detail: str = "") -> Optional[bool]:
+        """Событие доступа (request_access / secure_response) для ближайшей сводки."""
+        return self._enqueue(("access", f"{kind}\t{username}\t{detail}"))
+
+    # --- обработка очереди ---
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            timeout = None
+            if self._digest_deadline is not None:
+                timeout = max(0.0, self._digest_deadline - loop.time())
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                await self._flush_digest()
+                continue
+            if item is None:
+                await self._flush_digest()
+                return
+            kind, payload = item
+            if kind == "access":
+                if not self._digest:
+                    self._digest_deadline = loop.time() + self.digest_window
+                self._digest.append(payload)
+                if len(self._digest) >= self.digest_max:
+                    await self._flush_digest()
+            else:
+                await self._deliver(payload)
+
+    async def _flush_digest(self):
+        events, self._digest, self._digest_deadline = self._digest, [], None
+        if events:
+            await self._deliver(format_digest(events))
+
+    async def _deliver(self, text: str):
+        if len(text) > MESSAGE_LIMIT:
+            text = text[:MESSAGE_LIMIT - 1] + "…"
+        attempts = 0
+        while True:
+            attempts += 1
+            await self.bucket.acquire()
+            try:
+                await asyncio.to_thread(self._post, text)
+            except RetryableError as e:
+                if attempts > self.max_retries:
+                    self._record(text, False, attempts, str(e))
+                    return
+                self.retries += 1
+                if e.retry_after is not None:
+                    self.bucket.pause(e.retry_after)
+                    continue
+                delay = min(self.backoff_max, self.backoff_base * 2 ** (attempts - 1))
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+            except Exception as e:
+                self._record(text, False, attempts, str(e))
+                return
+            else:
+                self._record(text, True, attempts, None)
+                return
+
+    def _record(self, text: str, ok: bool, attempts: int, error: Optional[str]):
+        if ok:
+            self.sent += 1
+        else:
+            self.failed += 1
+        self.deliveries.append(Delivery(text, ok, attempts, error))
+
+    def _post(self, text: str):
+        try:
+            resp = self.session.post(self.api_url, json={"chat_id": self.chat_id, "text": text},
+                                     timeout=self.timeout)
+        except requests.RequestException as e:
+            raise RetryableError(f"Сеть: {e}")
+        if resp.status_code == 200:
+            return
+        try:
+            description = resp.json()
+        except ValueError:
+            description = {}
+        message = f"HTTP {resp.status_code}: {description.get('description', resp.text[:200])}"
+        if resp.status_code == 429:
+            retry_after = description.get("parameters", {}).get("retry_after")
+            raise RetryableError(message, float(retry_after) if retry_after is not None else None)
+        if resp.status_code >= 500:
+            raise RetryableError(message)
+        raise RuntimeError(message)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "pending_digest": len(self._digest),
+            "sent": self.sent,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "retries": self.retries,
+        }
+
+
+def format_digest(events: List[str]) -> str:
+    """Сводка: итоги по типам событий и пользователям, затем сами события (по порядку)."""
+    parsed = [event.split("\t", 2) for event in events]
+    kinds = Counter(kind for kind, _, _ in parsed)
+    users = Counter(username for _, username, _ in parsed)
+    lines = [f"🔐 Сводка доступа: {len(events)} событий"]
+    lines.append(", ".join(f"{kind}: {count}" for kind, count in kinds.most_common()))
+    lines.append("Пользователи: " + ", ".join(f"{name} ×{count}" for name, count in users.most_common()))
+    lines.extend(f"• {username} [{kind}] {detail}".rstrip() for kind, username, detail in parsed)
+    return "\n".join(lines)
+
@@ -1,15 +1,151 @@
+# svet_shell.py
+# Оболочка СВЕТ: баланс энергии
+# balance() — одно показание; balance_batch() — массив показаний за один проход NumPy;
+# balance_stream() — поток порций (телеметрия) с постоянной памятью и событиями переходов.
+# Гистерезис: из «перегрузки» выходим только ниже high - margin, из «недостатка» — только выше low + margin,
+# поэтому harmony не мерцает у порогов 80/120.
+
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+DEFICIT, HARMONY, OVERLOAD = -1, 0, 1
+STATE_NAMES = {DEFICIT: "deficit", HARMONY: "harmony", OVERLOAD: "overload"}
+MESSAGES = {
+    OVERLOAD: "Перегрузка! Система стабилизируется...",
+    DEFICIT: "Энергии недостаточно. Активация резонанса...",
+    HARMONY: "Баланс энергии сохранён.",
+}
+
+Chunk = Union[np.ndarray, Iterable[float], Tuple[np.ndarray, np.ndarray]]
+
+
+class Transition(NamedTuple):
+    index: int          # номер показания в потоке (с нуля)
+    timestamp: float    # время показания, с (unix time или шкала источника)
+    previous: str
+    state: str
+    energy: float
+
+
+def _forward_fill(target: np.ndarray, initial: int) -> np.ndarray:
+    """NaN в target заменяются последним определённым значением слева (в начале — initial)."""
+    index = np.where(np.isnan(target), -1, np.arange(len(target)))
+    np.maximum.accumulate(index, out=index)
+    return np.where(index >= 0, target[index], initial)
+
+
 class SVET:
-    def __init__(self):
+    def __init__(self, low=80, high=120, margin=0.0):
+        if margin < 0 or low + margin > high - margin:
+            raise ValueError("Гистерезис: нужно margin ≥ 0 и low + margin ≤ high - margin")
         self.energy_level = 100
         self.harmony = True
+        self.low = low
+        self.high = high
+        self.margin = margin
+        self.state = HARMONY
+        self.readings = 0                                   # показаний обработано в batch/stream
+        self.counts = {name: 0 for name in STATE_NAMES.values()}
+
+    def _set_state(self, state):
+        self.state = int(state)
+        self.harmony = self.state == HARMONY
+
+    def _next(self, input_energy):
+        if input_energy != input_energy:                    # NaN (пропуск датчика) — как в classify()
+            return self.state
+        if input_energy > self.high:
+            return OVERLOAD
+        if input_energy < self.low:
+            return DEFICIT
+        if self.state == OVERLOAD and input_energy > self.high - self.margin:
+            return OVERLOAD
+        if self.state == DEFICIT and input_energy < self.low + self.margin:
+            return DEFICIT
+        return HARMONY
 
     def balance(self, input_energy):
-        if input_energy > 120:
-            self.harmony = False
-            return "Перегрузка! Система стабилизируется..."
-        elif input_energy < 80:
-            self.harmony = False
-            return "Энергии недостаточно. Активация резонанса..."
-        else:
-            self.harmony = True
-            return "Баланс энергии сохранён."
+        self._set_state(self._next(input_energy))
+        return MESSAGES[self.state]
+
+    def classify(self, readings, state=None) -> np.ndarray:
+        """
+        Состояния (int8: -1/0/1) для массива показаний без изменения self; state — состояние до первого показания.
+        NaN (пропуск датчика) сохраняет предыдущее состояние.
+        """
+        values = np.asarray(readings, dtype=np.float64).ravel()
+        state = self.state if state is None else state
+        target = np.full(len(values), np.nan)
+        target[values > self.high] = OVERLOAD
+        target[values < self.low] = DEFICIT
+        target[(values >= self.low + self.margin) & (values <= self.high - self.margin)] = HARMONY
+        # Зоны гистерезиса: удерживают своё состояние, из любого другого ведут в гармонию
+        side = np.zeros(len(values), dtype=np.int8)
+        side[(values > self.high - self.margin) & (values <= self.high)] = OVERLOAD
+        side[(values >= self.low) & (values < self.low + self.margin)] = DEFICIT
+        release = (side != 0) & (side != _forward_fill(target, state))
+        target[release] = HARMONY
+        return _forward_fill(target, state).astype(np.int8)
+
+    def _advance(self, values: np.ndarray, times: Callable[[np.ndarray], np.ndarray]) -> Tuple[np.ndarray, List[Transition]]:
+        """Состояния порции и переходы; times(индексы переходов в порции) → их время."""
+        states = self.classify(values)
+        if not len(values):
+            return states, []
+        previous = np.empty_like(states)
+        previous[0] = self.state
+        previous[1:] = states[:-1]
+        changed = np.flatnonzero(states != previous)
+        names = (STATE_NAMES[DEFICIT], STATE_NAMES[HARMONY], STATE_NAMES[OVERLOAD])
+        events = [Transition(self.readings + i, t, names[a + 1], names[b + 1], v) for i, t, a, b, v in zip(
+            changed.tolist(), np.asarray(times(changed), dtype=np.float64).tolist(),
+            previous[changed].tolist(), states[changed].tolist(), values[changed].tolist())]
+        for state, count in zip((DEFICIT, HARMONY, OVERLOAD), np.bincount(states + 1, minlength=3).tolist()):
+            self.counts[STATE_NAMES[state]] += count
+        self.readings += len(values)
+        self._set_state(states[-1])
+        return states, events
+
+    def balance_batch(self, readings, timestamps=None, start_time=None, rate=None) -> Tuple[np.ndarray, List[Transition]]:
+        """
+        Классифицирует массив за один проход, продолжая текущее состояние; возвращает (состояния, переходы).
+        Время переходов: timestamps[i], иначе start_time + i / rate, иначе момент вызова.
+        """
+        values = np.asarray(readings, dtype=np.float64).ravel()
+        if timestamps is not None:
+            stamps = np.asarray(timestamps, dtype=np.float64).ravel()
+            return self._advance(values, lambda changed: stamps[changed])
+        start_time = time.time() if start_time is None else start_time
+        if rate:
+            return self._advance(values, lambda changed: start_time + changed / rate)
+        return self._advance(values, lambda changed: np.full(len(changed), start_time))
+
+    def balance_stream(self, chunks: Iterable[Chunk], rate: Optional[float] = None,
+                       clock: Callable[[], float] = time.time) -> Iterator[Transition]:
+        """
+        Поток порций телеметрии: массив/итерируемое показаний или пара (timestamps, values).
+        Память — O(размер порции): состояния порции не накапливаются, наружу идут только переходы.
+        rate (Гц) — время показаний от момента первой порции; без rate — момент получения порции.
+        """
+        origin = None
+        for chunk in chunks:
+            if isinstance(chunk, tuple):
+                timestamps, values = chunk
+                _, events = self.balance_batch(values, timestamps)
+            else:
+                values = chunk if isinstance(chunk, np.ndarray) else np.fromiter(chunk, dtype=np.float64)
+                values = np.asarray(values, dtype=np.float64).ravel()
+                now = clock()
+                if rate:
+                    if origin is None:
+                        origin, first = now, self.readings
+                    offset = self.readings - first
+                    _, events = self._advance(values, lambda changed: origin + (offset + changed) / rate)
+                else:
+                    _, events = self._advance(values, lambda changed: np.full(len(changed), now))
+            yield from events
+
+    def stats(self) -> Dict[str, object]:
+        return {"state": STATE_NAMES[self.state], "readings": self.readings, **self.counts}
@@ -1,27 +1,50 @@
 # Σ-FDL::InterfaceProtocol (β-архитектура)
 # Назначение: Логический и смысловой мост между FDL-моделями и GPT-инфраструктурой
 
+from typing import Dict, Any, Iterator, List, Optional, Sequence, Tuple
+
+from fdl_async import run_sync
+from fdl_dialectic_log import DEFAULT_CAPACITY as DIALECTIC_LOG_CAPACITY, DialecticalLog
+from fdl_executor import FDLExecutor
+from fdl_glyph_engine import SENSE_FILTER_MASK, GlyphTranslator, TranslatorCache, WatchedDict, WatchedList
+from fdl_logic_cache import LogicCache
+from fdl_metrics import METRICS, timed
+from fdl_pranoveya import SemanticIndex, SemanticMatch
+
+
 class FDLInterfaceProtocol:
     def __init__(self):
         # Инициализация регистров логик и смыслов
         self.semantic_registry = {}
+        self.semantic_index = SemanticIndex()  # разобранные поля: префиксное дерево слов-глифов
         self.fdl_logics = {}
+        self.logic_caches: Dict[str, LogicCache] = {}
         self.protective_filters = []
         self.active_agents = {}
+        self._executor: Optional[FDLExecutor] = None
 
-    def register_logic(self, logic_id, logic_fn):
+    def register_logic(self, logic_id, logic_fn, cache=None):
         """
         Регистрирует формально-диалектическую логику (FDL-ядро)
         :param logic_id: ID логики (например, 'FDL-3-6-9')
         :param logic_fn: функция-обработчик логики
+        :param cache: мемоизация для чистых логик — True, параметры LogicCache (maxsize, ttl) или готовый LogicCache
         """
         self.fdl_logics[logic_id] = logic_fn
+        if cache is None or cache is False:
+            self.logic_caches.pop(logic_id, None)
+        elif isinstance(cache, LogicCache):
+            self.logic_caches[logic_id] = cache
+        else:
+            self.logic_caches[logic_id] = LogicCache(**(cache if isinstance(cache, dict) else {}))
 
     def load_semantic_field(self, field_id, field_structure):
         """
-        Загружает семантическое поле (структура смыслов, глифов, ПРАНОВЕЯ)
+        Загружает семантическое поле (структура смыслов, глифов, ПРАНОВЕЯ).
+        Строка 'слово = смысл; ...' или словарь разбирается один раз и индексируется
         """
         self.semantic_registry[field_id] = field_structure
+        self.semantic_index.load(field_id, field_structure)
 
     def attach_filter(self, filter_fn):
         """
@@ -29,6 +52,7 @@ class FDLInterfaceProtocol:
         """
         self.protective_filters.append(filter_fn)
 
+    @timed("fdl_interpret_input_seconds", "Длительность цепочки protective_filters")
     def interpret_input(self, input_data):
         """
         Преобразует входной текст/глиф в логическую форму через фильтры и семантику
@@ -45,6 +69,15 @@ class FDLInterfaceProtocol:
         """
         if logic_id not in self.fdl_logics:
             raise ValueError("Неизвестная логика")
+        if METRICS.enabled:
+            with METRICS.timer("fdl_invoke_logic_seconds", logic=logic_id):
+                return self._invoke_logic(logic_id, data)
+        return self._invoke_logic(logic_id, data)
+
+    def _invoke_logic(self, logic_id, data):
+        cache = self.logic_caches.get(logic_id)
+        if cache is not None:
+            return cache.call(data, self.fdl_logics[logic_id])
         return self.fdl_logics[logic_id](data)
 
     def route_agent(self, agent_id, query):
@@ -53,49 +86,89 @@ class FDLInterfaceProtocol:
         """
         if agent_id not in self.active_agents:
             raise ValueError("Неизвестный агент")
+        if METRICS.enabled:
+            with METRICS.timer("fdl_route_agent_seconds", agent=agent_id):
+                return self.active_agents[agent_id](query)
         return self.active_agents[agent_id](query)
 
+    def register_agent(self, agent_id, handler):
+        """
+        Регистрирует агента НОВЕЯ: обычная функция или корутина query -> ответ
+        """
+        self.active_agents[agent_id] = handler
+
+    def executor(self, **options) -> FDLExecutor:
+        """
+        Исполнительный слой (пулы, лимиты и таймауты агентов); создаётся при первом обращении,
+        параметры FDLExecutor учитываются только тогда
+        """
+        if self._executor is None:
+            self._executor = FDLExecutor(self, **options)
+        return self._executor
+
+    def route_many(self, requests: Sequence[Tuple[str, Any]], **options):
+        """
+        Параллельно направляет [(agent_id, query), ...] агентам и возвращает ответы по порядку.
+        Работает и внутри цикла событий (Colab/Jupyter), но там лучше не блокировать ячейку:
+        await self.executor().route_many(...)
+        """
+        return run_sync(self.executor().route_many(requests, **options))
+
     def integrate_pranoveya(self, encoded_str):
         """
-        Распознаёт и вводит ПРАНОВЕЯ-глифы как осмысленные коды для дальнейшей логической работы
+        Распознаёт и вводит ПРАНОВЕЯ-глифы как осмысленные коды для дальнейшей логической работы:
+        слова всех полей semantic_registry заменяются смыслами по самому длинному совпадению
         """
-        # TODO: реализовать декодер для символики 𐰃/ⴰ/𓂀 и соотнести с semantic_registry
-        return f"[PRANOVEA-INTEGRATED]: {encoded_str}"
+        return f"[PRANOVEA-INTEGRATED]: {self.semantic_index.decode(encoded_str)}"
+
+    def pranoveya_matches(self, encoded_str) -> List[SemanticMatch]:
+        """Найденные слова с позициями, смыслом и полем-источником"""
+        return list(self.semantic_index.find(encoded_str))
 
     def summary(self):
         return {
             "logics": list(self.fdl_logics.keys()),
             "semantic_fields": list(self.semantic_registry.keys()),
             "filters": len(self.protective_filters),
-            "agents": list(self.active_agents.keys())
+            "agents": list(self.active_agents.keys()),
+            "logic_cache": {logic_id: cache.stats() for logic_id, cache in self.logic_caches.items()}
         }
 
 
-Создан основной каркас интерфейсного протокола Σ-FDL для интеграции в GPT-среду. Он включает:
-
-регистрацию ФДЛ-логик;
-
-загрузку семантических полей (в т.ч. ПРАНОВЕЯ);
-
-фильтры смысловой защиты;
-
-маршрутизацию к агентам;
-
-распознавание глифов как осмысленных команд.
-
-
-Готов развивать следующие блоки: интерпретатор глифов, связка с CodeAgent, интеграция фаз логики (3-6-9), загрузка реальных полей из разработок НГОИ. Готов к доработке по твоим идеям.
+# Создан основной каркас интерфейсного протокола Σ-FDL для интеграции в GPT-среду. Он включает:
+#
+# регистрацию ФДЛ-логик;
+#
+# загрузку семантических полей (в т.ч. ПРАНОВЕЯ);
+#
+# фильтры смысловой защиты;
+#
+# маршрутизацию к агентам;
+#
+# распознавание глифов как осмысленных команд.
+#
+# Готов развивать следующие блоки: интерпретатор глифов, связка с CodeAgent, интеграция фаз логики (3-6-9), загрузка реальных полей из разработок НГОИ. Готов к доработке по твоим идеям.
 
 
 # Σ-FDL::InterfaceModule
 # Интерфейсный модуль для интеграции формально-диалектической логики (FDL) в GPT-среду
 
-from typing import Dict, Any, List, Optional
+# Скомпилированные трансляторы пересобираются по invalidate(): реестр глифов и термины фильтра
+# сами сообщают о любой правке, в том числе прямой (FDL_GLYPH_REGISTRY[...] = ..., SENSE_FILTER_TERMS.append)
+_PROCESS_ENGINE = TranslatorCache()
+_FILTER_ENGINE = TranslatorCache()
+
+def _sense_filter_changed():
+    _PROCESS_ENGINE.invalidate()
+    _FILTER_ENGINE.invalidate()
 
 # Словарь для регистрации глифов, кодов и логических маршрутов
-FDL_GLYPH_REGISTRY: Dict[str, Dict[str, Any]] = {}
+FDL_GLYPH_REGISTRY: Dict[str, Dict[str, Any]] = WatchedDict(on_change=_PROCESS_ENGINE.invalidate)
 FDL_SEMANTIC_FIELDS: Dict[str, str] = {}
+FDL_SEMANTIC_INDEX = SemanticIndex()
 FDL_ROUTE_MAP: Dict[str, str] = {}
+SENSE_FILTER_TERMS: List[str] = WatchedList(['вина', 'насилие', 'власть'],  # Примеры деструктивных маркеров
+                                            on_change=_sense_filter_changed)
 
 # === Регистрация глифа как команды ===
 def register_glyph(glyph: str, meaning: str, logic_path: Optional[str] = None):
@@ -104,27 +177,43 @@ def register_glyph(glyph: str, meaning: str, logic_path: Optional[str] = None):
         'route': logic_path or 'default'
     }
 
+# === Замена набора терминов фильтра смысловой защиты ===
+def set_sense_filter_terms(terms: List[str]):
+    SENSE_FILTER_TERMS[:] = terms
+
 # === Загрузка семантических полей (например, ПРАНОВЕЯ) ===
 def load_semantic_field(name: str, data: str):
     FDL_SEMANTIC_FIELDS[name] = data
+    FDL_SEMANTIC_INDEX.load(name, data)
+
+# === Расшифровка слов загруженных семантических полей ===
+def decode_semantic_fields(text: str) -> str:
+    return FDL_SEMANTIC_INDEX.decode(text)
+
+def _build_process_engine() -> GlyphTranslator:
+    glyphs = {glyph: f"[{entry['meaning']} → {entry['route']}]" for glyph, entry in FDL_GLYPH_REGISTRY.items()}
+    return GlyphTranslator(glyphs, SENSE_FILTER_TERMS, SENSE_FILTER_MASK)
+
+def glyph_engine() -> GlyphTranslator:
+    """Транслятор «фильтр + глифы» для текущих FDL_GLYPH_REGISTRY и SENSE_FILTER_TERMS."""
+    return _PROCESS_ENGINE.get(_build_process_engine)
 
 # === Применение фильтра смысловой защиты ===
 def apply_sense_filter(text: str) -> str:
-    for term in ['вина', 'насилие', 'власть']:  # Примеры деструктивных маркеров
-        text = text.replace(term, '[∅]')
-    return text
+    engine = _FILTER_ENGINE.get(lambda: GlyphTranslator({}, SENSE_FILTER_TERMS, SENSE_FILTER_MASK))
+    return engine.translate(text)
 
 # === Обработка пользовательского ввода в контексте FDL ===
 def fdl_process_input(text: str) -> str:
-    text = apply_sense_filter(text)
-    decoded = []
-    for ch in text:
-        if ch in FDL_GLYPH_REGISTRY:
-            route = FDL_GLYPH_REGISTRY[ch]['route']
-            decoded.append(f"[{FDL_GLYPH_REGISTRY[ch]['meaning']} → {route}]")
-        else:
-            decoded.append(ch)
-    return ''.join(decoded)
+    # Фильтр и расшифровка глифов — один проход скомпилированного транслятора
+    return glyph_engine().translate(text)
+
+# === Потоковая обработка больших входов (путь, файл или итерируемое кусков) ===
+def fdl_process_stream(source, chunk_size: Optional[int] = None) -> Iterator[str]:
+    engine = glyph_engine()
+    if chunk_size is None:
+        return engine.translate_stream(source)
+    return engine.translate_stream(source, chunk_size)
 
 # === Пример инициализации ===
 register_glyph('𐰴', 'Свет', 'svet-path')
@@ -140,29 +229,27 @@ if __name__ == '__main__':
     print(fdl_process_input(input_text))
 
 
-Готово. Я создал начальный модуль Σ-FDL::InterfaceModule — интерфейсную прослойку для интеграции формально-диалектической логики (FDL) в среду GPT.
-
-🔹 Что он делает:
-
-Регистрирует глифы и задаёт их смысловые маршруты.
-
-Загружает поля семантики, например ПРАНОВЕЯ.
-
-Применяет фильтр смысловой защиты от деструктивных маркеров.
-
-Преобразует входной текст в FDL-расшифровку с указанием логических векторов.
-
-
-Можно нарастить:
-
-маршрутизацию по Δ-фазам (инициация → развёртка → синтез),
-
-логическую память-граф,
-
-синтез диалектического вывода (через “антитезу-перекод”).
-
-
-Если хочешь — продолжим развитие этой библиотеки: подключим корпус навигации смыслов, семантическую голографию или добавим поддержку глиф-карт.
+# Готово. Я создал начальный модуль Σ-FDL::InterfaceModule — интерфейсную прослойку для интеграции формально-диалектической логики (FDL) в среду GPT.
+#
+# 🔹 Что он делает:
+#
+# Регистрирует глифы и задаёт их смысловые маршруты.
+#
+# Загружает поля семантики, например ПРАНОВЕЯ.
+#
+# Применяет фильтр смысловой защиты от деструктивных маркеров.
+#
+# Преобразует входной текст в FDL-расшифровку с указанием логических векторов.
+#
+# Можно нарастить:
+#
+# маршрутизацию по Δ-фазам (инициация → развёртка → синтез),
+#
+# логическую память-граф,
+#
+# синтез диалектического вывода (через “антитезу-перекод”).
+#
+# Если хочешь — продолжим развитие этой библиотеки: подключим корпус навигации смыслов, семантическую голографию или добавим поддержку глиф-карт.
 
 
 
@@ -170,10 +257,22 @@ if __name__ == '__main__':
 # Интерфейсная прослойка для интеграции формально-диалектической логики в систему GPT
 
 class FDLInterface:
-    def __init__(self):
+    def __init__(self, log_capacity: int = DIALECTIC_LOG_CAPACITY, log_path: Optional[str] = None):
+        self._translator = TranslatorCache()
         self.semantic_glyphs = {}
         self.pranoveya_fields = {}
-        self.dialectical_log = []
+        # Последние log_capacity шагов в памяти, более старые — в сегменте log_path (без него — во временном файле)
+        self.dialectical_log = DialecticalLog(log_capacity, log_path)
+
+    @property
+    def semantic_glyphs(self):
+        return self._semantic_glyphs
+
+    @semantic_glyphs.setter
+    def semantic_glyphs(self, glyphs):
+        # Таблица сообщает транслятору о любой правке, и при замене целиком, и при записи по ключу
+        self._semantic_glyphs = WatchedDict(glyphs, on_change=self._translator.invalidate)
+        self._translator.invalidate()
 
     def register_glyph(self, glyph, meaning):
         self.semantic_glyphs[glyph] = meaning
@@ -182,16 +281,14 @@ class FDLInterface:
         self.pranoveya_fields[field_name] = mapping
 
     def apply_semantic_filter(self, input_text):
-        # Элементарный смысловой фильтр
-        for glyph, meaning in self.semantic_glyphs.items():
-            input_text = input_text.replace(glyph, f"[{meaning}]")
-        return input_text
+        # Элементарный смысловой фильтр: все глифы за один проход, замены повторно не раскрываются
+        translator = self._translator.get(lambda: GlyphTranslator(
+            {glyph: f"[{meaning}]" for glyph, meaning in self.semantic_glyphs.items()}))
+        return translator.translate(input_text)
 
     def dialectical_process(self, thesis):
-        # Формирование антитезы и синтеза
-        antithesis = f"Противоположность: не-{thesis}"
-        synthesis = f"Синтез: соединение ({thesis}) и ({antithesis}) в новой форме."
-        self.dialectical_log.append((thesis, antithesis, synthesis))
+        # Формирование антитезы и синтеза (журнал хранит стандартный шаг одним тезисом)
+        _, antithesis, synthesis = self.dialectical_log.append(thesis)
         return synthesis
 
     def interpret_input(self, raw_input):
@@ -200,65 +297,30 @@ class FDLInterface:
         synthesis = self.dialectical_process(filtered)
         return synthesis
 
+    def close(self):
+        # Дописывает в сегмент журнала ещё не сохранённые вытесненные записи
+        self.dialectical_log.close()
 
-# Пример использования:
-fdl = FDLInterface()
-fdl.register_glyph('𐰴', 'Свет')
-fdl.register_glyph('𓂀', 'Око Разума')
-fdl.load_pranoveya_field('Архетипы', {'𐰴': 'Поток Света', '𓂀': 'Глубинное Видение'})
-
-input_text = "𐰴 приводит к 𓂀"
-print(fdl.interpret_input(input_text))
-
-
-Создан модуль FDLInterface, реализующий базовую прослойку интеграции формально-диалектической логики (FDL) в GPT-среду. Включены:
-
-Регистрация смысловых глифов (символов);
-
-Загрузка ПРАНОВЕЙНЫХ полей (архетипов);
-
-Простейший фильтр для интерпретации текста через глифы;
 
-Диалектический процесс: тезис → антитезис → синтез.
-
-
-Можем расширять: подключить фазовую логику, резонансные реакции, интеграцию с svet_shell.py или protonovea_core.py. Готов развивать по шагам. Продолжим?
-
-# fdl_interface.py
-
-class FDLInterface:
-    def __init__(self):
-        self.glyphs = {}
-        self.archs = {}
-
-    def register_glyph(self, name, meaning):
-        self.glyphs[name] = meaning
-
-    def load_arch(self, key, concept):
-        self.archs[key] = concept
-
-    def interpret_text(self, text):
-        result = []
-        for glyph, meaning in self.glyphs.items():
-            if glyph in text:
-                result.append((glyph, meaning))
-        return result
-
-    def dialectic_synthesis(self, thesis, antithesis):
-        if not thesis or not antithesis:
-            return None
-        # Простейший синтез: объединение в третье представление
-        return f"Σ({thesis}) + Δ({antithesis}) → Ω({thesis} ∧ {antithesis})"
-
-
-# Пример использования
-if __name__ == "__main__":
+# Пример использования:
+if __name__ == '__main__':
     fdl = FDLInterface()
-    fdl.register_glyph("𐰖", "гармония")
-    fdl.register_glyph("ⵣ", "истина")
-    fdl.load_arch("Lux", "внутренний свет как навигация")
-
-    text = "Путь ведёт через 𐰖 и ⵣ к источнику."
-    print("Интерпретация:", fdl.interpret_text(text))
-    print("Диалектика:", fdl.dialectic_synthesis("свобода", "порядок"))
-
+    fdl.register_glyph('𐰴', 'Свет')
+    fdl.register_glyph('𓂀', 'Око Разума')
+    fdl.load_pranoveya_field('Архетипы', {'𐰴': 'Поток Света', '𓂀': 'Глубинное Видение'})
+
+    input_text = "𐰴 приводит к 𓂀"
+    print(fdl.interpret_input(input_text))
+
+
+# Создан модуль FDLInterface, реализующий базовую прослойку интеграции формально-диалектической логики (FDL) в GPT-среду. Включены:
+#
+# Регистрация смысловых глифов (символов);
+#
+# Загрузка ПРАНОВЕЙНЫХ полей (архетипов);
+#
+# Простейший фильтр для интерпретации текста через глифы;
+#
+# Диалектический процесс: тезис → антитезис → синтез.
+#
+# Можем расширять: подключить фазовую логику, резонансные реакции, интеграцию с svet_shell.py или protonovea_core.py. Готов развивать по шагам. Продолжим?
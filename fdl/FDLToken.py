@@ -1,56 +1,361 @@
-Protonovea FDL-Based Resource Token System
+# Protonovea FDL-Based Resource Token System
+#
+# Core idea: tokens reflect real resource efficiency and semantic impact
+#
+# Used in economic systems that value not just effort or output, but the
+#
+# true resonance and efficiency of action
 
-Core idea: tokens reflect real resource efficiency and semantic impact
+from typing import List, Dict, Iterable, Iterator, Optional, Sequence, Union
+from array import array
+from collections.abc import Sequence as SequenceABC
+import csv
+import os
+import uuid
+import datetime
 
-Used in economic systems that value not just effort or output, but the
+from fdl_metrics import METRICS, timed
 
-true resonance and efficiency of action
+try:
+    import numpy as np
+    NUMPY_ENABLED = True
+except ModuleNotFoundError:
+    np = None
+    NUMPY_ENABLED = False
 
-from typing import List, Dict import uuid import datetime
+EPOCH = datetime.datetime(1970, 1, 1)
+MICROSECOND = datetime.timedelta(microseconds=1)
 
-class FDLToken: def init(self, impulses: float, semantic_density: float, efficiency: float, resources_used: float): self.token_id = str(uuid.uuid4()) self.timestamp = datetime.datetime.now() self.impulses = impulses  # Number of labor-energy impulses (Σi) self.semantic_density = semantic_density  # Rho_m - meaning saturation 0.0–1.0 self.efficiency = efficiency  # E - goal-achieving effectiveness 0.0–1.0 self.resources_used = resources_used  # R - resource cost in units (time+materials+energy)
 
-def token_value(self) -> float:
+def to_micros(timestamp: datetime.datetime) -> int:
+    """Naive datetime -> int64 microseconds since EPOCH (no timezone conversion, exact round-trip)."""
+    return (timestamp - EPOCH) // MICROSECOND
+
+
+def from_micros(micros: int) -> datetime.datetime:
+    return EPOCH + datetime.timedelta(microseconds=micros)
+
+
+class FDLToken:
+    def __init__(self, impulses: float, semantic_density: float, efficiency: float, resources_used: float):
+        self.token_id = str(uuid.uuid4())
+        self.timestamp = datetime.datetime.now()
+        self.impulses = impulses  # Number of labor-energy impulses (Σi)
+        self.semantic_density = semantic_density  # Rho_m - meaning saturation 0.0–1.0
+        self.efficiency = efficiency  # E - goal-achieving effectiveness 0.0–1.0
+        self.resources_used = resources_used  # R - resource cost in units (time+materials+energy)
+
+    def token_value(self) -> float:
+        """
+        Calculate token value using the FDL formula:
+        Value = (Σi × ρᴍ × E) / R
+        """
+        if self.resources_used <= 0:
+            raise ValueError("Resource usage must be > 0")
+        return (self.impulses * self.semantic_density * self.efficiency) / self.resources_used
+
+    def report(self) -> Dict:
+        return {
+            "token_id": self.token_id,
+            "timestamp": self.timestamp.isoformat(),
+            "impulses": self.impulses,
+            "semantic_density": self.semantic_density,
+            "efficiency": self.efficiency,
+            "resources_used": self.resources_used,
+            "FDL_token_value": round(self.token_value(), 4)
+        }
+
+
+class FDLTokenView:
     """
-    Calculate token value using the FDL formula:
-    Value = (Σi × ρᴍ × E) / R
+    Read-only view of one ledger row. Holds only (ledger, index), so iterating
+    a multi-million-token ledger does not materialize FDLToken objects.
     """
-    if self.resources_used <= 0:
-        raise ValueError("Resource usage must be > 0")
-    return (self.impulses * self.semantic_density * self.efficiency) / self.resources_used
+    __slots__ = ("_ledger", "_index")
+
+    def __init__(self, ledger: "FDLTokenLedger", index: int):
+        self._ledger = ledger
+        self._index = index
+
+    @property
+    def token_id(self) -> str:
+        i = self._index * 16
+        return str(uuid.UUID(bytes=bytes(self._ledger.token_ids[i:i + 16])))
+
+    @property
+    def timestamp(self) -> datetime.datetime:
+        return from_micros(self._ledger.timestamps[self._index])
+
+    @property
+    def impulses(self) -> float:
+        return self._ledger.impulses[self._index]
+
+    @property
+    def semantic_density(self) -> float:
+        return self._ledger.semantic_density[self._index]
+
+    @property
+    def efficiency(self) -> float:
+        return self._ledger.efficiency[self._index]
+
+    @property
+    def resources_used(self) -> float:
+        return self._ledger.resources_used[self._index]
+
+    def token_value(self) -> float:
+        return self._ledger.values[self._index]
+
+    def report(self) -> Dict:
+        return self._ledger.report(self._index)
+
+    def __repr__(self):
+        return f"FDLTokenView<{self._index}: {self.token_value():.4f}>"
+
+
+class FDLTokenRows(SequenceABC):
+    """
+    Live read-only sequence of ledger rows (FDLTokenView). append/extend are routed
+    to FDLTokenLedger.add_token, so code written against the old list attribute
+    (ledger.tokens.append(token)) still records the token.
+    """
+    __slots__ = ("_ledger",)
+
+    def __init__(self, ledger: "FDLTokenLedger"):
+        self._ledger = ledger
+
+    def __len__(self) -> int:
+        return len(self._ledger)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [FDLTokenView(self._ledger, i) for i in range(*index.indices(len(self)))]
+        count = len(self)
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("ledger row index out of range")
+        return FDLTokenView(self._ledger, index)
+
+    def append(self, token: FDLToken):
+        self._ledger.add_token(token)
+
+    def extend(self, tokens: Iterable[FDLToken]):
+        for token in tokens:
+            self._ledger.add_token(token)
+
+    def __repr__(self):
+        return f"FDLTokenRows<{len(self)} tokens>"
+
+
+class FDLTokenLedger:
+    """
+    Columnar token ledger: one typed array per field instead of a list of objects.
+    Token values are computed once on insertion and a running total is maintained,
+    so total_value() is O(1). Bulk paths are vectorized with NumPy when it is installed.
+    """
+
+    def __init__(self):
+        self.token_ids = bytearray()          # 16 raw UUID bytes per token
+        self.timestamps = array("q")          # int64 microseconds since EPOCH
+        self.impulses = array("d")
+        self.semantic_density = array("d")
+        self.efficiency = array("d")
+        self.resources_used = array("d")
+        self.values = array("d")              # cached (Σi × ρᴍ × E) / R
+        self._total = 0.0
+        self._compensation = 0.0              # Neumaier compensation for the running total
+        self._queries: Dict[tuple, "FDLLedgerQuery"] = {}   # query engines by options, see query()
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @property
+    def tokens(self) -> FDLTokenRows:
+        return FDLTokenRows(self)
+
+    def _accumulate(self, value: float):
+        total = self._total + value
+        if abs(self._total) >= abs(value):
+            self._compensation += (self._total - total) + value
+        else:
+            self._compensation += (value - total) + self._total
+        self._total = total
+
+    @timed("fdl_ledger_append_seconds", "Длительность добавления токенов в реестр", op="add_token")
+    def add_token(self, token: FDLToken):
+        # Convert every field before touching the columns: a bad field must not leave a partial row
+        value = token.token_value()
+        raw_id = uuid.UUID(token.token_id).bytes
+        micros = to_micros(token.timestamp)
+        fields = (float(token.impulses), float(token.semantic_density), float(token.efficiency),
+                  float(token.resources_used))
+        self.token_ids += raw_id
+        self.timestamps.append(micros)
+        for target, field in zip((self.impulses, self.semantic_density, self.efficiency, self.resources_used),
+                                 fields):
+            target.append(field)
+        self.values.append(value)
+        self._accumulate(value)
+        if METRICS.enabled:
+            METRICS.inc("fdl_ledger_appended_tokens_total")
+
+    @timed("fdl_ledger_append_seconds", op="add_tokens")
+    def add_tokens(self, impulses: Sequence[float], semantic_density: Sequence[float],
+                   efficiency: Sequence[float], resources_used: Sequence[float],
+                   timestamps: Optional[Sequence[Union[int, datetime.datetime]]] = None) -> int:
+        """
+        Bulk insert from parallel columns (lists, array.array or NumPy arrays).
+        timestamps are datetimes or int64 microseconds since EPOCH; default is now.
+        All-or-nothing: every column is validated and converted before the ledger is modified.
+        Returns the number of tokens added.
+        """
+        count = len(impulses)
+        if not (len(semantic_density) == len(efficiency) == len(resources_used) == count):
+            raise ValueError("Column lengths differ")
+        if timestamps is not None and len(timestamps) != count:
+            raise ValueError("Column lengths differ")
+        if count == 0:
+            return 0
+
+        if timestamps is None:
+            stamps = array("q", [to_micros(datetime.datetime.now())]) * count
+        else:
+            stamps = array("q", (to_micros(t) if isinstance(t, datetime.datetime) else int(t) for t in timestamps))
+
+        if NUMPY_ENABLED:
+            columns = [np.asarray(c, dtype=np.float64) for c in (impulses, semantic_density, efficiency, resources_used)]
+            if (columns[3] <= 0).any():
+                raise ValueError("Resource usage must be > 0")
+            values = columns[0] * columns[1] * columns[2] / columns[3]
+            block_total = float(np.sum(values))
+            raw_ids = np.frombuffer(os.urandom(16 * count), dtype=np.uint8).reshape(count, 16).copy()
+            raw_ids[:, 6] = (raw_ids[:, 6] & 0x0F) | 0x40   # UUID version 4
+            raw_ids[:, 8] = (raw_ids[:, 8] & 0x3F) | 0x80   # RFC 4122 variant
+            columns = [column.tobytes() for column in columns]
+            values = values.tobytes()
+            ids = raw_ids.tobytes()
+        else:
+            columns = [array("d", (float(x) for x in c)) for c in (impulses, semantic_density, efficiency, resources_used)]
+            if any(r <= 0 for r in columns[3]):
+                raise ValueError("Resource usage must be > 0")
+            values = array("d", (i * d * e / r for i, d, e, r in zip(*columns)))
+            block_total = sum(values)
+            columns = [column.tobytes() for column in columns]
+            values = values.tobytes()
+            ids = b"".join(uuid.uuid4().bytes for _ in range(count))
+
+        for target, column in zip((self.impulses, self.semantic_density, self.efficiency, self.resources_used),
+                                  columns):
+            target.frombytes(column)
+        self.values.frombytes(values)
+        self.token_ids += ids
+        self.timestamps.extend(stamps)
+        self._accumulate(block_total)
+        if METRICS.enabled:
+            METRICS.inc("fdl_ledger_appended_tokens_total", count)
+        return count
+
+    def add_tokens_csv(self, path: str) -> int:
+        """
+        Bulk insert from a CSV file with a header row:
+        impulses, semantic_density, efficiency, resources_used[, timestamp (ISO 8601)].
+        """
+        columns = {name: [] for name in ("impulses", "semantic_density", "efficiency", "resources_used")}
+        stamps = []
+        with open(path, newline="", encoding="utf-8") as file:
+            for row in csv.DictReader(file):
+                for name, column in columns.items():
+                    column.append(float(row[name]))
+                if row.get("timestamp"):
+                    stamps.append(datetime.datetime.fromisoformat(row["timestamp"]))
+        if stamps and len(stamps) != len(columns["impulses"]):
+            raise ValueError("timestamp column is only partially filled")
+        return self.add_tokens(timestamps=stamps or None, **columns)
+
+    def column(self, name: str):
+        """
+        Zero-copy NumPy view of a column (array.array without NumPy).
+        Drop the view before adding tokens: an array.array cannot grow while its buffer is exported.
+        """
+        data = getattr(self, name)
+        if not NUMPY_ENABLED:
+            return data
+        dtype = np.int64 if name == "timestamps" else np.float64
+        return np.frombuffer(data, dtype=dtype) if len(data) else np.empty(0, dtype=dtype)
+
+    def report(self, index: int) -> Dict:
+        i = index * 16
+        return {
+            "token_id": str(uuid.UUID(bytes=bytes(self.token_ids[i:i + 16]))),
+            "timestamp": from_micros(self.timestamps[index]).isoformat(),
+            "impulses": self.impulses[index],
+            "semantic_density": self.semantic_density[index],
+            "efficiency": self.efficiency[index],
+            "resources_used": self.resources_used[index],
+            "FDL_token_value": round(self.values[index], 4)
+        }
+
+    def iter_reports(self) -> Iterator[Dict]:
+        """Streams report() dicts built column-wise (ids, timestamps and rounding vectorized)."""
+        if NUMPY_ENABLED and len(self):
+            rounded = np.round(self.column("values"), 4).tolist()
+            stamps = np.datetime_as_string(self.column("timestamps").astype("datetime64[us]"), unit="us").tolist()
+            # datetime.isoformat() omits a zero microsecond part
+            stamps = [s[:-7] if s.endswith(".000000") else s for s in stamps]
+        else:
+            rounded = [round(v, 4) for v in self.values]
+            stamps = [from_micros(t).isoformat() for t in self.timestamps]
+        hexed = self.token_ids.hex()
+        for index, (stamp, imp, dens, eff, res, value) in enumerate(zip(
+                stamps, self.impulses, self.semantic_density, self.efficiency, self.resources_used, rounded)):
+            h = hexed[index * 32:index * 32 + 32]
+            yield {
+                "token_id": f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}",
+                "timestamp": stamp,
+                "impulses": imp,
+                "semantic_density": dens,
+                "efficiency": eff,
+                "resources_used": res,
+                "FDL_token_value": value
+            }
 
-def report(self) -> Dict:
-    return {
-        "token_id": self.token_id,
-        "timestamp": self.timestamp.isoformat(),
-        "impulses": self.impulses,
-        "semantic_density": self.semantic_density,
-        "efficiency": self.efficiency,
-        "resources_used": self.resources_used,
-        "FDL_token_value": round(self.token_value(), 4)
-    }
+    def get_all_reports(self) -> List[Dict]:
+        return list(self.iter_reports())
 
-class FDLTokenLedger: def init(self): self.tokens: List[FDLToken] = []
+    def query(self, **options):
+        """
+        Query engine (time windows, rollups, top-k, percentiles) bound to this ledger.
+        Engines are cached per options: repeated calls return the same instance, which
+        only folds in rows added since its previous query instead of rescanning from row 0.
+        """
+        key = tuple(sorted(options.items()))
+        engine = self._queries.get(key)
+        if engine is None:
+            from FDLTokenQuery import FDLLedgerQuery
+            engine = self._queries[key] = FDLLedgerQuery(self, **options)
+        return engine
 
-def add_token(self, token: FDLToken):
-    self.tokens.append(token)
+    def total_value(self) -> float:
+        return self._total + self._compensation
 
-def get_all_reports(self) -> List[Dict]:
-    return [token.report() for token in self.tokens]
+    def recompute_total(self) -> float:
+        """Full vectorized recomputation of the total (e.g. for auditing the running sum)."""
+        if NUMPY_ENABLED and len(self):
+            return float(np.sum(self.column("values")))
+        return sum(self.values)
 
-def total_value(self) -> float:
-    return sum(token.token_value() for token in self.tokens)
 
-Example usage and expansion point for web or Telegram interface
+# Example usage and expansion point for web or Telegram interface
 
-if name == "main": ledger = FDLTokenLedger()
+if __name__ == "__main__":
+    ledger = FDLTokenLedger()
 
-# Simulated token entries (to be replaced with user input or external platform data)
-ledger.add_token(FDLToken(impulses=10, semantic_density=0.8, efficiency=0.9, resources_used=3.5))
-ledger.add_token(FDLToken(impulses=5, semantic_density=0.9, efficiency=0.95, resources_used=2.0))
+    # Simulated token entries (to be replaced with user input or external platform data)
+    ledger.add_token(FDLToken(impulses=10, semantic_density=0.8, efficiency=0.9, resources_used=3.5))
+    ledger.add_token(FDLToken(impulses=5, semantic_density=0.9, efficiency=0.95, resources_used=2.0))
 
-print("Token Reports:")
-for report in ledger.get_all_reports():
-    print(report)
+    print("Token Reports:")
+    for report in ledger.get_all_reports():
+        print(report)
 
-print(f"Total semantic value of ledger: {round(ledger.total_value(), 4)}")
+    print(f"Total semantic value of ledger: {round(ledger.total_value(), 4)}")
@@ -0,0 +1,246 @@
+# Protonovea FDL Token Query Engine
+#
+# Time-windowed aggregation, top-k and percentile queries over FDLTokenLedger
+#
+# Aggregates are maintained incrementally: each query first catches up only
+# the rows added since the previous one, so dashboards never rescan the ledger
+
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from array import array
+import bisect
+import datetime
+import heapq
+
+from FDLToken import NUMPY_ENABLED, FDLTokenLedger, FDLTokenView, from_micros, to_micros
+
+if NUMPY_ENABLED:
+    import numpy as np
+
+GRANULARITIES = {
+    "minute": 60 * 1_000_000,
+    "hour": 3600 * 1_000_000,
+    "day": 86400 * 1_000_000,
+}
+PERCENTILE_FIELDS = ("semantic_density", "efficiency")
+
+TimeBound = Optional[Union[datetime.datetime, int]]
+
+
+def _bound(value: TimeBound) -> Optional[int]:
+    if value is None or isinstance(value, int):
+        return value
+    return to_micros(value)
+
+
+class FDLLedgerQuery:
+    """
+    Query layer over a ledger:
+    - timestamp index (row order sorted by time) for range queries;
+    - per-minute/hour/day rollups of token value (count, sum, mean);
+    - a bounded min-heap of the top tokens by value;
+    - fixed-bin histograms of semantic_density / efficiency (0.0–1.0) for percentiles.
+    """
+
+    def __init__(self, ledger: FDLTokenLedger, top_capacity: int = 100, histogram_bins: int = 1000):
+        self.ledger = ledger
+        self.top_capacity = top_capacity
+        self.histogram_bins = histogram_bins
+        self._seen = 0
+        self._order = array("q")          # row indices sorted by timestamp
+        self._sorted_ts = array("q")      # timestamps in that order (bisect target)
+        self._rollups: Dict[str, Dict[int, List[float]]] = {name: {} for name in GRANULARITIES}
+        self._top: List[Tuple[float, int]] = []
+        self._histograms = {name: [0] * histogram_bins for name in PERCENTILE_FIELDS}
+        self._outside = {name: 0 for name in PERCENTILE_FIELDS}  # values outside [0, 1]
+
+    # --- incremental maintenance ---
+    def refresh(self) -> int:
+        """Folds rows added since the last call into every index. Returns the number of new rows."""
+        start, end = self._seen, len(self.ledger)
+        if start == end:
+            return 0
+        self._extend_order(start, end)
+        self._extend_rollups(start, end)
+        self._extend_top(start, end)
+        for name in PERCENTILE_FIELDS:
+            self._extend_histogram(name, start, end)
+        self._seen = end
+        return end - start
+
+    def _extend_order(self, start: int, end: int):
+        stamps = self.ledger.timestamps
+        fresh = stamps[start:end]
+        if NUMPY_ENABLED:
+            in_order = bool(np.all(np.diff(self.ledger.column("timestamps")[start:end]) >= 0))
+        else:
+            in_order = all(a <= b for a, b in zip(fresh, fresh[1:]))
+        if in_order and (not self._sorted_ts or fresh[0] >= self._sorted_ts[-1]):
+            self._order.extend(range(start, end))
+            self._sorted_ts.extend(fresh)
+            return
+        # Out-of-order rows (e.g. back-filled CSV): rebuild the index with a stable sort
+        if NUMPY_ENABLED:
+            order = np.argsort(self.ledger.column("timestamps")[:end], kind="stable")
+            self._order = array("q", order.astype(np.int64).tobytes())
+        else:
+            self._order = array("q", sorted(range(end), key=stamps.__getitem__))
+        self._sorted_ts = array("q", (stamps[i] for i in self._order))
+
+    def _extend_rollups(self, start: int, end: int):
+        stamps = self.ledger.timestamps
+        values = self.ledger.values
+        for name, width in GRANULARITIES.items():
+            buckets = self._rollups[name]
+            if NUMPY_ENABLED:
+                keys = self.ledger.column("timestamps")[start:end] // width
+                unique, inverse = np.unique(keys, return_inverse=True)
+                counts = np.bincount(inverse)
+                sums = np.bincount(inverse, weights=self.ledger.column("values")[start:end])
+                for key, count, total in zip(unique.tolist(), counts.tolist(), sums.tolist()):
+                    bucket = buckets.setdefault(key, [0, 0.0])
+                    bucket[0] += count
+                    bucket[1] += total
+            else:
+                for i in range(start, end):
+                    bucket = buckets.setdefault(stamps[i] // width, [0, 0.0])
+                    bucket[0] += 1
+                    bucket[1] += values[i]
+
+    def _extend_top(self, start: int, end: int):
+        heap = self._top
+        capacity = self.top_capacity
+        if NUMPY_ENABLED and end - start > capacity:
+            chunk = self.ledger.column("values")[start:end]
+            best = np.argpartition(chunk, -capacity)[-capacity:]
+            rows = ((float(chunk[i]), start + int(i)) for i in best)
+        else:
+            values = self.ledger.values
+            rows = ((values[i], i) for i in range(start, end))
+        for value, row in rows:
+            if len(heap) < capacity:
+                heapq.heappush(heap, (value, -row))
+            elif value > heap[0][0]:
+                heapq.heapreplace(heap, (value, -row))
+
+    def _extend_histogram(self, name: str, start: int, end: int):
+        bins = self.histogram_bins
+        histogram = self._histograms[name]
+        if NUMPY_ENABLED:
+            data = self.ledger.column(name)[start:end]
+            inside = (data >= 0.0) & (data <= 1.0)
+            self._outside[name] += int((~inside).sum())
+            slots = np.minimum((data[inside] * bins).astype(np.int64), bins - 1)
+            for slot, count in enumerate(np.bincount(slots, minlength=bins).tolist()):
+                histogram[slot] += count
+            return
+        column = getattr(self.ledger, name)
+        for i in range(start, end):
+            value = column[i]
+            if 0.0 <= value <= 1.0:
+                histogram[min(int(value * bins), bins - 1)] += 1
+            else:
+                self._outside[name] += 1
+
+    # --- queries ---
+    def range_indices(self, start: TimeBound = None, end: TimeBound = None) -> Sequence[int]:
+        """Row indices with start <= timestamp < end, in time order."""
+        self.refresh()
+        lo = 0 if start is None else bisect.bisect_left(self._sorted_ts, _bound(start))
+        hi = len(self._sorted_ts) if end is None else bisect.bisect_left(self._sorted_ts, _bound(end))
+        return self._order[lo:hi]
+
+    def range(self, start: TimeBound = None, end: TimeBound = None) -> List[FDLTokenView]:
+        return [FDLTokenView(self.ledger, i) for i in self.range_indices(start, end)]
+
+    def range_summary(self, start: TimeBound = None, end: TimeBound = None) -> Dict:
+        """count / sum / mean of token value over a time window."""
+        rows = self.range_indices(start, end)
+        if NUMPY_ENABLED and len(rows):
+            total = float(self.ledger.column("values")[np.frombuffer(rows, dtype=np.int64)].sum())
+        else:
+            values = self.ledger.values
+            total = sum(values[i] for i in rows)
+        count = len(rows)
+        return {"count": count, "sum": total, "mean": total / count if count else 0.0}
+
+    def rollup(self, granularity: str = "hour", start: TimeBound = None, end: TimeBound = None) -> List[Dict]:
+        """Per-bucket count / sum / mean of token value, from the incrementally maintained rollups."""
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown granularity: {granularity}")
+        self.refresh()
+        width = GRANULARITIES[granularity]
+        lo, hi = _bound(start), _bound(end)
+        result = []
+        for key in sorted(self._rollups[granularity]):
+            bucket_start = key * width
+            if (lo is not None and bucket_start + width <= lo) or (hi is not None and bucket_start >= hi):
+                continue
+            count, total = self._rollups[granularity][key]
+            result.append({
+                "bucket": from_micros(bucket_start).isoformat(),
+                "count": count,
+                "sum": total,
+                "mean": total / count,
+            })
+        return result
+
+    def top(self, k: int = 10, start: TimeBound = None, end: TimeBound = None) -> List[FDLTokenView]:
+        """Top-k tokens by value (whole ledger from the maintained heap, windows by partial sort)."""
+        self.refresh()
+        if start is None and end is None and k <= self.top_capacity:
+            best = heapq.nlargest(k, self._top)
+            return [FDLTokenView(self.ledger, -row) for _, row in best]
+        rows = self.range_indices(start, end)
+        values = self.ledger.values
+        if NUMPY_ENABLED and len(rows) > k:
+            idx = np.frombuffer(rows, dtype=np.int64)
+            chunk = self.ledger.column("values")[idx]
+            best = idx[np.argpartition(chunk, -k)[-k:]]
+            ordered = sorted(best.tolist(), key=lambda i: (-values[i], i))
+        else:
+            ordered = heapq.nlargest(k, rows, key=lambda i: (values[i], -i))
+        return [FDLTokenView(self.ledger, i) for i in ordered]
+
+    def percentiles(self, field: str, qs: Sequence[float] = (10, 50, 90, 99),
+                    start: TimeBound = None, end: TimeBound = None) -> Dict[float, float]:
+        """
+        Percentiles of semantic_density or efficiency.
+        Whole ledger: from the histogram (resolution 1/histogram_bins); windows or out-of-range data: exact.
+        """
+        if field not in PERCENTILE_FIELDS:
+            raise ValueError(f"Percentiles are available for {PERCENTILE_FIELDS}")
+        self.refresh()
+        if start is None and end is None and not self._outside[field]:
+            return self._histogram_percentiles(field, qs)
+        rows = self.range_indices(start, end)
+        if not len(rows):
+            return {q: 0.0 for q in qs}
+        if NUMPY_ENABLED:
+            data = self.ledger.column(field)[np.frombuffer(rows, dtype=np.int64)]
+            return {q: float(v) for q, v in zip(qs, np.percentile(data, qs))}
+        column = getattr(self.ledger, field)
+        data = sorted(column[i] for i in rows)
+        result = {}
+        for q in qs:
+            pos = (len(data) - 1) * q / 100
+            lo = int(pos)
+            hi = min(lo + 1, len(data) - 1)
+            result[q] = data[lo] + (data[hi] - data[lo]) * (pos - lo)
+        return result
+
+    def _histogram_percentiles(self, field: str, qs: Sequence[float]) -> Dict[float, float]:
+        histogram = self._histograms[field]
+        total = sum(histogram)
+        if not total:
+            return {q: 0.0 for q in qs}
+        result = {}
+        targets = sorted(qs)
+        cumulative = 0
+        slot = 0
+        for q in targets:
+            need = total * q / 100
+            while slot < len(histogram) - 1 and cumulative + histogram[slot] < need:
+                cumulative += histogram[slot]
+                slot += 1
+            result[q] = (slot + 0.5) / self.histogram_bins
+        return {q: result[q] for q in qs}
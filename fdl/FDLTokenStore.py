@@ -0,0 +1,282 @@
+# Protonovea FDL Token Store
+#
+# Persistent on-disk ledger: fixed-width binary records linked by a SHA-256 hash chain
+#
+# Layout: 64-byte header, then 96-byte records
+#   token_id 16s | timestamp int64 µs | impulses | semantic_density | efficiency | resources_used | value (float64)
+#   | chain 32s = sha256(previous chain || the 64 payload bytes)
+# A sidecar "<path>.ckpt" stores the last verified (count, chain) so verification resumes from it
+
+from typing import Dict, Iterator, Optional
+import hashlib
+import json
+import mmap
+import os
+import struct
+import uuid
+
+from FDLToken import NUMPY_ENABLED, FDLToken, FDLTokenLedger, from_micros, to_micros
+from fdl_metrics import timed
+
+if NUMPY_ENABLED:
+    import numpy as np
+
+MAGIC = b"FDLLEDG1"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sII16s32s")          # magic, version, record size, reserved, genesis
+PAYLOAD = struct.Struct("<16sqddddd")          # row without the chain hash
+RECORD_SIZE = PAYLOAD.size + 32
+HEADER_SIZE = 64
+GENESIS = hashlib.sha256("Σ-FDL::LEDGER".encode("utf-8")).digest()
+
+if NUMPY_ENABLED:
+    RECORD_DTYPE = np.dtype([
+        ("token_id", "V16"), ("timestamp", "<i8"), ("impulses", "<f8"), ("semantic_density", "<f8"),
+        ("efficiency", "<f8"), ("resources_used", "<f8"), ("value", "<f8"), ("chain", "V32"),
+    ])
+
+COLUMNS = ("impulses", "semantic_density", "efficiency", "resources_used")
+
+
+class LedgerIntegrityError(Exception):
+    """Raised when the hash chain of a ledger file does not verify."""
+
+
+class FDLTokenStore:
+    """
+    Append-only, hash-chained ledger file.
+    Appends are written as whole records and fsync'ed (per call, or batched via sync=False + sync());
+    on open a torn tail is truncated and the records after the last checkpoint are re-verified
+    (a broken chain raises LedgerIntegrityError and leaves the file untouched).
+    Reads go through a read-only mmap, so reloading millions of tokens needs no parsing.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.checkpoint_path = path + ".ckpt"
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            with open(path, "wb") as file:
+                file.write(HEADER.pack(MAGIC, FORMAT_VERSION, RECORD_SIZE, b"", GENESIS).ljust(HEADER_SIZE, b"\0"))
+                file.flush()
+                os.fsync(file.fileno())
+        self._file = open(path, "r+b")
+        magic, version, record_size, _, genesis = HEADER.unpack(self._file.read(HEADER.size))
+        if magic != MAGIC or version != FORMAT_VERSION or record_size != RECORD_SIZE:
+            raise LedgerIntegrityError(f"{path}: not an FDL ledger file (version {version})")
+        self._genesis = genesis
+        self._map: Optional[mmap.mmap] = None
+        self._mapped_size = 0
+        self.recover()
+
+    # --- geometry ---
+    def __len__(self) -> int:
+        return self._count
+
+    def _offset(self, index: int) -> int:
+        return HEADER_SIZE + index * RECORD_SIZE
+
+    def _view(self) -> mmap.mmap:
+        """
+        Read-only map of the file, remapped when appends have grown it.
+        A previous map is only dropped, not closed: records() views may still reference it.
+        """
+        size = self._offset(self._count)
+        if self._map is None or self._mapped_size != size:
+            self._map = mmap.mmap(self._file.fileno(), size, access=mmap.ACCESS_READ)
+            self._mapped_size = size
+        return self._map
+
+    # --- crash recovery and verification ---
+    def _read_checkpoint(self):
+        """
+        Last verified (count, chain), or the genesis when there is no usable checkpoint.
+        A checkpoint is only trusted if it fits the data: count within the file and the chain
+        stored in record count-1 equal to the checkpointed chain. Otherwise it is ignored.
+        """
+        if not os.path.exists(self.checkpoint_path):
+            return 0, self._genesis
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as file:
+                checkpoint = json.load(file)
+            count, chain = int(checkpoint["count"]), bytes.fromhex(checkpoint["chain"])
+        except (ValueError, KeyError, TypeError):
+            return 0, self._genesis
+        if not 0 < count <= self._count:
+            return 0, self._genesis
+        offset = self._offset(count - 1) + PAYLOAD.size
+        if self._view()[offset:offset + 32] != chain:
+            return 0, self._genesis
+        return count, chain
+
+    def _write_checkpoint(self, count: int, chain: bytes):
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump({"count": count, "chain": chain.hex()}, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def recover(self):
+        """
+        Drops a torn trailing record (a crash mid-append leaves a partial record), then verifies
+        the records after the last checkpoint. A broken chain in a complete record is never
+        repaired: LedgerIntegrityError is raised and the file is left as is for inspection.
+        """
+        size = os.path.getsize(self.path)
+        self._count = (size - HEADER_SIZE) // RECORD_SIZE
+        if self._offset(self._count) != size:
+            self._file.truncate(self._offset(self._count))
+            os.fsync(self._file.fileno())
+        count, chain = self._read_checkpoint()
+        try:
+            self._last_chain = self._verify_range(count, chain)
+        except LedgerIntegrityError:
+            self.close()
+            raise
+
+    def _verify_range(self, start: int, chain: bytes) -> bytes:
+        view = self._view() if self._count else None
+        sha256 = hashlib.sha256
+        for index in range(start, self._count):
+            offset = self._offset(index)
+            payload = view[offset:offset + PAYLOAD.size]
+            expected = sha256(chain + payload).digest()
+            if view[offset + PAYLOAD.size:offset + RECORD_SIZE] != expected:
+                raise LedgerIntegrityError(f"{self.path}: hash chain broken at record {index}")
+            chain = expected
+        return chain
+
+    def verify(self, incremental: bool = True) -> int:
+        """
+        Verifies the hash chain (from the last checkpoint, or from the start with incremental=False)
+        and advances the checkpoint. Returns the number of verified records; raises LedgerIntegrityError.
+        """
+        start, chain = self._read_checkpoint() if incremental else (0, self._genesis)
+        chain = self._verify_range(start, chain)
+        self._write_checkpoint(self._count, chain)
+        return self._count
+
+    # --- appends ---
+    def _append_payloads(self, payloads: bytes, count: int, sync: bool):
+        chain = self._last_chain
+        sha256 = hashlib.sha256
+        out = bytearray()
+        for i in range(count):
+            payload = payloads[i * PAYLOAD.size:(i + 1) * PAYLOAD.size]
+            chain = sha256(chain + payload).digest()
+            out += payload
+            out += chain
+        self._file.seek(self._offset(self._count))
+        self._file.write(out)
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())
+        self._count += count
+        self._last_chain = chain
+
+    @timed("fdl_ledger_append_seconds", op="store_append")
+    def append(self, token: FDLToken, sync: bool = True):
+        """Appends one token; with sync=True the record is durable when this returns."""
+        payload = PAYLOAD.pack(uuid.UUID(token.token_id).bytes, to_micros(token.timestamp), token.impulses,
+                               token.semantic_density, token.efficiency, token.resources_used, token.token_value())
+        self._append_payloads(payload, 1, sync)
+
+    @timed("fdl_ledger_append_seconds", op="store_append_ledger")
+    def append_ledger(self, ledger: FDLTokenLedger, start: int = 0, sync: bool = True) -> int:
+        """Persists ledger rows [start, len(ledger)) in one write and one fsync. Returns rows written."""
+        count = len(ledger) - start
+        if count <= 0:
+            return 0
+        if NUMPY_ENABLED:
+            rows = np.empty(count, dtype=np.dtype(RECORD_DTYPE.descr[:-1]))
+            rows["token_id"] = np.frombuffer(bytes(ledger.token_ids[start * 16:]), dtype="V16")
+            rows["timestamp"] = ledger.column("timestamps")[start:]
+            for name in COLUMNS:
+                rows[name] = ledger.column(name)[start:]
+            rows["value"] = ledger.column("values")[start:]
+            payloads = rows.tobytes()
+        else:
+            payloads = b"".join(
+                PAYLOAD.pack(bytes(ledger.token_ids[i * 16:i * 16 + 16]), ledger.timestamps[i], ledger.impulses[i],
+                             ledger.semantic_density[i], ledger.efficiency[i], ledger.resources_used[i],
+                             ledger.values[i])
+                for i in range(start, len(ledger)))
+        self._append_payloads(payloads, count, sync)
+        return count
+
+    def sync(self):
+        """Makes batched (sync=False) appends durable."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    # --- reads ---
+    def records(self):
+        """Zero-copy structured NumPy view over the mapped records (requires NumPy)."""
+        if not NUMPY_ENABLED:
+            raise RuntimeError("NumPy is required for records()")
+        if not self._count:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        return np.frombuffer(self._view(), dtype=RECORD_DTYPE, count=self._count, offset=HEADER_SIZE)
+
+    def row(self, index: int) -> Dict:
+        """Decodes one record straight from the map."""
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        token_id, stamp, imp, dens, eff, res, value = PAYLOAD.unpack_from(self._view(), self._offset(index))
+        return {"token_id": token_id, "timestamp": stamp, "impulses": imp, "semantic_density": dens,
+                "efficiency": eff, "resources_used": res, "value": value}
+
+    def load_ledger(self) -> FDLTokenLedger:
+        """Rebuilds an in-memory FDLTokenLedger from the file (vectorized column extraction)."""
+        ledger = FDLTokenLedger()
+        if not self._count:
+            return ledger
+        if NUMPY_ENABLED:
+            records = self.records()
+            ledger.token_ids += records["token_id"].tobytes()
+            ledger.timestamps.frombytes(np.ascontiguousarray(records["timestamp"]).tobytes())
+            for name in COLUMNS:
+                getattr(ledger, name).frombytes(np.ascontiguousarray(records[name]).tobytes())
+            ledger.values.frombytes(np.ascontiguousarray(records["value"]).tobytes())
+            del records
+        else:
+            view = self._view()
+            for index in range(self._count):
+                token_id, stamp, imp, dens, eff, res, value = PAYLOAD.unpack_from(view, self._offset(index))
+                ledger.token_ids += token_id
+                ledger.timestamps.append(stamp)
+                for name, item in zip(COLUMNS, (imp, dens, eff, res)):
+                    getattr(ledger, name).append(item)
+                ledger.values.append(value)
+        ledger._accumulate(ledger.recompute_total())
+        return ledger
+
+    def iter_reports(self) -> Iterator[Dict]:
+        """
+        Rows in the FDLToken.report() shape, decoded one record at a time straight from the map,
+        so exporting a ledger larger than memory never builds its columns.
+        """
+        view, count = self._view(), self._count
+        for index in range(count):
+            token_id, stamp, imp, dens, eff, res, value = PAYLOAD.unpack_from(view, self._offset(index))
+            yield {
+                "token_id": str(uuid.UUID(bytes=token_id)),
+                "timestamp": from_micros(stamp).isoformat(),
+                "impulses": imp,
+                "semantic_density": dens,
+                "efficiency": eff,
+                "resources_used": res,
+                "FDL_token_value": round(value, 4)
+            }
+
+    def export_reports(self, path: str):
+        """Writes a JSON array of report() dicts, streaming one row at a time."""
+        with open(path, "w", encoding="utf-8") as file:
+            file.write("[")
+            for i, report in enumerate(self.iter_reports()):
+                file.write(("," if i else "") + "\n  " + json.dumps(report, ensure_ascii=False))
+            file.write("\n]\n")
+
+    def close(self):
+        self._map = None
+        self._file.close()
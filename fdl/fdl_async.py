@@ -0,0 +1,44 @@
+# fdl_async.py
+# Σ-FDL::ASYNC — запуск корутин из синхронного кода
+#
+# asyncio.run() падает с RuntimeError, если в потоке уже крутится цикл событий —
+# а в Colab/Jupyter он крутится всегда. run_sync() в таком случае исполняет корутину
+# на собственном цикле во вспомогательном потоке и блокирует вызывающий код до результата.
+# В блокноте предпочтительнее асинхронный путь: await прямо в ячейке (например, await parser.fetch_feeds_async(...)).
+
+import asyncio
+import threading
+from typing import Any, Awaitable
+
+
+def running_loop() -> bool:
+    """Есть ли в текущем потоке работающий цикл событий (ячейка Jupyter, обработчик aiohttp и т. п.)."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def run_sync(coro: Awaitable) -> Any:
+    """
+    Результат корутины из синхронного кода.
+    Без работающего цикла — обычный asyncio.run; внутри цикла — отдельный поток со своим циклом
+    (корутина не должна опираться на объекты, привязанные к внешнему циклу).
+    """
+    if not running_loop():
+        return asyncio.run(coro)
+    outcome = {}
+
+    def target():
+        try:
+            outcome["result"] = asyncio.run(coro)
+        except BaseException as e:  # noqa: BLE001 — исключение передаётся вызывающему потоку
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target, name="fdl-run-sync", daemon=True)
+    thread.start()
+    thread.join()
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
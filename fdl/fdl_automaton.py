@@ -0,0 +1,118 @@
+# fdl_automaton.py
+# Σ-FDL::AHO-CORASICK
+# Автомат множественного поиска фраз (Ахо–Корасик) с Unicode casefold-нормализацией
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def casefold_with_offsets(text: str) -> Tuple[str, Optional[List[int]]]:
+    """
+    Unicode casefold (включая кириллицу) с картой смещений в исходный текст.
+    Если длина не изменилась, каждый символ свернулся в один — карта не нужна (None).
+    """
+    folded = text.casefold()
+    if len(folded) == len(text):
+        return folded, None
+    parts = []
+    offsets = []
+    for i, ch in enumerate(text):
+        f = ch.casefold()
+        parts.append(f)
+        offsets.extend([i] * len(f))
+    offsets.append(len(text))
+    return "".join(parts), offsets
+
+
+def is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class PhraseAutomaton:
+    """
+    Автомат Ахо–Корасик, построенный один раз по набору фраз.
+    Фразы сворачиваются casefold; несколько исходных ключей с одинаковой свёрткой
+    делят один терминальный узел. Сканирование — O(len(text) + число совпадений).
+    Автомат неизменяем после построения, поэтому им можно пользоваться из нескольких потоков.
+    """
+
+    def __init__(self, phrases: Iterable[str]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.terminal: List[int] = [-1]   # индекс фразы, оканчивающейся в узле, или -1
+        self.dict_link: List[int] = [0]   # ближайший терминальный узел по цепочке fail
+        self.patterns: List[str] = []     # свёрнутые фразы
+        self.keys: List[List[str]] = []   # исходные ключи для каждой свёрнутой фразы
+        self.lengths: List[int] = []
+
+        index: Dict[str, int] = {}
+        for phrase in phrases:
+            folded = phrase.casefold()
+            if not folded:
+                continue
+            if folded in index:
+                self.keys[index[folded]].append(phrase)
+                continue
+            pid = index[folded] = len(self.patterns)
+            self.patterns.append(folded)
+            self.keys.append([phrase])
+            self.lengths.append(len(folded))
+            self._insert(folded, pid)
+        self._link()
+
+    def _insert(self, folded: str, pid: int):
+        node = 0
+        for ch in folded:
+            nxt = self.goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.terminal.append(-1)
+                self.dict_link.append(0)
+            node = nxt
+        self.terminal[node] = pid
+
+    def _link(self):
+        """Построение fail- и словарных ссылок обходом в ширину."""
+        queue = list(self.goto[0].values())
+        head = 0
+        while head < len(queue):
+            node = queue[head]
+            head += 1
+            for ch, child in self.goto[node].items():
+                queue.append(child)
+                state = self.fail[node]
+                while state and ch not in self.goto[state]:
+                    state = self.fail[state]
+                target = self.goto[state].get(ch, 0)
+                self.fail[child] = target if target != child else 0
+                fallback = self.fail[child]
+                self.dict_link[child] = fallback if self.terminal[fallback] >= 0 else self.dict_link[fallback]
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def scan(self, folded: str, state: int = 0) -> Tuple[List[Tuple[int, int]], int]:
+        """
+        Сканирование уже свёрнутого текста.
+        Возвращает ([(end, pattern_id), ...], конечное состояние); end — позиция после совпадения.
+        Состояние можно передать в следующий вызов для потокового поиска по кускам.
+        """
+        goto = self.goto
+        fail = self.fail
+        terminal = self.terminal
+        dict_link = self.dict_link
+        matches = []
+        node = state
+        for i, ch in enumerate(folded):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if not node:
+                continue
+            out = node if terminal[node] >= 0 else dict_link[node]
+            while out:
+                matches.append((i + 1, terminal[out]))
+                out = dict_link[out]
+        return matches, node
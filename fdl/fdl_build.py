@@ -0,0 +1,167 @@
+# fdl_build.py
+# Σ-FDL::BUILD
+# Сборка каталога FDL-исходников: параллельная компиляция и контентно-адресуемый кэш артефактов
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from fdl_compiler import COMPILER_VERSION, OUTPUT_FORMATS, FDLCompiler
+
+SOURCE_SUFFIX = ".fdl"
+MANIFEST_FILE = "manifest.{fmt}.json"  # свой манифест для каждого формата вывода
+ARTIFACT_SUFFIX = {"json": ".json", "compact": ".json", "binary": ".fdlb"}
+POOL_THRESHOLD = 16  # меньше файлов на компиляцию — без пула процессов (запуск пула дороже)
+
+
+def artifact_key(source: bytes, fmt: str) -> str:
+    """Ключ артефакта: хэш исходника + версия компилятора + формат вывода."""
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(COMPILER_VERSION.encode("ascii"))
+    digest.update(b"\0" + fmt.encode("ascii") + b"\0")
+    digest.update(source)
+    return digest.hexdigest()
+
+
+def artifact_path(out_dir: str, key: str, fmt: str) -> str:
+    return os.path.join(out_dir, "objects", key[:2], key[2:] + ARTIFACT_SUFFIX[fmt])
+
+
+def _write_atomic(path: str, payload: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(payload)
+    os.replace(tmp_path, path)
+
+
+def compile_file(path: str, out_dir: str, fmt: str) -> Tuple[str, List[str]]:
+    """Компилирует один файл и записывает артефакт в кэш. Возвращает (ключ, ошибки)."""
+    with open(path, "rb") as file:
+        source = file.read()
+    key = artifact_key(source, fmt)
+    target = artifact_path(out_dir, key, fmt)
+    if os.path.exists(target):
+        return key, []
+    compiler = FDLCompiler()
+    compiler.parse(source.decode("utf-8"))
+    compiler.validate()
+    result = compiler.compile(fmt)
+    if result is None:
+        return key, compiler.errors
+    _write_atomic(target, result if isinstance(result, bytes) else result.encode("utf-8"))
+    return key, []
+
+
+def _compile_job(job: Tuple[str, str, str]) -> Tuple[str, List[str]]:
+    return compile_file(*job)
+
+
+class FDLProject:
+    """
+    Сборка дерева FDL-исходников.
+    Манифест хранит для каждого файла (mtime_ns, size, ключ артефакта): неизменённые файлы
+    пропускаются по одному stat без чтения. Изменённые файлы хэшируются; если артефакт
+    с таким ключом уже есть в objects/, компиляция не нужна. Остальные компилируются в пуле процессов.
+    """
+
+    def __init__(self, source_dir: str, out_dir: Optional[str] = None, fmt: str = "compact",
+                 workers: Optional[int] = None, suffix: str = SOURCE_SUFFIX):
+        if fmt not in OUTPUT_FORMATS:
+            raise ValueError(f"Неизвестный формат: {fmt}")
+        self.source_dir = source_dir
+        self.out_dir = out_dir or os.path.join(source_dir, ".fdl_build")
+        self.fmt = fmt
+        self.workers = workers
+        self.suffix = suffix
+        self.manifest_path = os.path.join(self.out_dir, MANIFEST_FILE.format(fmt=fmt))
+
+    def _load_manifest(self) -> Dict[str, Dict]:
+        if not os.path.exists(self.manifest_path):
+            return {}
+        with open(self.manifest_path, "r", encoding="utf-8") as file:
+            manifest = json.load(file)
+        if manifest.get("version") != COMPILER_VERSION or manifest.get("format") != self.fmt:
+            return {}
+        return manifest["files"]
+
+    def _save_manifest(self, files: Dict[str, Dict]):
+        payload = {"version": COMPILER_VERSION, "format": self.fmt, "files": files}
+        _write_atomic(self.manifest_path, json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+    def sources(self) -> List[str]:
+        """Относительные пути всех FDL-исходников дерева (каталог сборки пропускается)."""
+        found = []
+        out_dir = os.path.abspath(self.out_dir)
+        for root, dirs, names in os.walk(self.source_dir):
+            dirs[:] = sorted(d for d in dirs if os.path.abspath(os.path.join(root, d)) != out_dir)
+            for name in sorted(names):
+                if name.endswith(self.suffix):
+                    found.append(os.path.relpath(os.path.join(root, name), self.source_dir))
+        return found
+
+    def build(self) -> Dict:
+        """Инкрементальная сборка. Возвращает сводку: файлы, скомпилировано, из кэша, ошибки."""
+        previous = self._load_manifest()
+        files: Dict[str, Dict] = {}
+        jobs: List[Tuple[str, str, str]] = []
+        pending: List[Tuple[str, os.stat_result]] = []
+
+        for rel in self.sources():
+            stat = os.stat(os.path.join(self.source_dir, rel))
+            entry = previous.get(rel)
+            # Артефакт мог быть удалён (очистка objects/) — тогда исходник собирается заново
+            if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size and (
+                    entry["errors"] or os.path.exists(artifact_path(self.out_dir, entry["key"], self.fmt))):
+                files[rel] = entry
+                continue
+            pending.append((rel, stat))
+            jobs.append((os.path.join(self.source_dir, rel), self.out_dir, self.fmt))
+
+        if len(jobs) >= POOL_THRESHOLD and self.workers != 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                results = list(pool.map(_compile_job, jobs, chunksize=max(1, len(jobs) // 256)))
+        else:
+            results = [_compile_job(job) for job in jobs]
+
+        for (rel, stat), (key, errors) in zip(pending, results):
+            files[rel] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "key": key, "errors": errors}
+
+        self._save_manifest(files)
+        return {
+            "files": len(files),
+            "compiled": len(jobs),
+            "cached": len(files) - len(jobs),
+            "errors": {rel: entry["errors"] for rel, entry in files.items() if entry["errors"]},
+        }
+
+    def artifact(self, rel: str) -> Optional[str]:
+        """Путь к артефакту исходника (None, если файл не собран или содержит ошибки)."""
+        entry = self._load_manifest().get(rel)
+        if not entry or entry["errors"]:
+            return None
+        return artifact_path(self.out_dir, entry["key"], self.fmt)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Сборка каталога FDL-исходников")
+    parser.add_argument("source_dir")
+    parser.add_argument("--out", default=None, help="каталог сборки (по умолчанию <source_dir>/.fdl_build)")
+    parser.add_argument("--format", default="compact", choices=OUTPUT_FORMATS)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    summary = FDLProject(args.source_dir, args.out, args.format, args.workers).build()
+    print(f"🔧 FDL-сборка: {summary['files']} файлов, скомпилировано {summary['compiled']}, из кэша {summary['cached']}")
+    for rel, errors in summary["errors"].items():
+        for error in errors:
+            print(f"⚠️ {rel}: {error}")
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
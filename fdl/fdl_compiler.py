@@ -1,42 +1,302 @@
-fdl_compiler.py
+# fdl_compiler.py
 
-""" FDL Compiler — преобразователь FDL-языка в исполняемую логическую структуру (AST + runtime) Фаза: интерпретация резонансных блоков, проверка обратимости, инициация откликов """
+"""
+FDL Compiler — преобразователь FDL-языка в исполняемую логическую структуру (AST + runtime)
+Фаза: интерпретация резонансных блоков, проверка обратимости, инициация откликов
 
-import json from typing import List, Dict
+Синтаксис FDL-программы:
+    [имя_блока]            — необязательный заголовок, открывает новый блок
+    ключ: значение         — поле блока (значение может содержать ':')
+    # комментарий
+    пустая строка          — разделитель блоков
+"""
 
-class FDLBlock: def init(self, block_id: str, structure: Dict): self.block_id = block_id self.structure = structure
+import hashlib
+import json
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
 
-def __repr__(self):
-    return f"FDLBlock<{self.block_id}>"
+from fdl_metrics import timed
 
-class FDLCompiler: def init(self): self.blocks: List[FDLBlock] = [] self.errors: List[str] = []
+COMPILER_VERSION = "2.1"
+REQUIRED_FIELDS = ["замысел", "форма", "поток"]
+OUTPUT_FORMATS = ("json", "compact", "binary")
+BINARY_MAGIC = b"FDL\x01"
+BLOCK_HEADER = re.compile(r"^\s*\[(?P<block_id>[^\[\]]+)\]\s*$")
 
-def parse(self, source: str):
-    current = {}
-    block_id = "block_0"
-    for line in source.strip().splitlines():
+
+class FDLLexeme(NamedTuple):
+    kind: str       # "header" | "field" | "comment" | "text"
+    line: int       # номер строки внутри блока (с 0)
+    column: int     # столбец (с 1)
+    key: str
+    value: str
+    value_column: int
+
+
+class FDLBlock:
+    def __init__(self, block_id: str, structure: Dict, span: Optional[Tuple[int, int, int, int]] = None,
+                 positions: Optional[Dict[str, Tuple[int, int]]] = None, content_hash: Optional[str] = None):
+        self.block_id = block_id
+        self.structure = structure
+        self.span = span                  # (строка начала, столбец начала, строка конца, столбец конца), с 1
+        self.positions = positions or {}  # поле → (строка, столбец)
+        self.content_hash = content_hash
+
+    def __repr__(self):
+        return f"FDLBlock<{self.block_id}>"
+
+
+class _ParsedSegment(NamedTuple):
+    """Результат разбора одного блока в относительных координатах; кэшируется по хэшу содержимого."""
+    block_id: Optional[str]
+    structure: Dict[str, str]
+    positions: Dict[str, Tuple[int, int]]
+    end: Tuple[int, int]
+    syntax: List[Tuple[int, int, str]]
+    validation: List[Tuple[int, int, str]]
+
+
+def tokenize_block(lines: List[str]) -> List[FDLLexeme]:
+    """Построчный лексер FDL: каждая непустая строка блока → лексема с позицией."""
+    lexemes = []
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+        column = len(line) - len(line.lstrip()) + 1
+        if stripped.startswith("#"):
+            lexemes.append(FDLLexeme("comment", i, column, "", stripped, column))
+            continue
+        header = BLOCK_HEADER.match(line)
+        if header:
+            lexemes.append(FDLLexeme("header", i, column, header.group("block_id").strip(), "", column))
+            continue
         if ':' in line:
-            key, val = line.strip().split(':', 1)
-            current[key.strip()] = val.strip()
-    self.blocks.append(FDLBlock(block_id, current))
-
-def validate(self):
-    for block in self.blocks:
-        required_fields = ["замысел", "форма", "поток"]
-        for field in required_fields:
-            if field not in block.structure:
-                self.errors.append(f"{block.block_id}: отсутствует поле '{field}'")
-
-def compile(self):
-    if self.errors:
-        return None
-    return json.dumps([b.structure for b in self.blocks], ensure_ascii=False, indent=2)
-
-def report(self):
-    if self.errors:
-        return {"status": "ошибки", "errors": self.errors}
-    return {"status": "готово", "blocks": len(self.blocks)}
-
-Пример использования
-
-if name == 'main': source = """ замысел: протестировать систему форма: логический анализ поток: от агента к ядру сигнал: обратная связь отклик: лог печати контур: проверка синтаксиса """ compiler = FDLCompiler() compiler.parse(source) compiler.validate() result = compiler.compile() print(result if result else compiler.report())
+            key, val = line.split(':', 1)
+            value_column = len(key) + 2 + (len(val) - len(val.lstrip()))
+            lexemes.append(FDLLexeme("field", i, column, key.strip(), val.strip(), value_column))
+            continue
+        lexemes.append(FDLLexeme("text", i, column, "", stripped, column))
+    return lexemes
+
+
+def split_blocks(source: str) -> List[Tuple[int, List[str]]]:
+    """
+    Делит исходник на сегменты блоков: [(номер первой строки с 0, строки), ...].
+    Граница — пустая строка или заголовок [имя]. Сегменты из одних комментариев отбрасываются.
+    """
+    segments = []
+    current: List[str] = []
+    start = 0
+    for i, line in enumerate(source.splitlines()):
+        if not line.strip() or BLOCK_HEADER.match(line):
+            if current:
+                segments.append((start, current))
+            current = []
+            if not line.strip():
+                continue
+        if not current:
+            start = i
+        current.append(line)
+    if current:
+        segments.append((start, current))
+    return [(start, lines) for start, lines in segments
+            if any(not line.strip().startswith("#") for line in lines)]
+
+
+def block_hash(lines: List[str]) -> str:
+    return hashlib.blake2b("\n".join(lines).encode("utf-8"), digest_size=16).hexdigest()
+
+
+# === Бинарный формат артефактов ===
+# MAGIC, varint(число блоков), для каждого блока varint(число полей) и пары строк UTF-8 с varint-длиной
+
+def _put_varint(out: bytearray, value: int):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _get_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def encode_binary(structures: List[Dict[str, str]]) -> bytes:
+    out = bytearray(BINARY_MAGIC)
+    _put_varint(out, len(structures))
+    for structure in structures:
+        _put_varint(out, len(structure))
+        for key, value in structure.items():
+            for text in (key, value):
+                raw = str(text).encode("utf-8")
+                _put_varint(out, len(raw))
+                out += raw
+    return bytes(out)
+
+
+def decode_binary(data: bytes) -> List[Dict[str, str]]:
+    if data[:len(BINARY_MAGIC)] != BINARY_MAGIC:
+        raise ValueError("Не FDL-артефакт: неверная сигнатура")
+    pos = len(BINARY_MAGIC)
+    count, pos = _get_varint(data, pos)
+    structures = []
+    for _ in range(count):
+        fields, pos = _get_varint(data, pos)
+        structure = {}
+        for _ in range(fields):
+            pair = []
+            for _ in range(2):
+                size, pos = _get_varint(data, pos)
+                pair.append(data[pos:pos + size].decode("utf-8"))
+                pos += size
+            structure[pair[0]] = pair[1]
+        structures.append(structure)
+    return structures
+
+
+class FDLCompiler:
+    def __init__(self):
+        self.blocks: List[FDLBlock] = []
+        self.errors: List[str] = []
+        self.stats = {"parsed": 0, "reused": 0}
+        self._cache: Dict[str, _ParsedSegment] = {}
+
+    # --- разбор ---
+    def _parse_segment(self, lines: List[str]) -> _ParsedSegment:
+        """Разбор и проверка одного блока; координаты относительны началу блока."""
+        block_id = None
+        structure: Dict[str, str] = {}
+        positions: Dict[str, Tuple[int, int]] = {}
+        syntax: List[Tuple[int, int, str]] = []
+        for lexeme in tokenize_block(lines):
+            if lexeme.kind == "header":
+                block_id = lexeme.key
+            elif lexeme.kind == "field":
+                if not lexeme.key:
+                    syntax.append((lexeme.line, lexeme.column, "пустое имя поля"))
+                    continue
+                structure[lexeme.key] = lexeme.value
+                positions[lexeme.key] = (lexeme.line, lexeme.column)
+            elif lexeme.kind == "text":
+                syntax.append((lexeme.line, lexeme.column, f"ожидалось 'поле: значение', получено '{lexeme.value}'"))
+        validation = [(0, len(lines[0]) - len(lines[0].lstrip()) + 1, f"отсутствует поле '{field}'")
+                      for field in REQUIRED_FIELDS if field not in structure]
+        end = (len(lines) - 1, len(lines[-1]) + 1)
+        return _ParsedSegment(block_id, structure, positions, end, syntax, validation)
+
+    def _segment(self, lines: List[str]) -> Tuple[str, _ParsedSegment, bool]:
+        """Разбор блока через кэш по хэшу содержимого: (хэш, результат, был ли разобран заново)."""
+        digest = block_hash(lines)
+        parsed = self._cache.get(digest)
+        if parsed is not None:
+            self.stats["reused"] += 1
+            return digest, parsed, False
+        parsed = self._cache[digest] = self._parse_segment(lines)
+        self.stats["parsed"] += 1
+        return digest, parsed, True
+
+    def _materialize(self, start: int, digest: str, parsed: _ParsedSegment) -> FDLBlock:
+        block_id = parsed.block_id or f"block_{len(self.blocks)}"
+        span = (start + 1, 1, start + parsed.end[0] + 1, parsed.end[1])
+        positions = {key: (start + line + 1, column) for key, (line, column) in parsed.positions.items()}
+        block = FDLBlock(block_id, dict(parsed.structure), span, positions, digest)
+        for line, column, message in parsed.syntax:
+            self.errors.append(self._format_error(block, start + line + 1, column, message))
+        return block
+
+    @staticmethod
+    def _format_error(block: FDLBlock, line: int, column: int, message: str) -> str:
+        return f"{block.block_id} (строка {line}, столбец {column}): {message}"
+
+    @timed("fdl_compiler_phase_seconds", "Длительность фаз FDLCompiler", phase="parse")
+    def parse(self, source: str):
+        """Разбирает исходник на блоки и добавляет их к программе."""
+        for start, lines in split_blocks(source):
+            digest, parsed, _ = self._segment(lines)
+            self.blocks.append(self._materialize(start, digest, parsed))
+
+    @timed("fdl_compiler_phase_seconds", phase="reparse")
+    def reparse(self, source: str) -> List[str]:
+        """
+        Инкрементальный повторный разбор всей программы.
+        Блоки с неизменным хэшем содержимого берутся из кэша без разбора и проверки;
+        разбираются и проверяются только изменённые. Возвращает block_id изменённых блоков.
+        """
+        self.blocks = []
+        self.errors = []
+        changed = []
+        live = set()
+        for start, lines in split_blocks(source):
+            digest, parsed, fresh = self._segment(lines)
+            live.add(digest)
+            block = self._materialize(start, digest, parsed)
+            self.blocks.append(block)
+            if fresh:
+                changed.append(block.block_id)
+        self._cache = {digest: parsed for digest, parsed in self._cache.items() if digest in live}
+        self.validate()
+        return changed
+
+    # --- проверка ---
+    @timed("fdl_compiler_phase_seconds", phase="validate")
+    def validate(self):
+        """
+        Проверка обязательных полей. Ошибки собираются заново с позициями в исходнике;
+        для блоков из кэша используется сохранённый результат проверки.
+        """
+        errors = []
+        for block in self.blocks:
+            parsed = self._cache.get(block.content_hash) if block.content_hash else None
+            if parsed is None or block.span is None:
+                for field in REQUIRED_FIELDS:
+                    if field not in block.structure:
+                        errors.append(f"{block.block_id}: отсутствует поле '{field}'")
+                continue
+            start = block.span[0] - 1
+            for line, column, message in parsed.syntax + parsed.validation:
+                errors.append(self._format_error(block, start + line + 1, column, message))
+        self.errors = errors
+
+    @timed("fdl_compiler_phase_seconds", phase="compile")
+    def compile(self, fmt: str = "json"):
+        """
+        :param fmt: "json" — JSON с отступами; "compact" — JSON без пробелов; "binary" — bytes (decode_binary)
+        """
+        if fmt not in OUTPUT_FORMATS:
+            raise ValueError(f"Неизвестный формат: {fmt}")
+        if self.errors:
+            return None
+        structures = [b.structure for b in self.blocks]
+        if fmt == "compact":
+            return json.dumps(structures, ensure_ascii=False, separators=(",", ":"))
+        if fmt == "binary":
+            return encode_binary(structures)
+        return json.dumps(structures, ensure_ascii=False, indent=2)
+
+    def report(self):
+        if self.errors:
+            return {"status": "ошибки", "errors": self.errors}
+        return {"status": "готово", "blocks": len(self.blocks)}
+
+# Пример использования
+if __name__ == '__main__':
+    source = """
+замысел: протестировать систему
+форма: логический анализ
+поток: от агента к ядру
+сигнал: обратная связь
+отклик: лог печати
+контур: проверка синтаксиса
+"""
+    compiler = FDLCompiler()
+    compiler.parse(source)
+    compiler.validate()
+    result = compiler.compile()
+    print(result if result else compiler.report())
@@ -0,0 +1,360 @@
+# fdl_diagrams.py
+# Σ-FDL::DIAGRAMS
+# Схемы из блокнота NOVEYA_FDL_Deployment_Colab_1 как импортируемый модуль:
+# карта внешних акторов (силовая раскладка на NumPy, тысячи узлов), концентрическая архитектура,
+# Метрополия ↔ Периферия ↔ Третий слой.
+#
+# Схема описывается сценой — словарём примитивов (прямоугольники, окружности, стрелки, отрезки, точки, подписи).
+# Сцена отрисовывается пакетно коллекциями matplotlib (одна коллекция на вид примитива, а не артист на элемент),
+# результат кэшируется на диске по хэшу сцены, SVG сохраняется с текстом вместо контуров глифов и упрощается.
+# Цвета не задаются — используются значения rcParams по умолчанию.
+
+import io
+import math
+import os
+import re
+import shutil
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from fdl_logic_cache import stable_hash
+
+RENDER_VERSION = 1          # меняется при изменении отрисовки — старые записи кэша перестают совпадать
+SEED = 369
+MAX_BLOCK_PAIRS = 1 << 16   # пар узлов на блок отталкивания: память O(блок × n), блок помещается в кэш CPU
+DEFAULT_FORMATS = ("svg", "png")
+# Параметры rcParams, не влияющие на сохранённый файл (окно, клавиши, веб-бэкенд): не входят в ключ кэша
+RC_IGNORED = ("backend", "backend_fallback", "interactive", "toolbar", "timezone", "keymap.", "webagg.")
+
+EXTERNAL_ACTORS = ["States", "MNCs", "Security Blocs", "Banking", "BigTech/AI",
+                   "Intl Funds", "Religious", "Education", "Media", "Civic Networks"]
+CONCENTRIC_LABELS = ["Core: Sense / Ethics",
+                     "Layer II: Institutions / Protocols",
+                     "Layer III: Communities / Economy",
+                     "Layer IV: Third Layer (Digital / AI Bridges)"]
+
+Scene = Dict[str, object]
+Edge = Tuple[Union[int, str], Union[int, str]]
+
+
+# === I. Силовая раскладка ===
+def force_layout(count: int, edges: Sequence[Tuple[int, int]] = (), iterations: int = 150, seed: int = SEED,
+                 fixed: Optional[Dict[int, Tuple[float, float]]] = None, initial: Optional[np.ndarray] = None,
+                 k: Optional[float] = None, tolerance: float = 1e-4) -> np.ndarray:
+    """
+    Fruchterman–Reingold, векторизованно: отталкивание всех пар считается блоками строк
+    (не больше MAX_BLOCK_PAIRS пар за раз), притяжение рёбер — через bincount, без циклов по узлам.
+    fixed — закреплённые узлы {индекс: (x, y)}. Возвращает массив (count, 2) в квадрате [-1, 1].
+    Детерминирована при одинаковых входе и seed.
+    """
+    if count == 0:
+        return np.zeros((0, 2))
+    rng = np.random.default_rng(seed)
+    pos = np.array(initial, dtype=np.float64) if initial is not None else rng.uniform(-1, 1, (count, 2))
+    fixed = fixed or {}
+    pinned = np.zeros(count, dtype=bool)
+    for index, xy in fixed.items():
+        pos[index] = xy
+        pinned[index] = True
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    source, target = edges[:, 0], edges[:, 1]
+    k = k or math.sqrt(4.0 / count)
+    k2 = k * k
+    block = max(1, MAX_BLOCK_PAIRS // count)
+    temperature = 0.2
+    cooling = temperature / (iterations + 1)
+    disp = np.empty_like(pos)
+
+    for _ in range(iterations):
+        disp.fill(0.0)
+        x, y = pos[:, 0], pos[:, 1]
+        for start in range(0, count, block):
+            stop = start + block
+            dx = x[start:stop, None] - x
+            dy = y[start:stop, None] - y
+            weight = dx * dx
+            weight += dy * dy
+            np.maximum(weight, 1e-9, out=weight)
+            np.divide(k2, weight, out=weight)
+            disp[start:stop, 0] += np.einsum("ij,ij->i", dx, weight)
+            disp[start:stop, 1] += np.einsum("ij,ij->i", dy, weight)
+        if len(edges):
+            delta = pos[source] - pos[target]
+            force = delta * (np.sqrt(np.einsum("ij,ij->i", delta, delta)) / k)[:, None]
+            for axis in (0, 1):
+                disp[:, axis] += np.bincount(target, force[:, axis], count) - np.bincount(source, force[:, axis], count)
+        length = np.sqrt(np.einsum("ij,ij->i", disp, disp))
+        step = np.minimum(length, temperature) / np.maximum(length, 1e-12)
+        disp *= step[:, None]
+        disp[pinned] = 0.0
+        pos += disp
+        temperature -= cooling
+        if float(np.max(np.abs(disp))) < tolerance:
+            break
+
+    extent = float(np.max(np.abs(pos))) or 1.0
+    return pos / extent
+
+
+def _resolve_edges(names: Sequence[str], edges: Sequence[Edge]) -> List[Tuple[int, int]]:
+    index = {name: i for i, name in enumerate(names)}
+    return [(index[a] if isinstance(a, str) else int(a), index[b] if isinstance(b, str) else int(b))
+            for a, b in edges]
+
+
+# === II. Сцены ===
+def _scene(size: Tuple[float, float], xlim=None, ylim=None, aspect: Optional[str] = None) -> Scene:
+    return {"size": list(size), "xlim": list(xlim) if xlim else None, "ylim": list(ylim) if ylim else None,
+            "aspect": aspect, "rects": [], "circles": [], "arrows": [], "lines": [], "points": [], "texts": []}
+
+
+def _text(x: float, y: float, text: str, ha: str = "center", va: str = "center",
+          fontsize: Optional[float] = None) -> list:
+    return [x, y, text, ha, va, fontsize]
+
+
+def metropolis_periphery_scene() -> Scene:
+    """FDL: Метрополия ↔ Периферия ↔ Третий слой."""
+    scene = _scene((8, 5), (0, 10), (0, 6))
+    scene["rects"] = [[1, 4.2, 3.2, 1.2], [5.8, 4.2, 3.2, 1.2], [0.6, 0.5, 8.8, 2.8]]
+    scene["arrows"] = [[4.2, 4.8, 5.8, 4.8, "open"], [5.8, 4.6, 4.2, 4.6, "open"],
+                       [2.6, 4.2, 2.6, 3.3, "filled"], [7.4, 4.2, 7.4, 3.3, "filled"]]
+    scene["texts"] = [
+        _text(2.6, 4.8, "Метрополия\nMetropolis"),
+        _text(7.4, 4.8, "Периферия\nPeriphery"),
+        _text(5.0, 1.9, "Третий слой / Third Layer\n(цифровые громады, ИИ-спутники, токены смыслов, мосты)"),
+        _text(2.6, 3.2, "capacities / data / ethics", va="top", fontsize=9),
+        _text(7.4, 3.2, "capacities / culture", va="top", fontsize=9),
+    ]
+    return scene
+
+
+def concentric_scene(labels: Sequence[str] = CONCENTRIC_LABELS, radii: Optional[Sequence[float]] = None) -> Scene:
+    """Концентрическая архитектура: кольцо на слой, подпись у верхней кромки кольца."""
+    radii = list(radii) if radii is not None else [0.8 * (i + 1) for i in range(len(labels))]
+    scene = _scene((5, 5), aspect="equal")
+    scene["circles"] = [[0, 0, r] for r in radii]
+    scene["texts"] = [_text(0, r - 0.35, label, va="bottom", fontsize=9) for r, label in zip(radii, labels)]
+    outer = max(radii, default=1.0) * 1.05
+    scene["xlim"], scene["ylim"] = [-outer, outer], [-outer, outer]
+    return scene
+
+
+def actor_map_scene(actors: Sequence[str] = EXTERNAL_ACTORS, edges: Sequence[Edge] = (),
+                    center: Optional[str] = "System / Field", radius: float = 3.0, iterations: int = 150,
+                    seed: int = SEED, max_labels: int = 200, cache: Optional["RenderCache"] = None) -> Scene:
+    """
+    Карта акторов. Узел center (если задан) закреплён в начале координат и связан со всеми акторами;
+    edges — дополнительные связи (имена или индексы в actors). Раскладка кэшируется в cache.
+    Подписываются max_labels узлов с наибольшей степенью (центр — всегда).
+    """
+    names = ([center] if center else []) + list(actors)
+    offset = 1 if center else 0
+    links = _resolve_edges(names, [(a if isinstance(a, str) else a + offset,
+                                    b if isinstance(b, str) else b + offset) for a, b in edges])
+    if center:
+        links = [(0, i) for i in range(1, len(names))] + links
+    fixed = {0: (0.0, 0.0)} if center else None
+    params = {"count": len(names), "edges": links, "iterations": iterations, "seed": seed, "center": bool(center)}
+    if cache is not None:
+        pos = cache.layout(params, lambda: force_layout(len(names), links, iterations, seed, fixed))
+    else:
+        pos = force_layout(len(names), links, iterations, seed, fixed)
+    pos = np.round(pos * radius, 4)
+
+    scene = _scene((6, 6), aspect="equal")
+    scene["lines"] = np.concatenate([pos[[a for a, _ in links]], pos[[b for _, b in links]]], axis=1).tolist() \
+        if links else []
+    scene["points"] = pos.tolist()
+    degree = np.bincount(np.asarray(links, dtype=np.int64).ravel(), minlength=len(names)) if links \
+        else np.zeros(len(names), dtype=np.int64)
+    order = np.argsort(-degree, kind="stable")[:max_labels]
+    label_offset = 0.2 * radius / 3.0
+    for i in sorted(order.tolist()):
+        x, y = pos[i]
+        if center and i == 0:
+            scene["texts"].append(_text(x, y - 1.5 * label_offset, names[i], va="top"))
+        else:
+            scene["texts"].append(_text(x, y + label_offset, names[i], va="bottom", fontsize=9))
+    span = float(np.max(np.abs(pos))) * 1.15 + label_offset if len(pos) else 1.0
+    scene["xlim"], scene["ylim"] = [-span, span], [-span, span]
+    return scene
+
+
+# === III. Отрисовка ===
+def _arrow_heads(arrows: np.ndarray, size: float) -> np.ndarray:
+    """Треугольники наконечников (n, 3, 2) в координатах данных: острие в конце стрелки."""
+    tip = arrows[:, 2:4]
+    direction = tip - arrows[:, 0:2]
+    direction /= np.maximum(np.linalg.norm(direction, axis=1), 1e-12)[:, None]
+    normal = np.stack([-direction[:, 1], direction[:, 0]], axis=1)
+    base = tip - direction * size
+    return np.stack([tip, base + normal * size * 0.45, base - normal * size * 0.45], axis=1)
+
+
+def draw_scene(scene: Scene):
+    """Figure matplotlib (без pyplot и глобального состояния); примитивы одного вида — одной коллекцией."""
+    from matplotlib.collections import LineCollection, PatchCollection, PolyCollection
+    from matplotlib.figure import Figure
+    from matplotlib.patches import Circle, Rectangle
+    import matplotlib as mpl
+
+    fig = Figure(figsize=tuple(scene["size"]))
+    ax = fig.add_subplot(111)
+    if scene["aspect"]:
+        ax.set_aspect(scene["aspect"])
+    if scene["xlim"]:
+        ax.set_xlim(*scene["xlim"])
+    if scene["ylim"]:
+        ax.set_ylim(*scene["ylim"])
+    ax.axis("off")
+
+    outline = {"facecolor": "none", "edgecolor": mpl.rcParams["patch.edgecolor"]}
+    patches = [Rectangle((x, y), w, h) for x, y, w, h in scene["rects"]]
+    patches += [Circle((x, y), r) for x, y, r in scene["circles"]]
+    if patches:
+        ax.add_collection(PatchCollection(patches, **outline))
+    if scene["lines"]:
+        ax.add_collection(LineCollection(np.asarray(scene["lines"], dtype=float).reshape(-1, 2, 2)))
+    if scene["arrows"]:
+        arrows = np.asarray([a[:4] for a in scene["arrows"]], dtype=float)
+        filled = np.asarray([a[4] == "filled" for a in scene["arrows"]])
+        xlim, ylim = ax.get_xlim(), ax.get_ylim()
+        heads = _arrow_heads(arrows, 0.02 * max(xlim[1] - xlim[0], ylim[1] - ylim[0]))
+        color = mpl.rcParams["patch.edgecolor"]
+        shafts = list(arrows.reshape(-1, 2, 2))
+        # Открытый наконечник «->» — две линии от острия, закрашенный «-|>» — треугольник
+        shafts += [seg for head in heads[~filled] for seg in (head[[1, 0]], head[[0, 2]])]
+        ax.add_collection(LineCollection(shafts, colors=color))
+        if filled.any():
+            ax.add_collection(PolyCollection(heads[filled], facecolors=color, edgecolors=color))
+    if scene["points"]:
+        points = np.asarray(scene["points"], dtype=float)
+        ax.scatter(points[:, 0], points[:, 1], zorder=3)
+    for x, y, text, ha, va, fontsize in scene["texts"]:
+        ax.text(x, y, text, ha=ha, va=va, fontsize=fontsize)
+    if not scene["xlim"] or not scene["ylim"]:
+        ax.autoscale_view()
+    return fig
+
+
+_NUMBER = re.compile(r"-?\d+\.\d+(?:e-?\d+)?")
+_START_TAG = re.compile(r"<[A-Za-z][^>]*>")
+_ATTRIBUTE = re.compile(r'(\s[\w:-]+=")([^"]*)(")')
+
+
+def simplify_svg(svg: str, precision: int = 2) -> str:
+    """
+    Уменьшает SVG без видимых изменений: убирает метаданные, комментарии и отступы,
+    схлопывает пробелы в значениях атрибутов, округляет координаты до precision знаков
+    (в transform — до 5 значащих цифр, чтобы не искажать масштабы). Меняются только атрибуты элементов:
+    XML-декларация (version="1.0") и текстовое содержимое не трогаются.
+    """
+    svg = re.sub(r"<metadata>.*?</metadata>\s*", "", svg, flags=re.S)
+    svg = re.sub(r"<!--.*?-->\s*", "", svg, flags=re.S)
+
+    def coordinate(match):
+        value = round(float(match.group(0)), precision)
+        return f"{value:.{precision}f}".rstrip("0").rstrip(".") if value else "0"
+
+    def significant(match):
+        return f"{float(match.group(0)):.5g}"
+
+    def attribute(match):
+        prefix, value, quote = match.groups()
+        value = " ".join(value.split())
+        value = _NUMBER.sub(significant if prefix.strip().startswith("transform") else coordinate, value)
+        return prefix + value + quote
+
+    svg = _START_TAG.sub(lambda tag: _ATTRIBUTE.sub(attribute, tag.group(0)), svg)
+    return re.sub(r"\n[ \t]+<", "\n<", svg)
+
+
+# === IV. Кэш и сохранение ===
+class RenderCache:
+    """
+    Каталог с готовыми файлами {хэш сцены}.{формат} и раскладками layout-{хэш}.npy.
+    Совпадение хэша означает совпадение сцены, формата, dpi, стиля (rcParams) и RENDER_VERSION —
+    повторная отрисовка не нужна.
+    """
+
+    def __init__(self, directory: str = ".fdl_render_cache"):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, key: str, ext: str) -> str:
+        return os.path.join(self.directory, f"{key}.{ext}")
+
+    def layout(self, params: Dict, compute) -> np.ndarray:
+        path = self.path("layout-" + stable_hash(params), "npy")
+        if os.path.exists(path):
+            self.hits += 1
+            return np.load(path)
+        self.misses += 1
+        pos = compute()
+        tmp_path = path + ".tmp.npy"
+        np.save(tmp_path, pos)
+        os.replace(tmp_path, path)
+        return pos
+
+
+def style_fingerprint() -> Dict[str, str]:
+    """Текущие rcParams (цвета, шрифты, линии, маркеры, savefig.* …) в виде строк — для ключа кэша."""
+    import matplotlib as mpl
+
+    # dict.items: RcParams хранит значения в самом dict, а его __getitem__ проверяет каждый ключ — втрое медленнее
+    return {name: repr(value) for name, value in dict.items(mpl.rcParams) if not name.startswith(RC_IGNORED)}
+
+
+def scene_key(scene: Scene, fmt: str, dpi: int) -> str:
+    return stable_hash({"scene": scene, "format": fmt, "dpi": dpi, "style": style_fingerprint(),
+                        "version": RENDER_VERSION})
+
+
+def render_bytes(scene: Scene, fmt: str, dpi: int = 100, salt: str = "fdl") -> bytes:
+    """Отрисовка сцены в память; SVG — с текстом (svg.fonttype=none), без даты и с детерминированными id."""
+    import matplotlib as mpl
+
+    fig = draw_scene(scene)
+    buffer = io.BytesIO()
+    options = {"svg.fonttype": "none", "svg.hashsalt": salt}
+    metadata = {"Date": None, "Creator": None} if fmt == "svg" else {"Software": None} if fmt == "png" else None
+    with mpl.rc_context(options):
+        fig.savefig(buffer, format=fmt, dpi=dpi, bbox_inches="tight", metadata=metadata)
+    data = buffer.getvalue()
+    if fmt == "svg":
+        data = simplify_svg(data.decode("utf-8")).encode("utf-8")
+    return data
+
+
+def render(scene: Scene, name: str, save_dir: str = ".", formats: Sequence[str] = DEFAULT_FORMATS,
+           dpi: int = 100, cache: Optional[RenderCache] = None) -> List[str]:
+    """
+    Сохраняет сцену как save_dir/name.{формат}. С cache файл берётся из кэша, если сцена не менялась.
+    Возвращает пути сохранённых файлов.
+    """
+    os.makedirs(save_dir, exist_ok=True)
+    paths = []
+    for fmt in formats:
+        out = os.path.join(save_dir, f"{name}.{fmt}")
+        key = scene_key(scene, fmt, dpi)
+        cached = cache.path(key, fmt) if cache is not None else None
+        if cached is not None and os.path.exists(cached):
+            cache.hits += 1
+        else:
+            data = render_bytes(scene, fmt, dpi, salt=key)
+            if cache is not None:
+                cache.misses += 1
+                with open(cached + ".tmp", "wb") as file:
+                    file.write(data)
+                os.replace(cached + ".tmp", cached)
+            else:
+                with open(out, "wb") as file:
+                    file.write(data)
+        if cached is not None:
+            shutil.copyfile(cached, out)
+        paths.append(out)
+    return paths
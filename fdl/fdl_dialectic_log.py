@@ -0,0 +1,193 @@
+# fdl_dialectic_log.py
+# Σ-FDL::DIALECTIC-LOG
+# Ограниченный журнал диалектических шагов (тезис, антитезис, синтез):
+# компактная память с общими (интернированными) строками и вытеснение старых записей в файл-сегмент
+
+import json
+import os
+import tempfile
+from collections import deque
+from typing import Dict, Iterator, Optional, Tuple
+
+ANTITHESIS_TEMPLATE = "Противоположность: не-{thesis}"
+SYNTHESIS_TEMPLATE = "Синтез: соединение ({thesis}) и ({antithesis}) в новой форме."
+DEFAULT_CAPACITY = 10000
+
+Triple = Tuple[str, str, str]
+
+
+def antithesis_of(thesis: str) -> str:
+    return ANTITHESIS_TEMPLATE.format(thesis=thesis)
+
+
+def synthesis_of(thesis: str, antithesis: str) -> str:
+    return SYNTHESIS_TEMPLATE.format(thesis=thesis, antithesis=antithesis)
+
+
+class DialecticalLog:
+    """
+    Последние capacity записей хранятся в памяти; более старые дописываются в сегмент segment_path
+    (JSON Lines, только добавление). Без segment_path при первом вытеснении создаётся временный
+    файл-сегмент (его путь — в segment_path): история не теряется, пока журнал открыт;
+    временный сегмент принадлежит журналу и удаляется в close() (или при сборке мусора).
+    Стандартная запись (антитезис и синтез по шаблонам) хранится одним тезисом и восстанавливается
+    при чтении; одинаковые строки в памяти разделяют один объект (счётчик ссылок на каждую).
+    Итерация, len() и search() охватывают оба уровня; порядок — от старых к новым.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, segment_path: Optional[str] = None,
+                 flush_every: int = 256):
+        if capacity <= 0:
+            raise ValueError("capacity должен быть > 0")
+        self.capacity = capacity
+        self.segment_path = segment_path
+        self.flush_every = flush_every
+        self._entries: deque = deque()          # (тезис, антитезис | None, синтез | None)
+        self._pool: Dict[str, list] = {}        # строка -> [общий объект, число ссылок]
+        self._pending = []                      # строки сегмента, ещё не записанные на диск
+        self.spilled = 0
+        self._owns_segment = False              # сегмент создан журналом (mkstemp) и удаляется им же
+        if segment_path and os.path.exists(segment_path):
+            with open(segment_path, "rb") as file:
+                self.spilled = sum(1 for _ in file)
+
+    # --- интернирование ---
+    def _acquire(self, text: str) -> str:
+        slot = self._pool.get(text)
+        if slot is None:
+            slot = self._pool[text] = [text, 0]
+        slot[1] += 1
+        return slot[0]
+
+    def _release(self, text: Optional[str]):
+        if text is None:
+            return
+        slot = self._pool[text]
+        slot[1] -= 1
+        if not slot[1]:
+            del self._pool[text]
+
+    # --- запись ---
+    def append(self, thesis: str, antithesis: Optional[str] = None, synthesis: Optional[str] = None) -> Triple:
+        """Добавляет шаг; недостающие антитезис/синтез строятся по шаблонам. Возвращает полную тройку."""
+        standard_antithesis = antithesis_of(thesis)
+        antithesis = standard_antithesis if antithesis is None else antithesis
+        standard_synthesis = synthesis_of(thesis, antithesis)
+        synthesis = standard_synthesis if synthesis is None else synthesis
+        compact = (
+            self._acquire(thesis),
+            None if antithesis == standard_antithesis else self._acquire(antithesis),
+            None if synthesis == standard_synthesis else self._acquire(synthesis),
+        )
+        self._entries.append(compact)
+        if len(self._entries) > self.capacity:
+            self._spill(self._entries.popleft())
+        return thesis, antithesis, synthesis
+
+    def _spill(self, compact):
+        thesis, antithesis, synthesis = compact
+        if not self.segment_path:
+            descriptor, self.segment_path = tempfile.mkstemp(prefix="fdl-dialectic-", suffix=".jsonl")
+            os.close(descriptor)
+            self._owns_segment = True
+        record = {"t": thesis}
+        if antithesis is not None:
+            record["a"] = antithesis
+        if synthesis is not None:
+            record["s"] = synthesis
+        self._pending.append(json.dumps(record, ensure_ascii=False) + "\n")
+        self.spilled += 1
+        if len(self._pending) >= self.flush_every:
+            self.flush()
+        for text in compact:
+            self._release(text)
+
+    def flush(self):
+        """Дописывает вытесненные записи в сегмент."""
+        if self._pending:
+            with open(self.segment_path, "a", encoding="utf-8") as file:
+                file.write("".join(self._pending))
+            self._pending.clear()
+
+    # --- чтение ---
+    @staticmethod
+    def _expand(thesis: str, antithesis: Optional[str], synthesis: Optional[str]) -> Triple:
+        if antithesis is None:
+            antithesis = antithesis_of(thesis)
+        if synthesis is None:
+            synthesis = synthesis_of(thesis, antithesis)
+        return thesis, antithesis, synthesis
+
+    def _iter_segment(self) -> Iterator[Triple]:
+        if not self.segment_path:
+            return
+        self.flush()
+        if not os.path.exists(self.segment_path):
+            return
+        with open(self.segment_path, "r", encoding="utf-8") as file:
+            for line in file:
+                record = json.loads(line)
+                yield self._expand(record["t"], record.get("a"), record.get("s"))
+
+    def __iter__(self) -> Iterator[Triple]:
+        yield from self._iter_segment()
+        for compact in list(self._entries):
+            yield self._expand(*compact)
+
+    def __len__(self) -> int:
+        return self.spilled + len(self._entries)
+
+    def __getitem__(self, index: int) -> Triple:
+        """Записи в памяти — напрямую; вытесненные — последовательным чтением сегмента."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        if index >= self.spilled:
+            return self._expand(*self._entries[index - self.spilled])
+        for position, triple in enumerate(self._iter_segment()):
+            if position == index:
+                return triple
+        raise IndexError(index)
+
+    def recent(self, count: int) -> Iterator[Triple]:
+        """Последние count записей из памяти (без чтения диска)."""
+        entries = self._entries
+        for offset in range(max(0, len(entries) - count), len(entries)):
+            yield self._expand(*entries[offset])
+
+    def search(self, query: str, limit: Optional[int] = None) -> Iterator[Tuple[int, Triple]]:
+        """(номер записи, тройка), где query встречается в тезисе, антитезисе или синтезе; по всем уровням."""
+        found = 0
+        for position, triple in enumerate(self):
+            if query in triple[0] or query in triple[1] or query in triple[2]:
+                yield position, triple
+                found += 1
+                if limit is not None and found >= limit:
+                    return
+
+    def memory_strings(self) -> int:
+        """Число различных строк, удерживаемых в памяти."""
+        return len(self._pool)
+
+    def _remove_owned_segment(self):
+        if self._owns_segment:
+            self._owns_segment = False
+            try:
+                os.remove(self.segment_path)
+            except FileNotFoundError:
+                pass
+
+    def close(self):
+        """Сегмент по segment_path дописывается; временный сегмент удаляется вместе с вытесненными записями."""
+        if self._owns_segment:
+            self._pending.clear()
+            self._remove_owned_segment()
+            self.segment_path = None
+            self.spilled = 0
+        else:
+            self.flush()
+
+    def __del__(self):
+        if getattr(self, "_owns_segment", False):
+            self._remove_owned_segment()
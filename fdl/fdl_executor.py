@@ -0,0 +1,148 @@
+# fdl_executor.py
+# Σ-FDL::EXECUTOR
+# Исполнительный слой FDLInterfaceProtocol: асинхронные фильтры и обработчики, пул для CPU-логик,
+# лимиты параллельности и таймауты по агентам, пакетная маршрутизация route_many
+
+import asyncio
+import functools
+import inspect
+import weakref
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from fdl_metrics import METRICS, timed
+
+DEFAULT_AGENT_LIMIT = 4
+
+# Гистограммы METRICS.timer регистрируются с описанием здесь: модуль импортирует и FDLInterfaceProtocol
+METRICS.histogram("fdl_invoke_logic_seconds", "Длительность вызова логики FDL")
+METRICS.histogram("fdl_route_agent_seconds", "Длительность обработки запроса агентом")
+
+
+class FDLExecutor:
+    """
+    Выполняет фильтры, логики и агентов протокола без блокировки друг другом.
+    - корутинные обработчики ожидаются напрямую, синхронные уходят в пул потоков;
+    - логики из cpu_bound выполняются в пуле процессов (обработчик должен быть picklable);
+    - у каждого агента свой семафор (agent_limits / default_agent_limit) и таймаут;
+    - route_many раздаёт запросы по агентам одновременно и возвращает результаты в исходном порядке.
+    Таймаут прекращает ожидание; синхронный обработчик в потоке при этом досчитывает в фоне.
+    """
+
+    def __init__(self, protocol, max_workers: int = 8, process_workers: Optional[int] = None,
+                 default_timeout: Optional[float] = None, agent_timeouts: Optional[Dict[str, float]] = None,
+                 agent_limits: Optional[Dict[str, int]] = None, default_agent_limit: int = DEFAULT_AGENT_LIMIT,
+                 cpu_bound: Iterable[str] = ()):
+        self.protocol = protocol
+        self.default_timeout = default_timeout
+        self.agent_timeouts = dict(agent_timeouts or {})
+        self.agent_limits = dict(agent_limits or {})
+        self.default_agent_limit = default_agent_limit
+        self.cpu_bound: Set[str] = set(cpu_bound)
+        self._threads = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fdl-exec")
+        self._process_workers = process_workers
+        self._processes: Optional[ProcessPoolExecutor] = None
+        # Семафоры привязаны к циклу событий: свой набор на каждый цикл
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = \
+            weakref.WeakKeyDictionary()
+
+    # --- пулы ---
+    def _pool(self, cpu_bound: bool) -> Executor:
+        if not cpu_bound:
+            return self._threads
+        if self._processes is None:
+            self._processes = ProcessPoolExecutor(max_workers=self._process_workers)
+        return self._processes
+
+    async def _call(self, fn, arg, cpu_bound: bool = False):
+        if inspect.iscoroutinefunction(fn):
+            return await fn(arg)
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self._pool(cpu_bound), functools.partial(fn, arg))
+        if inspect.isawaitable(result):
+            return await result
+        return result
+
+    def _semaphore(self, agent_id: str) -> asyncio.Semaphore:
+        per_loop = self._semaphores.setdefault(asyncio.get_running_loop(), {})
+        semaphore = per_loop.get(agent_id)
+        if semaphore is None:
+            semaphore = per_loop[agent_id] = asyncio.Semaphore(
+                self.agent_limits.get(agent_id, self.default_agent_limit))
+        return semaphore
+
+    # --- операции протокола ---
+    @timed("fdl_interpret_input_seconds", "Длительность цепочки protective_filters")
+    async def interpret_input(self, input_data):
+        """
+        Цепочка protective_filters: каждый фильтр получает результат предыдущего.
+        Синхронные фильтры идут в пул потоков: медленный фильтр не держит цикл событий и другие запросы.
+        """
+        for filter_fn in self.protocol.protective_filters:
+            input_data = await self._call(filter_fn, input_data)
+        return input_data
+
+    async def invoke_logic(self, logic_id: str, data, timeout: Optional[float] = None):
+        if logic_id not in self.protocol.fdl_logics:
+            raise ValueError("Неизвестная логика")
+        fn, cpu_bound = self.protocol.fdl_logics[logic_id], logic_id in self.cpu_bound
+        cache = self.protocol.logic_caches.get(logic_id)
+        if cache is not None:
+            call = cache.call_async(data, lambda arg: self._call(fn, arg, cpu_bound))
+        else:
+            call = self._call(fn, data, cpu_bound)
+        if timeout is None:
+            timeout = self.default_timeout
+        with METRICS.timer("fdl_invoke_logic_seconds", logic=logic_id):
+            return await self._with_timeout(call, timeout, f"Логика {logic_id}")
+
+    async def route_agent(self, agent_id: str, query, timeout: Optional[float] = None):
+        if agent_id not in self.protocol.active_agents:
+            raise ValueError("Неизвестный агент")
+        if timeout is None:
+            timeout = self.agent_timeouts.get(agent_id, self.default_timeout)
+        async with self._semaphore(agent_id):
+            call = self._call(self.protocol.active_agents[agent_id], query)
+            with METRICS.timer("fdl_route_agent_seconds", agent=agent_id):
+                return await self._with_timeout(call, timeout, f"Агент {agent_id}")
+
+    @staticmethod
+    async def _with_timeout(call, timeout: Optional[float], label: str):
+        if timeout is None:
+            return await call
+        try:
+            return await asyncio.wait_for(call, timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"{label}: превышено время ожидания {timeout} с") from None
+
+    async def route_many(self, requests: Sequence[Tuple[str, Any]], filter_input: bool = True,
+                         return_exceptions: bool = True) -> List[Any]:
+        """
+        :param requests: [(agent_id, query), ...]
+        :param filter_input: пропускать запросы через protective_filters перед агентом
+        :return: результаты в порядке requests; ошибки — объектами исключений (return_exceptions=True)
+        """
+        async def one(agent_id: str, query):
+            if filter_input:
+                query = await self.interpret_input(query)
+            return await self.route_agent(agent_id, query)
+
+        return await asyncio.gather(*(one(agent_id, query) for agent_id, query in requests),
+                                    return_exceptions=return_exceptions)
+
+    async def invoke_many(self, requests: Sequence[Tuple[str, Any]], return_exceptions: bool = True) -> List[Any]:
+        """Пакетный вызов логик [(logic_id, data), ...] с результатами в исходном порядке."""
+        return await asyncio.gather(*(self.invoke_logic(logic_id, data) for logic_id, data in requests),
+                                    return_exceptions=return_exceptions)
+
+    def close(self):
+        self._threads.shutdown(wait=False, cancel_futures=True)
+        if self._processes is not None:
+            self._processes.shutdown(wait=False, cancel_futures=True)
+            self._processes = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
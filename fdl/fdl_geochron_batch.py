@@ -0,0 +1,160 @@
+# fdl_geochron_batch.py
+
+"""
+Σ-FDL::GeoChron ⧗ BATCH
+
+Пакетная резонансная корреляция: тысячи событий против временного ряда вспышек
+за один векторизованный проход NumPy.
+- категории кодируются по порядку tokendict (-1 — вне словаря);
+- вспышка M/X засчитывается событию, если случилась в пределах window_days от его даты;
+- фазы луны вычисляются локально одним проходом по уникальным датам;
+- строки деталей собираются лениво — только для событий, которые выводятся.
+"""
+
+import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+from fdl_geochron_lunar import lunar_phases
+
+STRONG_FLARE_CLASSES = ("M", "X")
+STRONG_LUNAR_PHASES = ("New Moon", "Full Moon")
+RESONANCE_THRESHOLD = 3
+UNIX_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+SOLAR_WEIGHT, LUNAR_WEIGHT, TOKEN_WEIGHT = 2, 1, 2
+
+LunarSource = Union[Callable[[datetime.date], str], Sequence[str], None]
+
+
+def flare_class(flare: Dict) -> str:
+    """Класс вспышки: classType (снимок) или первая буква max_class / current_class (ленты GOES)."""
+    value = flare.get("classType") or flare.get("max_class") or flare.get("current_class") or ""
+    return value[:1].upper()
+
+
+def flare_day(flare: Dict) -> Optional[str]:
+    stamp = flare.get("max_time") or flare.get("begin_time") or flare.get("time_tag")
+    return stamp[:10] if stamp else None
+
+
+def strong_flare_days(flares: Iterable[Dict]) -> np.ndarray:
+    """Отсортированные уникальные дни (от 1970-01-01) со вспышками класса M/X."""
+    days = [day for day in (flare_day(f) for f in flares if flare_class(f) in STRONG_FLARE_CLASSES) if day]
+    if not days:
+        return np.empty(0, dtype=np.int64)
+    return np.unique(np.array(days, dtype="datetime64[D]").astype(np.int64))
+
+
+def event_days(events: Sequence) -> np.ndarray:
+    """Даты событий как дни от 1970-01-01 (toordinal быстрее, чем разбор date в datetime64)."""
+    return np.fromiter((e.date.toordinal() for e in events), dtype=np.int64, count=len(events)) - UNIX_ORDINAL
+
+
+def near_days(days: np.ndarray, targets: np.ndarray, window_days: int) -> np.ndarray:
+    """Маска: для каждого дня из days есть день из targets (отсортированных) на расстоянии ≤ window_days."""
+    if not len(targets) or not len(days):
+        return np.zeros(len(days), dtype=bool)
+    pos = np.searchsorted(targets, days)
+    after = targets[np.minimum(pos, len(targets) - 1)]
+    before = targets[np.maximum(pos - 1, 0)]
+    return (np.abs(after - days) <= window_days) | (np.abs(days - before) <= window_days)
+
+
+def category_codes(events: Sequence, tokendict: Dict[str, str]) -> np.ndarray:
+    """Код категории = позиция в tokendict; -1 — категория без смысловой привязки."""
+    table = {name: code for code, name in enumerate(tokendict)}
+    categories, inverse = np.unique(np.array([e.category for e in events], dtype=object).astype(str),
+                                    return_inverse=True)
+    lookup = np.array([table.get(c, -1) for c in categories], dtype=np.int16)
+    return lookup[inverse.reshape(-1)]
+
+
+def lunar_phase_array(days: np.ndarray, lunar: LunarSource) -> np.ndarray:
+    """
+    Фазы луны по событиям: готовая последовательность, вызов lunar(date) на уникальную дату
+    или (lunar=None) векторизованный расчёт fdl_geochron_lunar.
+    """
+    if lunar is not None and not callable(lunar):
+        phases = np.asarray(lunar, dtype=object)
+        if len(phases) != len(days):
+            raise ValueError("Число фаз луны не совпадает с числом событий")
+        return phases
+    unique, inverse = np.unique(days, return_inverse=True)
+    dates = unique.astype("datetime64[D]").astype(datetime.date)
+    if lunar is None:
+        phases, _ = lunar_phases(dates)
+    else:
+        phases = np.array([lunar(d) for d in dates], dtype=object)
+    return phases[inverse.reshape(-1)]
+
+
+class ResonanceBatch:
+    """
+    Результат пакетной корреляции: массивы score / resonance и флаги вкладов.
+    details(i) и render() собирают текст только по запросу.
+    """
+
+    def __init__(self, events: Sequence, tokens: Sequence[str], codes: np.ndarray, solar: np.ndarray,
+                 lunar: np.ndarray, phases: np.ndarray):
+        self.events = events
+        self.tokens = tuple(tokens)
+        self.codes = codes
+        self.solar = solar
+        self.lunar = lunar
+        self.phases = phases
+        self.scores = (SOLAR_WEIGHT * solar + LUNAR_WEIGHT * lunar + TOKEN_WEIGHT * (codes >= 0)).astype(np.int8)
+        self.resonance = self.scores >= RESONANCE_THRESHOLD
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def resonant(self) -> np.ndarray:
+        """Индексы резонансных событий."""
+        return np.flatnonzero(self.resonance)
+
+    def details(self, index: int) -> List[str]:
+        details = []
+        if self.solar[index]:
+            details.append("☀️ Солнечная активность: повышенная")
+        if self.lunar[index]:
+            details.append("🌑 Фаза луны: сильное влияние")
+        if self.codes[index] >= 0:
+            details.append(f"🔑 Смысловая привязка: {self.tokens[self.codes[index]]}")
+        return details
+
+    def report(self, index: int) -> Dict:
+        """Та же форма, что у ResonanceMatrix.correlate()."""
+        return {"score": int(self.scores[index]), "resonance": bool(self.resonance[index]),
+                "details": self.details(index)}
+
+    def render(self, indices: Optional[Iterable[int]] = None) -> Iterator[Dict]:
+        """Отчёты по выбранным событиям (по умолчанию — только резонансным)."""
+        for index in self.resonant() if indices is None else indices:
+            yield dict(self.report(int(index)), event=self.events[int(index)])
+
+    def summary(self) -> Dict:
+        return {
+            "events": len(self),
+            "resonant": int(self.resonance.sum()),
+            "solar": int(self.solar.sum()),
+            "lunar": int(self.lunar.sum()),
+            "mean_score": float(self.scores.mean()) if len(self) else 0.0,
+        }
+
+
+def correlate_events(events: Sequence, flares: Iterable[Dict], tokendict: Dict[str, str],
+                     lunar: LunarSource = None, window_days: int = 0) -> ResonanceBatch:
+    """
+    :param events: последовательность Event
+    :param flares: временной ряд вспышек (записи лент GOES или снимки с classType)
+    :param lunar: фаза на дату (callable) или готовые фазы по событиям; None — локальный расчёт
+    :param window_days: допуск между датой события и днём вспышки
+    """
+    events = list(events)
+    days = event_days(events)
+    solar = near_days(days, strong_flare_days(flares), window_days)
+    phases = lunar_phase_array(days, lunar)
+    lunar_mask = np.isin(phases.astype(str), STRONG_LUNAR_PHASES) if len(phases) else np.zeros(0, dtype=bool)
+    codes = category_codes(events, tokendict) if events else np.empty(0, dtype=np.int16)
+    return ResonanceBatch(events, list(tokendict.values()), codes, solar, lunar_mask, phases)
@@ -0,0 +1,219 @@
+# fdl_geochron_fetch.py
+
+"""
+Σ-FDL::GeoChron ⧗ FETCH
+
+Слой получения данных для AstroParser:
+- пул соединений (requests.Session + HTTPAdapter) и таймауты;
+- TTL-кэш в памяти и на диске с условными запросами (ETag / Last-Modified → 304);
+- асинхронная выборка нескольких лент SWPC одновременно (asyncio);
+- локальный бэкенд фикстур для работы офлайн и в тестах.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+SWPC_BASE_URL = "https://services.swpc.noaa.gov/json/"
+SWPC_FEEDS = {
+    "xray_flares_latest": "goes/primary/xray-flares-latest.json",
+    "xray_flares_7day": "goes/primary/xray-flares-7-day.json",
+    "kp_index": "planetary_k_index_1m.json",
+    "solar_probabilities": "solar_probabilities.json",
+}
+
+
+class FetchResponse(NamedTuple):
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+
+
+# === I. Бэкенды ===
+class RequestsBackend:
+    """HTTP через общий requests.Session с пулом соединений и повторными попытками."""
+
+    def __init__(self, pool_size: int = 8, retries: int = 2):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, url: str, headers: Dict[str, str], timeout: float) -> FetchResponse:
+        resp = self.session.get(url, headers=headers, timeout=timeout)
+        return FetchResponse(resp.status_code, dict(resp.headers), resp.content)
+
+    def close(self):
+        self.session.close()
+
+
+class FixtureBackend:
+    """
+    Локальные фикстуры вместо сети: {url или относительный путь ленты: данные}
+    и/или каталог, где путь ленты отображается в файл. Отдаёт ETag и отвечает 304 на If-None-Match.
+    """
+
+    def __init__(self, fixtures: Optional[Dict[str, object]] = None, directory: Optional[str] = None,
+                 base_url: str = SWPC_BASE_URL):
+        self.fixtures = dict(fixtures or {})
+        self.directory = directory
+        self.base_url = base_url
+        self.requests: List[str] = []
+
+    def _load(self, url: str) -> Optional[bytes]:
+        relative = url[len(self.base_url):] if url.startswith(self.base_url) else url
+        for key in (url, relative):
+            if key in self.fixtures:
+                data = self.fixtures[key]
+                return data if isinstance(data, bytes) else json.dumps(data, ensure_ascii=False).encode("utf-8")
+        if self.directory:
+            path = os.path.join(self.directory, relative)
+            if os.path.exists(path):
+                with open(path, "rb") as file:
+                    return file.read()
+        return None
+
+    def get(self, url: str, headers: Dict[str, str], timeout: float) -> FetchResponse:
+        self.requests.append(url)
+        body = self._load(url)
+        if body is None:
+            return FetchResponse(404, {}, b"")
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if headers.get("If-None-Match") == etag:
+            return FetchResponse(304, {"ETag": etag}, b"")
+        return FetchResponse(200, {"ETag": etag}, body)
+
+    def close(self):
+        pass
+
+
+# === II. TTL-кэш ===
+class FetchCache:
+    """
+    Кэш ответов: запись = тело, ETag, Last-Modified, время получения.
+    Хранится в памяти и (если задан cache_dir) в JSON-файлах на диске, переживая перезапуск.
+    """
+
+    def __init__(self, ttl: float = 300.0, cache_dir: Optional[str] = None):
+        self.ttl = ttl
+        self.cache_dir = cache_dir
+        self._memory: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, url: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._memory.get(url)
+        if entry is None and self.cache_dir and os.path.exists(self._path(url)):
+            with open(self._path(url), "r", encoding="utf-8") as file:
+                entry = json.load(file)
+            with self._lock:
+                self._memory[url] = entry
+        return entry
+
+    def put(self, url: str, body: str, headers: Dict[str, str]):
+        entry = {
+            "body": body,
+            "etag": headers.get("ETag") or headers.get("etag"),
+            "last_modified": headers.get("Last-Modified") or headers.get("last-modified"),
+            "fetched_at": time.time(),
+        }
+        self._store(url, entry)
+
+    def touch(self, url: str, entry: Dict):
+        """Ответ 304: данные прежние, отсчёт TTL начинается заново."""
+        self._store(url, dict(entry, fetched_at=time.time()))
+
+    def _store(self, url: str, entry: Dict):
+        with self._lock:
+            self._memory[url] = entry
+        if self.cache_dir:
+            tmp_path = self._path(url) + f".{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(entry, file, ensure_ascii=False)
+            os.replace(tmp_path, self._path(url))
+
+    def fresh(self, entry: Dict) -> bool:
+        return time.time() - entry["fetched_at"] < self.ttl
+
+
+# === III. Клиент лент SWPC ===
+class SolarFeedClient:
+    """
+    Получение JSON-лент SWPC через кэш и выбранный бэкенд.
+    Свежая запись кэша отдаётся без сети; устаревшая перепроверяется условным запросом.
+    """
+
+    def __init__(self, backend=None, base_url: str = SWPC_BASE_URL, ttl: float = 300.0,
+                 cache_dir: Optional[str] = None, timeout: float = 10.0, max_concurrency: int = 8):
+        self.backend = backend or RequestsBackend(pool_size=max_concurrency)
+        self.base_url = base_url
+        self.cache = FetchCache(ttl, cache_dir)
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+
+    def url(self, feed: str) -> str:
+        path = SWPC_FEEDS.get(feed, feed)
+        return path if path.startswith(("http://", "https://")) else self.base_url + path
+
+    def get_json(self, feed: str):
+        """Лента по имени из SWPC_FEEDS или по относительному пути; при сбое сети — последняя копия из кэша."""
+        url = self.url(feed)
+        entry = self.cache.get(url)
+        if entry and self.cache.fresh(entry):
+            return json.loads(entry["body"])
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        try:
+            resp = self.backend.get(url, headers, self.timeout)
+        except requests.RequestException:
+            if entry:
+                return json.loads(entry["body"])
+            raise
+        if resp.status == 304 and entry:
+            self.cache.touch(url, entry)
+            return json.loads(entry["body"])
+        if resp.status != 200:
+            if entry:
+                return json.loads(entry["body"])
+            raise requests.HTTPError(f"{url}: HTTP {resp.status}")
+        body = resp.body.decode("utf-8")
+        data = json.loads(body)                     # битый ответ не вытесняет рабочую копию из кэша
+        self.cache.put(url, body, resp.headers)
+        return data
+
+    async def get_json_async(self, feed: str):
+        return await asyncio.to_thread(self.get_json, feed)
+
+    async def fetch_many(self, feeds: Iterable[str]) -> Dict[str, object]:
+        """Параллельная выборка нескольких лент; ошибка отдельной ленты возвращается как {"error": ...}."""
+        feeds = list(feeds)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def one(feed: str):
+            async with semaphore:
+                try:
+                    return await self.get_json_async(feed)
+                except Exception as e:
+                    return {"error": str(e)}
+
+        results = await asyncio.gather(*(one(feed) for feed in feeds))
+        return dict(zip(feeds, results))
+
+    def close(self):
+        self.backend.close()
@@ -0,0 +1,85 @@
+# fdl_geochron_lunar.py
+
+"""
+Σ-FDL::GeoChron ⧗ LUNA
+
+Локальное вычисление фазы луны без сети (Meeus, «Astronomical Algorithms», гл. 48,
+упрощённые ряды: точность освещённости ~1%, момента фазы — порядка часа).
+- векторизовано по диапазонам дат (NumPy);
+- одиночные даты мемоизируются по дню;
+- результат: название фазы и доля освещённого диска 0.0–1.0.
+"""
+
+import datetime
+import functools
+from typing import NamedTuple, Sequence, Tuple, Union
+
+import numpy as np
+
+PHASE_NAMES = (
+    "New Moon", "Waxing Crescent", "First Quarter", "Waxing Gibbous",
+    "Full Moon", "Waning Gibbous", "Last Quarter", "Waning Crescent",
+)
+UNIX_EPOCH_JD = 2440587.5   # юлианская дата 1970-01-01 00:00 UTC
+J2000_JD = 2451545.0
+UNIX_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+DateLike = Union[datetime.date, datetime.datetime]
+
+
+class LunarPhase(NamedTuple):
+    name: str
+    illumination: float   # доля освещённого диска
+    elongation: float     # градусы 0–360: <180 — растущая луна
+
+
+def elongation_and_illumination(days: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    days — дни от 1970-01-01 UTC (дробные допустимы; для дат берётся полдень).
+    Возвращает (элонгация в градусах 0–360, освещённость 0–1).
+    """
+    t = (np.asarray(days, dtype=np.float64) + UNIX_EPOCH_JD - J2000_JD) / 36525.0
+    d = np.radians((297.8501921 + 445267.1114034 * t - 0.0018819 * t ** 2) % 360.0)  # элонгация Луны
+    m = np.radians((357.5291092 + 35999.0502909 * t - 0.0001536 * t ** 2) % 360.0)   # аномалия Солнца
+    mp = np.radians((134.9633964 + 477198.8675055 * t + 0.0087414 * t ** 2) % 360.0)  # аномалия Луны
+    phase_angle = (180.0 - np.degrees(d)
+                   - 6.289 * np.sin(mp) + 2.100 * np.sin(m) - 1.274 * np.sin(2 * d - mp)
+                   - 0.658 * np.sin(2 * d) - 0.214 * np.sin(2 * mp) - 0.110 * np.sin(d))
+    illumination = (1.0 + np.cos(np.radians(phase_angle))) / 2.0
+    elongation = (180.0 - phase_angle) % 360.0
+    return elongation, illumination
+
+
+def phase_codes(elongation: np.ndarray) -> np.ndarray:
+    """Индекс в PHASE_NAMES: восемь секторов по 45°, центрированных на главных фазах."""
+    return (((np.asarray(elongation) + 22.5) % 360.0) // 45.0).astype(np.int8)
+
+
+def _days(dates: Sequence[DateLike]) -> np.ndarray:
+    return np.fromiter((d.toordinal() for d in dates), dtype=np.int64, count=len(dates)) - UNIX_ORDINAL
+
+
+def lunar_phases(dates: Sequence[DateLike]) -> Tuple[np.ndarray, np.ndarray]:
+    """Фазы на полдень UTC каждой даты: (массив названий, массив освещённости)."""
+    elongation, illumination = elongation_and_illumination(_days(dates) + 0.5)
+    return np.array(PHASE_NAMES, dtype=object)[phase_codes(elongation)], illumination
+
+
+def lunar_phase_range(start: datetime.date, end: datetime.date) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Фазы для каждого дня [start, end): (даты datetime64[D], названия, освещённость)."""
+    first, last = start.toordinal() - UNIX_ORDINAL, end.toordinal() - UNIX_ORDINAL
+    days = np.arange(first, max(first, last), dtype=np.int64)
+    elongation, illumination = elongation_and_illumination(days + 0.5)
+    names = np.array(PHASE_NAMES, dtype=object)[phase_codes(elongation)]
+    return days.astype("datetime64[D]"), names, illumination
+
+
+@functools.lru_cache(maxsize=65536)
+def _phase_for_day(ordinal: int) -> LunarPhase:
+    elongation, illumination = elongation_and_illumination(np.array([ordinal - UNIX_ORDINAL + 0.5]))
+    return LunarPhase(PHASE_NAMES[int(phase_codes(elongation)[0])], float(illumination[0]), float(elongation[0]))
+
+
+def lunar_phase(date: DateLike) -> LunarPhase:
+    """Фаза на дату (мемоизация по дню)."""
+    return _phase_for_day(date.toordinal())
@@ -11,24 +11,53 @@
 """
 
 import datetime
-import requests
 import json
 from typing import List, Dict, Optional
 
+from fdl_async import run_sync
+from fdl_geochron_fetch import SWPC_BASE_URL, SolarFeedClient
+from fdl_geochron_lunar import LunarPhase, lunar_phase, lunar_phase_range
+from fdl_geochron_signals import BioSignalStore
+
 # === I. Astro Layer ===
 class AstroParser:
-    def __init__(self):
-        self.api_url = "https://services.swpc.noaa.gov/json/"
+    def __init__(self, client: Optional[SolarFeedClient] = None):
+        """
+        :param client: клиент лент SWPC (пул соединений, таймауты, TTL-кэш);
+                       для офлайн-работы — SolarFeedClient(backend=FixtureBackend(...))
+        """
+        self.api_url = SWPC_BASE_URL
+        self.client = client or SolarFeedClient(base_url=self.api_url)
 
     def fetch_solar_data(self) -> Dict:
         try:
-            resp = requests.get(self.api_url + "goes/primary/xray-flares-latest.json")
-            return resp.json()[0] if resp.status_code == 200 else {}
+            data = self.client.get_json("xray_flares_latest")
+            return data[0] if data else {}
         except Exception as e:
             return {"error": str(e)}
 
+    def fetch_feeds(self, feeds: List[str]) -> Dict[str, object]:
+        """
+        Одновременная выборка нескольких лент SWPC (имена из SWPC_FEEDS или пути).
+        Работает и внутри цикла событий (Colab/Jupyter); там удобнее await fetch_feeds_async(...).
+        """
+        return run_sync(self.client.fetch_many(feeds))
+
+    async def fetch_feeds_async(self, feeds: List[str]) -> Dict[str, object]:
+        """Асинхронный вариант fetch_feeds для кода, уже работающего в цикле событий."""
+        return await self.client.fetch_many(feeds)
+
     def fetch_lunar_phase(self, date: datetime.date) -> str:
-        return "Waning Crescent"  # TODO: добавить API поддержки лунного цикла
+        """Название фазы луны на дату — вычисляется локально, без сети."""
+        return lunar_phase(date).name
+
+    def lunar_phase(self, date: datetime.date) -> LunarPhase:
+        """Фаза луны на дату: название, освещённость 0.0–1.0 и элонгация."""
+        return lunar_phase(date)
+
+    def lunar_phases(self, start: datetime.date, end: datetime.date):
+        """Фазы для каждого дня [start, end) одним векторизованным проходом: (даты, названия, освещённость)."""
+        return lunar_phase_range(start, end)
 
 
 # === II. GeoPoli-Layer ===
@@ -49,6 +78,10 @@ class BioSignal:
         self.unit = unit
         self.timestamp = timestamp
 
+    def record(self, store: BioSignalStore):
+        """Запись отсчёта в кольцевое хранилище серий (см. fdl_geochron_signals)."""
+        return store.ingest(self)
+
 
 # === IV. Resonance Core (FDL Mapping) ===
 class ResonanceMatrix:
@@ -78,28 +111,59 @@ class ResonanceMatrix:
         resonance = score >= 3
         return {"score": score, "resonance": resonance, "details": details}
 
+    def correlate_batch(self, events: List[Event], flares: List[Dict], lunar=None, window_days: int = 0):
+        """
+        Векторизованная корреляция множества событий с временным рядом вспышек (NumPy).
+        :param lunar: фаза на дату (callable) или фазы по событиям; по умолчанию вычисляется локально
+        :return: ResonanceBatch — массивы scores / resonance, детали строятся по запросу
+        """
+        from fdl_geochron_batch import correlate_events
+        return correlate_events(events, flares, self.tokendict, lunar, window_days)
+
 
 # === V. WatchTower Interface ===
-def run_watchtower():
+def run_watchtower(events: Optional[List[Event]] = None):
     observer = AstroParser()
     matrix = ResonanceMatrix()
+    if events:
+        return run_watchtower_batch(observer, matrix, events)
 
     today = datetime.date.today()
     flare = observer.fetch_solar_data()
-    moon = observer.fetch_lunar_phase(today)
+    moon = observer.lunar_phase(today)
     event = Event("Протест в Киеве", "Ukraine", "social", today, "ψΔ")
 
-    res = matrix.correlate(event, flare, moon)
+    res = matrix.correlate(event, flare, moon.name)
 
     print("🔍 GeoChron NAVIGATOR Report")
     print("------------------------------")
     print(f"📍 Event: {event.title} [{event.region}] :: {event.category}")
-    print(f"☀️ Solar Class: {flare.get('classType', 'N/A')} | 🌙 Moon: {moon}")
+    print(f"☀️ Solar Class: {flare.get('classType', 'N/A')} | 🌙 Moon: {moon.name} ({moon.illumination:.0%})")
     print(f"🎯 Resonance: {'YES' if res['resonance'] else 'no'} | Score: {res['score']}")
     print("ℹ️ Details:")
     for d in res['details']:
         print(f" - {d}")
 
 
+def run_watchtower_batch(observer: AstroParser, matrix: ResonanceMatrix, events: List[Event]):
+    """Пакетный отчёт по 7-дневной ленте вспышек: печатаются только резонансные события."""
+    try:
+        flares = observer.client.get_json("xray_flares_7day")
+    except Exception:
+        flares = []
+    batch = matrix.correlate_batch(events, flares)
+    summary = batch.summary()
+
+    print("🔍 GeoChron NAVIGATOR Batch Report")
+    print("------------------------------")
+    print(f"📊 Events: {summary['events']} | 🎯 Resonant: {summary['resonant']} | ☀️ Solar: {summary['solar']}")
+    for res in batch.render():
+        event = res["event"]
+        print(f"📍 {event.date} {event.title} [{event.region}] :: {event.category} | Score: {res['score']}")
+        for d in res["details"]:
+            print(f" - {d}")
+    return batch
+
+
 if __name__ == "__main__":
     run_watchtower()
\ No newline at end of file
@@ -0,0 +1,404 @@
+# fdl_geochron_signals.py
+
+"""
+Σ-FDL::GeoChron ⧗ BIO-STREAM
+
+Хранилище потоков BioSignal: по одной серии на type_.
+- сырые отсчёты — в заранее выделенных кольцевых массивах (int64 µs + float64), память ограничена;
+- скользящее окно по времени: mean / min / max за O(1) на отсчёт (сумма + монотонные очереди), EWMA;
+- уровни хранения: агрегаты по корзинам (по умолчанию минута и час) в собственных кольцах;
+- запросы по диапазону времени — бинарный поиск по двум сегментам кольца.
+Отсчёты одной серии должны приходить в неубывающем порядке времени.
+"""
+
+import collections
+import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+SECOND = 1_000_000
+DEFAULT_CAPACITY = 65536
+DEFAULT_WINDOW = 60 * SECOND
+DEFAULT_HALFLIFE = 30 * SECOND
+DEFAULT_TIERS = ((60 * SECOND, 1440), (3600 * SECOND, 720))   # (ширина корзины, ёмкость): сутки минут, месяц часов
+UNIX_EPOCH = datetime.datetime(1970, 1, 1)
+
+TIER_DTYPE = np.dtype([("timestamp", "<i8"), ("mean", "<f8"), ("min", "<f8"), ("max", "<f8"), ("count", "<i8")])
+
+TimeLike = Union[datetime.datetime, int]
+
+
+def to_micros(timestamp: TimeLike) -> int:
+    """datetime (наивное — как UTC) или int µs → int64 микросекунды от 1970-01-01."""
+    if isinstance(timestamp, (int, np.integer)):
+        return int(timestamp)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return (timestamp - UNIX_EPOCH) // datetime.timedelta(microseconds=1)
+
+
+class RingBuffer:
+    """
+    Кольцо фиксированной ёмкости над структурированным массивом NumPy с полем timestamp.
+    seq — сквозной номер записи; в кольце живут seq из [total - len, total).
+    """
+
+    def __init__(self, capacity: int, dtype: np.dtype):
+        if capacity <= 0:
+            raise ValueError("Ёмкость кольца должна быть > 0")
+        self.capacity = capacity
+        self.data = np.zeros(capacity, dtype=dtype)
+        self.total = 0
+
+    def __len__(self) -> int:
+        return min(self.total, self.capacity)
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes
+
+    def oldest_seq(self) -> int:
+        return self.total - len(self)
+
+    def append(self, row: Tuple):
+        self.data[self.total % self.capacity] = row
+        self.total += 1
+
+    def extend(self, rows: np.ndarray):
+        """Векторная запись; из пачки больше ёмкости сохраняется только хвост."""
+        count = len(rows)
+        if count > self.capacity:
+            self.total += count - self.capacity
+            rows = rows[-self.capacity:]
+            count = self.capacity
+        head = self.total % self.capacity
+        first = min(count, self.capacity - head)
+        self.data[head:head + first] = rows[:first]
+        self.data[:count - first] = rows[first:]
+        self.total += count
+
+    def segments(self) -> List[np.ndarray]:
+        """Один-два среза-представления в порядке времени (без копирования)."""
+        if self.total <= self.capacity:
+            return [self.data[:self.total]]
+        head = self.total % self.capacity
+        return [self.data[head:], self.data[:head]] if head else [self.data]
+
+    def ordered(self) -> np.ndarray:
+        parts = self.segments()
+        return parts[0].copy() if len(parts) == 1 else np.concatenate(parts)
+
+    def range(self, start: Optional[int] = None, end: Optional[int] = None) -> np.ndarray:
+        """Записи с start <= timestamp < end (копия в порядке времени)."""
+        parts = []
+        for segment in self.segments():
+            stamps = segment["timestamp"]
+            lo = 0 if start is None else np.searchsorted(stamps, start, side="left")
+            hi = len(segment) if end is None else np.searchsorted(stamps, end, side="left")
+            if hi > lo:
+                parts.append(segment[lo:hi])
+        if not parts:
+            return self.data[:0].copy()
+        return parts[0].copy() if len(parts) == 1 else np.concatenate(parts)
+
+    def tail(self, count: int) -> np.ndarray:
+        """Последние count записей в порядке времени (копия)."""
+        count = min(count, len(self))
+        head = self.total % self.capacity
+        if count <= head or self.total <= self.capacity:
+            return self.data[head - count:head].copy() if head else self.data[self.capacity - count:].copy()
+        return np.concatenate([self.data[self.capacity - (count - head):], self.data[:head]])
+
+    def count_after(self, timestamp: int) -> int:
+        """Число хранимых записей с timestamp > заданного."""
+        return sum(len(segment) - int(np.searchsorted(segment["timestamp"], timestamp, side="right"))
+                   for segment in self.segments())
+
+
+class RetentionTier:
+    """Понижение частоты: mean / min / max / count по корзинам фиксированной ширины в собственном кольце."""
+
+    def __init__(self, resolution: int, capacity: int):
+        self.resolution = resolution
+        self.ring = RingBuffer(capacity, TIER_DTYPE)
+        self._bucket: Optional[int] = None
+        self._sum = 0.0
+        self._min = 0.0
+        self._max = 0.0
+        self._count = 0
+
+    def add(self, timestamp: int, value: float):
+        bucket = timestamp // self.resolution
+        if bucket != self._bucket:
+            self.flush()
+            self._bucket = bucket
+            self._sum, self._min, self._max, self._count = value, value, value, 1
+            return
+        self._sum += value
+        self._count += 1
+        if value < self._min:
+            self._min = value
+        elif value > self._max:
+            self._max = value
+
+    def add_many(self, timestamps: np.ndarray, values: np.ndarray):
+        """Векторный вариант add(): группировка по корзинам через reduceat."""
+        buckets = timestamps // self.resolution
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+        keys = buckets[starts]
+        sums = np.add.reduceat(values, starts)
+        mins = np.minimum.reduceat(values, starts)
+        maxs = np.maximum.reduceat(values, starts)
+        counts = np.diff(np.append(starts, len(values)))
+        if self._count and keys[0] == self._bucket:
+            sums[0] += self._sum
+            mins[0] = min(mins[0], self._min)
+            maxs[0] = max(maxs[0], self._max)
+            counts[0] += self._count
+            self._count = 0
+        else:
+            self.flush()
+        if len(keys) > 1:
+            rows = np.empty(len(keys) - 1, dtype=TIER_DTYPE)
+            rows["timestamp"] = keys[:-1] * self.resolution
+            rows["mean"] = sums[:-1] / counts[:-1]
+            rows["min"] = mins[:-1]
+            rows["max"] = maxs[:-1]
+            rows["count"] = counts[:-1]
+            self.ring.extend(rows)
+        self._bucket = int(keys[-1])
+        self._sum, self._min, self._max, self._count = (float(sums[-1]), float(mins[-1]), float(maxs[-1]),
+                                                        int(counts[-1]))
+
+    def flush(self):
+        """Закрывает текущую корзину и пишет её в кольцо."""
+        if self._count:
+            self.ring.append((self._bucket * self.resolution, self._sum / self._count,
+                              self._min, self._max, self._count))
+        self._bucket = None
+        self._count = 0
+
+    def current(self) -> Optional[Tuple]:
+        if not self._count:
+            return None
+        return (self._bucket * self.resolution, self._sum / self._count, self._min, self._max, self._count)
+
+    def range(self, start: Optional[int] = None, end: Optional[int] = None) -> np.ndarray:
+        """Закрытые корзины в диапазоне плюс ещё открытая текущая, если попадает в него."""
+        rows = self.ring.range(start, end)
+        current = self.current()
+        if current and (start is None or current[0] >= start) and (end is None or current[0] < end):
+            rows = np.concatenate([rows, np.array([current], dtype=TIER_DTYPE)])
+        return rows
+
+
+class SignalSeries:
+    """Поток одного типа сигнала: сырое кольцо, скользящие агрегаты и уровни хранения."""
+
+    RAW_DTYPE = np.dtype([("timestamp", "<i8"), ("value", "<f8")])
+
+    def __init__(self, type_: str, unit: str = "", capacity: int = DEFAULT_CAPACITY, window: int = DEFAULT_WINDOW,
+                 halflife: int = DEFAULT_HALFLIFE, tiers: Sequence[Tuple[int, int]] = DEFAULT_TIERS):
+        self.type_ = type_
+        self.unit = unit
+        self.window = window
+        self.halflife = halflife
+        self.raw = RingBuffer(capacity, self.RAW_DTYPE)
+        self.tiers = [RetentionTier(resolution, size) for resolution, size in tiers]
+        self._window_start = 0                      # seq первого отсчёта в окне
+        self._window_sum = 0.0
+        self._mins: collections.deque = collections.deque()   # seq с возрастающими значениями
+        self._maxs: collections.deque = collections.deque()   # seq с убывающими значениями
+        self._ewma: Optional[float] = None
+        self._last: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self.raw)
+
+    @property
+    def nbytes(self) -> int:
+        return self.raw.nbytes + sum(tier.ring.nbytes for tier in self.tiers)
+
+    # --- ингест ---
+    def append(self, timestamp: TimeLike, value: float):
+        stamp = to_micros(timestamp)
+        if self._last is not None and stamp < self._last:
+            raise ValueError(f"{self.type_}: отсчёт {stamp} раньше последнего {self._last}")
+        self._evict_before(self.raw.total + 1 - self.raw.capacity)
+        self.raw.append((stamp, value))
+        self._update(self.raw.total - 1, stamp, float(value))
+
+    def extend(self, timestamps: Sequence[TimeLike], values: Sequence[float]):
+        """
+        Пакетный ингест без цикла по отсчётам: кольцо и уровни пишутся векторно, а состояние окна
+        (сумма, монотонные очереди min/max) и EWMA восстанавливаются по итогу пачки —
+        результат тот же, что у последовательных append().
+        """
+        stamps = np.asarray(timestamps if isinstance(timestamps, np.ndarray) and timestamps.dtype == np.int64
+                            else [to_micros(t) for t in timestamps], dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        if len(stamps) != len(values):
+            raise ValueError("Длины timestamps и values различаются")
+        if not len(stamps):
+            return
+        if np.any(np.diff(stamps) < 0) or (self._last is not None and stamps[0] < self._last):
+            raise ValueError(f"{self.type_}: отсчёты должны идти в неубывающем порядке времени")
+
+        self._ewma = self._batch_ewma(stamps, values)
+        rows = np.empty(len(stamps), dtype=self.RAW_DTYPE)
+        rows["timestamp"] = stamps
+        rows["value"] = values
+        self.raw.extend(rows)
+        for tier in self.tiers:
+            tier.add_many(stamps, values)
+        self._last = int(stamps[-1])
+
+        # Окно: хранимые отсчёты новее last - window, но не меньше последнего
+        count = max(1, self.raw.count_after(self._last - self.window))
+        self._window_start = self.raw.total - count
+        window = self.raw.tail(count)["value"]
+        self._window_sum = float(window.sum())
+        seqs = np.arange(self._window_start, self.raw.total)
+        later_min = np.append(np.minimum.accumulate(window[::-1])[::-1][1:], np.inf)
+        later_max = np.append(np.maximum.accumulate(window[::-1])[::-1][1:], -np.inf)
+        self._mins = collections.deque(seqs[window < later_min].tolist())
+        self._maxs = collections.deque(seqs[window > later_max].tolist())
+
+    def _batch_ewma(self, stamps: np.ndarray, values: np.ndarray) -> float:
+        """EWMA после пачки в замкнутой форме: вес отсчёта = (1 - d_i) · 0.5^((t_n - t_i) / halflife)."""
+        if self.halflife <= 0:
+            return float(values[-1])
+        previous = np.concatenate(([self._last if self._last is not None else stamps[0]], stamps[:-1]))
+        decay = 0.5 ** ((stamps - previous) / self.halflife)
+        weights = (1.0 - decay) * 0.5 ** ((stamps[-1] - stamps) / self.halflife)
+        start = self._ewma if self._ewma is not None else float(values[0])
+        carry = 0.5 ** ((stamps[-1] - (self._last if self._last is not None else stamps[0])) / self.halflife)
+        return float(start * carry + np.dot(weights, values))
+
+    def _value(self, seq: int) -> float:
+        return self.raw.data["value"][seq % self.raw.capacity]
+
+    def _evict_before(self, seq: int):
+        while self._window_start < seq and self._window_start < self.raw.total:
+            self._window_sum -= self._value(self._window_start)
+            self._window_start += 1
+        for queue in (self._mins, self._maxs):
+            while queue and queue[0] < seq:
+                queue.popleft()
+
+    def _update(self, seq: int, stamp: int, value: float):
+        # Окно по времени: вытесняются отсчёты старше stamp - window
+        self._window_sum += value
+        horizon = stamp - self.window
+        stamps = self.raw.data["timestamp"]
+        values = self.raw.data["value"]
+        capacity = self.raw.capacity
+        start = self._window_start
+        while start < seq and stamps[start % capacity] <= horizon:
+            self._window_sum -= values[start % capacity]
+            start += 1
+        self._window_start = start
+        mins, maxs = self._mins, self._maxs
+        while mins and values[mins[-1] % capacity] >= value:
+            mins.pop()
+        mins.append(seq)
+        while mins[0] < start:
+            mins.popleft()
+        while maxs and values[maxs[-1] % capacity] <= value:
+            maxs.pop()
+        maxs.append(seq)
+        while maxs[0] < start:
+            maxs.popleft()
+        if not seq % capacity:
+            # Раз в оборот кольца сумма окна пересчитывается заново: без накопления ошибки округления
+            self._window_sum = float(self.raw.tail(seq + 1 - start)["value"].sum())
+        # EWMA с учётом интервала между отсчётами
+        if self._ewma is None:
+            self._ewma = value
+        else:
+            alpha = 1.0 - 0.5 ** ((stamp - self._last) / self.halflife) if self.halflife > 0 else 1.0
+            self._ewma += alpha * (value - self._ewma)
+        self._last = stamp
+        for tier in self.tiers:
+            tier.add(stamp, value)
+
+    # --- агрегаты и запросы ---
+    def stats(self) -> Dict:
+        """Скользящие агрегаты по окну window (µs) на момент последнего отсчёта."""
+        count = self.raw.total - self._window_start
+        if not count:
+            return {"type": self.type_, "unit": self.unit, "count": 0}
+        return {
+            "type": self.type_,
+            "unit": self.unit,
+            "count": count,
+            "mean": float(self._window_sum / count),
+            "min": float(self._value(self._mins[0])),
+            "max": float(self._value(self._maxs[0])),
+            "ewma": self._ewma,
+            "last": float(self._value(self.raw.total - 1)),
+            "timestamp": self._last,
+        }
+
+    def range(self, start: Optional[TimeLike] = None, end: Optional[TimeLike] = None,
+              resolution: Optional[int] = None) -> np.ndarray:
+        """
+        Отсчёты start <= t < end: сырые (resolution=None) или агрегаты уровня с данной шириной корзины.
+        """
+        lo = None if start is None else to_micros(start)
+        hi = None if end is None else to_micros(end)
+        if resolution is None:
+            return self.raw.range(lo, hi)
+        for tier in self.tiers:
+            if tier.resolution == resolution:
+                return tier.range(lo, hi)
+        raise ValueError(f"Нет уровня хранения с шириной корзины {resolution} µs")
+
+
+class BioSignalStore:
+    """Реестр серий по type_; параметры серий (ёмкость, окно, уровни) общие для всех типов."""
+
+    def __init__(self, **series_options):
+        self.series_options = series_options
+        self._series: Dict[str, SignalSeries] = {}
+
+    def series(self, type_: str, unit: str = "") -> SignalSeries:
+        series = self._series.get(type_)
+        if series is None:
+            series = self._series[type_] = SignalSeries(type_, unit, **self.series_options)
+        elif unit and not series.unit:
+            series.unit = unit
+        return series
+
+    def types(self) -> List[str]:
+        return list(self._series)
+
+    def ingest(self, signal) -> SignalSeries:
+        """Приём одного BioSignal."""
+        series = self.series(signal.type_, signal.unit)
+        series.append(signal.timestamp, signal.value)
+        return series
+
+    def ingest_many(self, signals: Iterable) -> int:
+        """Приём пачки BioSignal: группировка по type_, затем пакетная запись в каждую серию."""
+        groups: Dict[str, Tuple[List, List, str]] = {}
+        count = 0
+        for signal in signals:
+            stamps, values, _ = groups.setdefault(signal.type_, ([], [], signal.unit))
+            stamps.append(to_micros(signal.timestamp))
+            values.append(signal.value)
+            count += 1
+        for type_, (stamps, values, unit) in groups.items():
+            self.series(type_, unit).extend(np.array(stamps, dtype=np.int64), values)
+        return count
+
+    def stats(self) -> Dict[str, Dict]:
+        return {type_: series.stats() for type_, series in self._series.items()}
+
+    def range(self, type_: str, start: Optional[TimeLike] = None, end: Optional[TimeLike] = None,
+              resolution: Optional[int] = None) -> np.ndarray:
+        series = self._series.get(type_)
+        if series is None:
+            return np.empty(0, dtype=SignalSeries.RAW_DTYPE if resolution is None else TIER_DTYPE)
+        return series.range(start, end, resolution)
@@ -0,0 +1,246 @@
+# fdl_glyph_engine.py
+# Σ-FDL::GLYPH-ENGINE
+# Однопроходный транслятор: фильтр смысловой защиты + расшифровка глифов одним регулярным выражением
+
+import bisect
+import itertools
+import re
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+from fdl_lexicon_stream import DEFAULT_CHUNK_SIZE, iter_text_chunks
+
+SENSE_FILTER_MASK = "[∅]"
+
+
+class GlyphTranslator:
+    """
+    Скомпилированная таблица замен: термины фильтра и глифы (в том числе астральные 𐰴 / 𓂀
+    и многосимвольные) сводятся в одно выражение; текст проходится один раз.
+
+    Порядок как у прежнего пути «сначала фильтр, потом глифы»: на одной позиции термин фильтра
+    важнее глифа, а маска термина сама расшифровывается по глифам. Результаты замен повторно
+    не обрабатываются. Для терминов, не перекрывающих друг друга, результат совпадает
+    с последовательными str.replace.
+    """
+
+    def __init__(self, glyphs: Dict[str, str], filter_terms: Iterable[str] = (),
+                 mask: str = SENSE_FILTER_MASK):
+        self.glyphs = dict(glyphs)
+        self.filter_terms = tuple(t for t in dict.fromkeys(filter_terms) if t)
+        self.mask = mask
+        glyph_pattern = self._alternation([g for g in self.glyphs if g])
+        self._glyph_regex = re.compile(glyph_pattern) if glyph_pattern else None
+        decoded_mask = self._decode_glyphs(mask)
+        self.table = dict(self.glyphs)
+        self.table.update((term, decoded_mask) for term in self.filter_terms)
+        parts = [p for p in (self._alternation(self.filter_terms), glyph_pattern) if p]
+        # Захватывающая группа: split() отдаёт совпадения на нечётных позициях — замена без Python-колбэка
+        self._regex = re.compile("(" + "|".join(parts) + ")") if parts else None
+        self.max_length = max(map(len, self.table), default=0)
+
+    @staticmethod
+    def _alternation(keys: Iterable[str]) -> str:
+        """Многосимвольные ключи — по убыванию длины, одиночные кодовые точки — одним классом [...]."""
+        keys = list(keys)
+        longer = sorted((k for k in keys if len(k) > 1), key=len, reverse=True)
+        singles = [k for k in keys if len(k) == 1]
+        parts = [re.escape(k) for k in longer]
+        if singles:
+            parts.append("[" + "".join(re.escape(k) for k in singles) + "]")
+        return "|".join(parts)
+
+    def _decode_glyphs(self, text: str) -> str:
+        if self._glyph_regex is None:
+            return text
+        glyphs = self.glyphs
+        return self._glyph_regex.sub(lambda m: glyphs[m[0]], text)
+
+    def translate(self, text: str) -> str:
+        if self._regex is None:
+            return text
+        pieces = self._regex.split(text)
+        pieces[1::2] = map(self.table.__getitem__, pieces[1::2])
+        return "".join(pieces)
+
+    def translate_stream(self, source, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                         encoding: str = "utf-8") -> Iterator[str]:
+        """
+        Потоковый перевод: source — путь, файловый объект или итерируемое str/bytes.
+        Хвост из max_length - 1 символов переносится в следующий кусок, поэтому
+        термины и глифы на стыке кусков распознаются так же, как в translate().
+        """
+        regex, table = self._regex, self.table
+        carry = ""
+        for chunk in iter_text_chunks(source, chunk_size, encoding):
+            buffer = carry + chunk
+            if regex is None:
+                yield buffer
+                continue
+            # Разбор куска окончателен до позиции cut: совпадение, начатое раньше, целиком в буфере
+            cut = len(buffer) - (self.max_length - 1)
+            if cut <= 0:
+                carry = buffer
+                continue
+            pieces = regex.split(buffer)
+            ends = list(itertools.accumulate(map(len, pieces)))
+            j = bisect.bisect_right(ends, cut)        # кусок, содержащий позицию cut
+            if j == len(pieces):
+                head, carry = pieces, ""
+            elif j % 2:                                # совпадение: начато до cut — берём целиком
+                begin = ends[j] - len(pieces[j])
+                head, carry = (pieces[:j + 1], buffer[ends[j]:]) if begin < cut else (pieces[:j], buffer[begin:])
+            else:                                      # обычный текст: режем по cut
+                begin = ends[j] - len(pieces[j])
+                head = pieces[:j] + [pieces[j][:cut - begin]]
+                carry = buffer[cut:]
+            head[1::2] = map(table.__getitem__, head[1::2])
+            yield "".join(head)
+        if carry:
+            yield self.translate(carry)
+
+
+class WatchedDict(dict):
+    """
+    dict, сообщающий о каждой правке вызовом on_change(); словари-значения тоже оборачиваются,
+    поэтому замечается и правка вложенной записи (REGISTRY[glyph]["meaning"] = ...).
+    Копии (copy.copy, copy.deepcopy, pickle) — обычные dict.
+    """
+
+    def __init__(self, data=(), on_change: Optional[Callable[[], None]] = None):
+        super().__init__()
+        self._on_change = on_change
+        dict.update(self, ((key, self._wrap(value)) for key, value in dict(data).items()))
+
+    def _wrap(self, value):
+        return WatchedDict(value, self._on_change) if isinstance(value, dict) else value
+
+    def _changed(self):
+        if self._on_change is not None:
+            self._on_change()
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, self._wrap(value))
+        self._changed()
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        self._changed()
+
+    def update(self, *args, **kwargs):
+        dict.update(self, ((key, self._wrap(value)) for key, value in dict(*args, **kwargs).items()))
+        self._changed()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return dict.__getitem__(self, key)
+
+    def pop(self, *args):
+        value = dict.pop(self, *args)
+        self._changed()
+        return value
+
+    def popitem(self):
+        item = dict.popitem(self)
+        self._changed()
+        return item
+
+    def clear(self):
+        dict.clear(self)
+        self._changed()
+
+    def __reduce_ex__(self, protocol):
+        return dict, (dict(self),)
+
+
+class WatchedList(list):
+    """list, сообщающий о каждой правке вызовом on_change(). Копии — обычные list."""
+
+    def __init__(self, data=(), on_change: Optional[Callable[[], None]] = None):
+        super().__init__(data)
+        self._on_change = on_change
+
+    def _changed(self):
+        if self._on_change is not None:
+            self._on_change()
+
+    def __setitem__(self, index, value):
+        list.__setitem__(self, index, value)
+        self._changed()
+
+    def __delitem__(self, index):
+        list.__delitem__(self, index)
+        self._changed()
+
+    def __iadd__(self, other):
+        list.extend(self, other)
+        self._changed()
+        return self
+
+    def __imul__(self, count):
+        list.__imul__(self, count)
+        self._changed()
+        return self
+
+    def append(self, value):
+        list.append(self, value)
+        self._changed()
+
+    def extend(self, values):
+        list.extend(self, values)
+        self._changed()
+
+    def insert(self, index, value):
+        list.insert(self, index, value)
+        self._changed()
+
+    def pop(self, index=-1):
+        value = list.pop(self, index)
+        self._changed()
+        return value
+
+    def remove(self, value):
+        list.remove(self, value)
+        self._changed()
+
+    def clear(self):
+        list.clear(self)
+        self._changed()
+
+    def sort(self, *, key=None, reverse=False):
+        list.sort(self, key=key, reverse=reverse)
+        self._changed()
+
+    def reverse(self):
+        list.reverse(self)
+        self._changed()
+
+    def __reduce_ex__(self, protocol):
+        return list, (list(self),)
+
+
+class TranslatorCache:
+    """
+    Транслятор, пересобираемый только после invalidate(). Источник таблицы сам сообщает о правках
+    (функции регистрации или WatchedDict / WatchedList), поэтому get() не сверяет таблицу при каждом вызове.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self._built_version = -1
+        self._translator: Optional[GlyphTranslator] = None
+
+    def invalidate(self):
+        self.version += 1
+
+    def get(self, build: Callable[[], GlyphTranslator]) -> GlyphTranslator:
+        # Версия читается до сборки: правка во время build() оставит кэш устаревшим до следующего вызова
+        version = self.version
+        if self._translator is None or self._built_version != version:
+            self._translator = build()
+            self._built_version = version
+        return self._translator
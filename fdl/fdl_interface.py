@@ -0,0 +1,38 @@
+# fdl_interface.py
+
+class FDLInterface:
+    def __init__(self):
+        self.glyphs = {}
+        self.archs = {}
+
+    def register_glyph(self, name, meaning):
+        self.glyphs[name] = meaning
+
+    def load_arch(self, key, concept):
+        self.archs[key] = concept
+
+    def interpret_text(self, text):
+        result = []
+        for glyph, meaning in self.glyphs.items():
+            if glyph in text:
+                result.append((glyph, meaning))
+        return result
+
+    def dialectic_synthesis(self, thesis, antithesis):
+        if not thesis or not antithesis:
+            return None
+        # Простейший синтез: объединение в третье представление
+        return f"Σ({thesis}) + Δ({antithesis}) → Ω({thesis} ∧ {antithesis})"
+
+
+# Пример использования
+if __name__ == "__main__":
+    fdl = FDLInterface()
+    fdl.register_glyph("𐰖", "гармония")
+    fdl.register_glyph("ⵣ", "истина")
+    fdl.load_arch("Lux", "внутренний свет как навигация")
+
+    text = "Путь ведёт через 𐰖 и ⵣ к источнику."
+    print("Интерпретация:", fdl.interpret_text(text))
+    print("Диалектика:", fdl.dialectic_synthesis("свобода", "порядок"))
+
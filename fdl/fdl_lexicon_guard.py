@@ -1,61 +1,185 @@
-fdl_lexicon_guard.py
-
-Σ-FDL::TAURUS-ΣIGIL
+# fdl_lexicon_guard.py
+# Σ-FDL::TAURUS-ΣIGIL
+# Лексико-смысловой модуль различения и защиты инфополя
 
-Лексико-смысловой модуль различения и защиты инфополя
+import json
+import threading
+from collections.abc import MutableMapping
+from types import MappingProxyType
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
 
-class LexiconGuard: """ Модуль выявления опасных лексем, подмен и враждебных формулировок в текстах. Строит простую эвристику смыслового различения и сигнализирует о потенциальных подменах. """
+from fdl_automaton import PhraseAutomaton, casefold_with_offsets, is_word_char
+from fdl_lexicon_stream import DEFAULT_CHUNK_SIZE, iter_stream_matches, iter_text_chunks
+from fdl_metrics import METRICS, timed
 
-def __init__(self):
-    self.triggers = {
-        "sustainable development": "проверить контекст: часто используется как прикрытие контроля",
-        "inclusive economy": "возможна подмена: уточнить, кого включают и как",
-        "zero ownership": "проверить, не внедряется ли сценарий обнуления частной субъектности",
-        "AI regulation": "проверить, кто регулирует и в чьих интересах",
-        "smart society": "проверить, не подменяется ли живое на управляемое"
-    }
 
-def scan(self, text: str) -> dict:
+class TriggerMap(MutableMapping):
     """
-    Анализирует текст и возвращает найденные подозрительные лексемы с комментариями.
+    Живое представление триггеров LexiconGuard: чтение — из текущего снимка,
+    запись (guard.triggers[фраза] = комментарий, del, update) публикует новый снимок с перестроенным автоматом.
+    Для массовых изменений дешевле один вызов set_triggers.
     """
-    findings = {}
-    for key in self.triggers:
-        if key.lower() in text.lower():
-            findings[key] = self.triggers[key]
-    return findings
 
-Пример использования
+    def __init__(self, guard: "LexiconGuard"):
+        self._guard = guard
 
-if name == "main": lg = LexiconGuard() sample = "The inclusive economy is part of our sustainable development plan." results = lg.scan(sample) print("Анализ лексики:") for term, comment in results.items(): print(f"- '{term}': {comment}")
+    def __getitem__(self, key: str) -> str:
+        return self._guard._snapshot[0][key]
+
+    def __iter__(self):
+        return iter(self._guard._snapshot[0])
+
+    def __len__(self) -> int:
+        return len(self._guard._snapshot[0])
+
+    def __setitem__(self, key: str, comment: str):
+        self._guard._edit({key: comment}, ())
+
+    def __delitem__(self, key: str):
+        if key not in self._guard._snapshot[0]:
+            raise KeyError(key)
+        self._guard._edit({}, (key,))
+
+    def update(self, *args, **kwargs):
+        self._guard._edit(dict(*args, **kwargs), ())
+
+    def __repr__(self) -> str:
+        return repr(dict(self._guard._snapshot[0]))
 
-# fdl_lexicon_guard.py
-# Σ-FDL::TAURUS-ΣIGIL
-# Лексико-смысловой модуль различения и защиты инфополя
 
 class LexiconGuard:
     """
     Модуль выявления опасных лексем, подмен и враждебных формулировок в текстах.
     Строит простую эвристику смыслового различения и сигнализирует о потенциальных подменах.
+    Поиск выполняется автоматом Ахо–Корасик, построенным один раз по набору триггеров.
     """
 
-    def __init__(self):
-        self.triggers = {
+    def __init__(self, word_boundary: bool = False):
+        self.word_boundary = word_boundary
+        self._write_lock = threading.Lock()
+        self.set_triggers({
             "sustainable development": "проверить контекст: часто используется как прикрытие контроля",
             "inclusive economy": "возможна подмена: уточнить, кого включают и как",
             "zero ownership": "проверить, не внедряется ли сценарий обнуления частной субъектности",
             "AI regulation": "проверить, кто регулирует и в чьих интересах",
             "smart society": "проверить, не подменяется ли живое на управляемое"
-        }
+        })
+
+    @property
+    def triggers(self) -> TriggerMap:
+        return TriggerMap(self)
+
+    @triggers.setter
+    def triggers(self, triggers: Mapping[str, str]):
+        self.set_triggers(triggers)
+
+    def _publish(self, triggers: Dict[str, str]):
+        # Снимок (триггеры, автомат) собирается в стороне и подменяется одним присваиванием:
+        # идущие сканирования дорабатывают на прежней паре, новые видят согласованную новую
+        self._snapshot = (MappingProxyType(triggers), PhraseAutomaton(triggers))
+
+    def _edit(self, changes: Dict[str, str], removals: Iterable[str]):
+        with self._write_lock:
+            triggers = dict(self._snapshot[0])
+            triggers.update(changes)
+            for key in removals:
+                del triggers[key]
+            self._publish(triggers)
+
+    def rebuild(self):
+        """Перестраивает автомат по текущему набору триггеров."""
+        with self._write_lock:
+            self._publish(dict(self._snapshot[0]))
+
+    def set_triggers(self, triggers: Mapping[str, str]):
+        """Горячая замена набора триггеров."""
+        triggers = dict(triggers)
+        with self._write_lock:
+            self._publish(triggers)
+
+    def load_triggers(self, path: str, merge: bool = False):
+        """
+        Загружает триггеры из файла: JSON-словарь {фраза: комментарий}
+        либо строки «фраза<TAB>комментарий» (строки с # пропускаются).
+        """
+        with open(path, "r", encoding="utf-8") as file:
+            if path.endswith(".json"):
+                loaded = json.load(file)
+            else:
+                loaded = {}
+                for line in file:
+                    line = line.rstrip("\n")
+                    if not line.strip() or line.lstrip().startswith("#"):
+                        continue
+                    phrase, _, comment = line.partition("\t")
+                    loaded[phrase.strip()] = comment.strip()
+        self.set_triggers({**self._snapshot[0], **loaded} if merge else loaded)
+
+    def find(self, text: str, word_boundary: Optional[bool] = None) -> List[Tuple[int, int, str]]:
+        """
+        Все вхождения триггеров: [(start, end, ключ), ...] в символах исходного текста.
+        """
+        return self._find(text, self._snapshot[1], word_boundary)
+
+    def _find(self, text: str, automaton: PhraseAutomaton,
+              word_boundary: Optional[bool]) -> List[Tuple[int, int, str]]:
+        if word_boundary is None:
+            word_boundary = self.word_boundary
+        folded, offsets = casefold_with_offsets(text)
+        raw, _ = automaton.scan(folded)
+        found = []
+        for end, pid in raw:
+            start = end - automaton.lengths[pid]
+            if offsets is not None:
+                start, end = offsets[start], offsets[end - 1] + 1
+            if word_boundary and ((start > 0 and is_word_char(text[start - 1]))
+                                  or (end < len(text) and is_word_char(text[end]))):
+                continue
+            for key in automaton.keys[pid]:
+                found.append((start, end, key))
+        return found
+
+    def scan_stream(self, source, chunk_size: int = DEFAULT_CHUNK_SIZE, encoding: str = "utf-8",
+                    word_boundary: Optional[bool] = None) -> Iterator[Tuple[int, int, str]]:
+        """
+        Потоковый анализ без загрузки документа целиком.
+        source: путь, файловый объект или итерируемое кусков str/bytes.
+        Выдаёт (byte_start, byte_end, ключ) по мере чтения; фразы на стыках кусков учитываются.
+        """
+        automaton = self._snapshot[1]
+        if word_boundary is None:
+            word_boundary = self.word_boundary
+        chunks = iter_text_chunks(source, chunk_size, encoding)
+        for start, end, pid in iter_stream_matches(automaton, chunks, word_boundary, encoding):
+            for key in automaton.keys[pid]:
+                yield start, end, key
+
+    def scan_report(self, text: str, word_boundary: Optional[bool] = None) -> Dict[str, Dict]:
+        """
+        Подробный анализ: для каждой найденной лексемы — комментарий, число вхождений и позиции.
+        """
+        triggers, automaton = self._snapshot
+        report: Dict[str, Dict] = {}
+        for start, end, key in self._find(text, automaton, word_boundary):
+            entry = report.get(key)
+            if entry is None:
+                entry = report[key] = {"comment": triggers[key], "count": 0, "spans": []}
+            entry["count"] += 1
+            entry["spans"].append((start, end))
+        return report
 
+    @timed("fdl_lexicon_scan_seconds", "Длительность LexiconGuard.scan")
     def scan(self, text: str) -> dict:
         """
         Анализирует текст и возвращает найденные подозрительные лексемы с комментариями.
         """
+        if METRICS.enabled:
+            METRICS.inc("fdl_lexicon_scanned_chars_total", len(text))
+        triggers, automaton = self._snapshot
         findings = {}
-        for key in self.triggers:
-            if key.lower() in text.lower():
-                findings[key] = self.triggers[key]
+        for _, _, key in self._find(text, automaton, None):
+            if key not in findings:
+                findings[key] = triggers[key]
         return findings
 
 # Пример использования
@@ -0,0 +1,237 @@
+# fdl_lexicon_stream.py
+# Σ-FDL::TAURUS-ΣIGIL::STREAM
+# Потоковое и параллельное сканирование корпусов автоматом LexiconGuard
+
+import argparse
+import codecs
+import json
+import os
+import sys
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from fdl_automaton import PhraseAutomaton, casefold_with_offsets, is_word_char
+
+DEFAULT_CHUNK_SIZE = 1 << 20  # 1 МиБ на кусок: память воркера ограничена куском и хвостом автомата
+INFLIGHT_PER_WORKER = 4       # файлов в работе на процесс: список путей читается по мере сканирования
+
+# Кодирование/декодирование без потерь: невалидные байты проходят через surrogateescape,
+# поэтому смещения в байтах совпадают с исходным файлом
+_ERRORS = "surrogateescape"
+
+
+# === I. Источники текста ===
+def iter_text_chunks(source, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                     encoding: str = "utf-8") -> Iterator[str]:
+    """
+    Превращает источник в поток строковых кусков.
+    source: путь к файлу, файловый объект (текстовый или бинарный) либо итерируемое str/bytes.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as file:
+            yield from iter_text_chunks(file, chunk_size, encoding)
+        return
+    if hasattr(source, "read"):
+        reader = source
+        source = iter(lambda: reader.read(chunk_size), reader.read(0))
+    decoder = codecs.getincrementaldecoder(encoding)(errors=_ERRORS)
+    for chunk in source:
+        if isinstance(chunk, (bytes, bytearray, memoryview)):
+            chunk = decoder.decode(bytes(chunk))
+        if chunk:
+            yield chunk
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+# === II. Потоковый поиск ===
+def iter_stream_matches(automaton: PhraseAutomaton, chunks: Iterable[str], word_boundary: bool = False,
+                        encoding: str = "utf-8") -> Iterator[Tuple[int, int, int]]:
+    """
+    Находит фразы автомата в потоке кусков и выдаёт (byte_start, byte_end, pattern_id) по мере чтения.
+    Состояние автомата переносится между кусками, поэтому фразы на стыке кусков находятся;
+    для их начала хранится хвост из max(len(фразы)) позиций предыдущих кусков.
+    """
+    lengths = automaton.lengths
+    window = max(lengths, default=0)
+    state = 0
+    base = 0                                  # байтовое смещение начала текущего куска
+    tail: List[Tuple[int, str]] = []          # (байт, символ перед позицией) для хвоста свёрнутого текста
+    prev_char = ""                            # последний исходный символ предыдущего куска
+    pending: List[Tuple[int, int, int]] = []  # совпадения в конце куска ждут следующий символ (границы слов)
+
+    for text in chunks:
+        if not text:
+            continue
+        if pending:
+            if not is_word_char(text[0]):
+                yield from pending
+            pending = []
+
+        ascii_only = text.isascii()
+        folded, offsets = casefold_with_offsets(text)
+        raw, state = automaton.scan(folded, state)
+
+        hits = []
+        needed = set()
+        for end, pid in raw:
+            fstart = end - lengths[pid]
+            oend = end if offsets is None else offsets[end - 1] + 1
+            ostart = None
+            if fstart >= 0:
+                ostart = fstart if offsets is None else offsets[fstart]
+                needed.add(ostart)
+            needed.add(oend)
+            hits.append((fstart, ostart, oend, pid))
+
+        if ascii_only:
+            byte_at = None
+        else:
+            # Накопительное кодирование между отсортированными позициями: O(len(text)) на кусок
+            byte_at = {}
+            pos = acc = 0
+            for p in sorted(needed):
+                acc += len(text[pos:p].encode(encoding, _ERRORS))
+                pos = p
+                byte_at[p] = base + acc
+
+        for fstart, ostart, oend, pid in hits:
+            if ostart is None:
+                start_byte, before = tail[fstart]
+            else:
+                start_byte = base + ostart if byte_at is None else byte_at[ostart]
+                before = text[ostart - 1] if ostart else prev_char
+            end_byte = base + oend if byte_at is None else byte_at[oend]
+            if word_boundary:
+                if before and is_word_char(before):
+                    continue
+                if oend == len(text):
+                    pending.append((start_byte, end_byte, pid))
+                    continue
+                if is_word_char(text[oend]):
+                    continue
+            yield start_byte, end_byte, pid
+
+        chunk_bytes = len(text) if ascii_only else len(text.encode(encoding, _ERRORS))
+        if window:
+            fresh = []
+            for f in range(max(0, len(folded) - window), len(folded)):
+                o = f if offsets is None else offsets[f]
+                byte = base + o if ascii_only else base + chunk_bytes - len(text[o:].encode(encoding, _ERRORS))
+                fresh.append((byte, text[o - 1] if o else prev_char))
+            tail = (tail + fresh)[-window:]
+        prev_char = text[-1]
+        base += chunk_bytes
+
+    yield from pending
+
+
+# === III. Параллельная пакетная обработка ===
+_worker_automaton: Optional[PhraseAutomaton] = None
+_worker_options: Dict = {}
+
+
+def _init_worker(triggers: List[str], word_boundary: bool, chunk_size: int, encoding: str):
+    """Автомат строится один раз на процесс-воркер."""
+    global _worker_automaton, _worker_options
+    _worker_automaton = PhraseAutomaton(triggers)
+    _worker_options = {"word_boundary": word_boundary, "chunk_size": chunk_size, "encoding": encoding}
+
+
+def _scan_file(path: str) -> Dict:
+    """Статистика по одному файлу: счётчики по фразам; сами совпадения не накапливаются."""
+    automaton = _worker_automaton
+    counts: Counter = Counter()
+    chunks = iter_text_chunks(path, _worker_options["chunk_size"], _worker_options["encoding"])
+    for _, _, pid in iter_stream_matches(automaton, chunks, _worker_options["word_boundary"],
+                                         _worker_options["encoding"]):
+        counts[pid] += 1
+    stats = {}
+    for pid, count in counts.items():
+        for key in automaton.keys[pid]:
+            stats[key] = count
+    return {"path": path, "bytes": os.path.getsize(path), "counts": stats}
+
+
+def _bounded_map(pool: ProcessPoolExecutor, fn, items: Iterable, window: int) -> Iterator:
+    """
+    Как pool.map, но не больше window задач в полёте: items потребляется лениво,
+    поэтому генератор путей огромного корпуса не разворачивается в память целиком.
+    """
+    pending: deque = deque()
+    for item in items:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def scan_files(paths: Iterable[str], triggers: Dict[str, str], word_boundary: bool = False,
+               workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+               encoding: str = "utf-8") -> Dict:
+    """
+    Распределяет файлы по пулу процессов и сводит статистику по триггерам:
+    {"files", "bytes", "triggers": {фраза: {"comment", "count", "files"}}}.
+    """
+    totals: Counter = Counter()
+    file_hits: Counter = Counter()
+    files = 0
+    scanned = 0
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(list(triggers), word_boundary, chunk_size, encoding)) as pool:
+        for result in _bounded_map(pool, _scan_file, paths, workers * INFLIGHT_PER_WORKER):
+            files += 1
+            scanned += result["bytes"]
+            for key, count in result["counts"].items():
+                totals[key] += count
+                file_hits[key] += 1
+    return {
+        "files": files,
+        "bytes": scanned,
+        "triggers": {
+            key: {"comment": triggers.get(key, ""), "count": count, "files": file_hits[key]}
+            for key, count in totals.most_common()
+        },
+    }
+
+
+def iter_corpus(paths: Iterable[str], suffixes: Tuple[str, ...] = ()) -> Iterator[str]:
+    """Разворачивает каталоги в список файлов (рекурсивно, с фильтром по расширению)."""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                for name in sorted(names):
+                    if not suffixes or name.endswith(suffixes):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def main(argv: Optional[List[str]] = None):
+    from fdl_lexicon_guard import LexiconGuard
+
+    parser = argparse.ArgumentParser(description="Пакетное сканирование корпуса LexiconGuard")
+    parser.add_argument("paths", nargs="+", help="файлы или каталоги корпуса")
+    parser.add_argument("--triggers", help="файл триггеров (JSON или TSV)")
+    parser.add_argument("--workers", type=int, default=None, help="число процессов (по умолчанию — число ядер)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="размер куска чтения в байтах")
+    parser.add_argument("--word-boundary", action="store_true", help="совпадения только по границам слов")
+    parser.add_argument("--suffix", action="append", default=[], help="фильтр расширений для каталогов")
+    parser.add_argument("--encoding", default="utf-8")
+    args = parser.parse_args(argv)
+
+    guard = LexiconGuard()
+    if args.triggers:
+        guard.load_triggers(args.triggers)
+    report = scan_files(iter_corpus(args.paths, tuple(args.suffix)), guard.triggers, args.word_boundary,
+                        args.workers, args.chunk_size, args.encoding)
+    json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
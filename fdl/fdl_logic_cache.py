@@ -0,0 +1,230 @@
+# fdl_logic_cache.py
+# Σ-FDL::LOGIC-CACHE
+# Мемоизация чистых FDL-логик: стабильный хэш входа, LRU с ограничением размера и TTL,
+# объединение одновременных одинаковых запросов (single-flight)
+
+import asyncio
+import hashlib
+import struct
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class UncacheableInput(TypeError):
+    """Вход содержит значение без стабильного представления (объект, функция и т.п.)."""
+
+
+# Результат, которым ведущий вызов снимает с себя вычисление при отмене: ожидающие начинают заново
+_ABANDONED = object()
+
+
+def _encode(value, out: bytearray):
+    # Метка типа + длина исключают коллизии вида ("ab", "c") / ("a", "bc") и 1 / 1.0 / True
+    if value is None:
+        out += b"N"
+    elif value is True or value is False:
+        out += b"T" if value else b"F"
+    elif isinstance(value, int):
+        raw = str(value).encode("ascii")
+        out += b"i" + struct.pack("<I", len(raw)) + raw
+    elif isinstance(value, float):
+        out += b"f" + struct.pack("<d", value)
+    elif isinstance(value, str):
+        raw = value.encode("utf-8", "surrogatepass")
+        out += b"s" + struct.pack("<I", len(raw)) + raw
+    elif isinstance(value, (bytes, bytearray)):
+        out += b"b" + struct.pack("<I", len(value)) + bytes(value)
+    elif isinstance(value, (list, tuple)):
+        out += (b"l" if isinstance(value, list) else b"t") + struct.pack("<I", len(value))
+        for item in value:
+            _encode(item, out)
+    elif isinstance(value, dict):
+        items = []
+        for key, item in value.items():
+            encoded_key, encoded_item = bytearray(), bytearray()
+            _encode(key, encoded_key)
+            _encode(item, encoded_item)
+            items.append((bytes(encoded_key), bytes(encoded_item)))
+        out += b"d" + struct.pack("<I", len(items))
+        for encoded_key, encoded_item in sorted(items):
+            out += encoded_key + encoded_item
+    elif isinstance(value, (set, frozenset)):
+        members = []
+        for item in value:
+            encoded = bytearray()
+            _encode(item, encoded)
+            members.append(bytes(encoded))
+        out += b"S" + struct.pack("<I", len(members)) + b"".join(sorted(members))
+    else:
+        raise UncacheableInput(f"Нет стабильного представления для {type(value).__name__}")
+
+
+def stable_hash(value) -> str:
+    """Хэш содержимого, не зависящий от порядка ключей словаря/множества и от PYTHONHASHSEED."""
+    out = bytearray()
+    _encode(value, out)
+    return hashlib.blake2b(out, digest_size=16).hexdigest()
+
+
+class LogicCache:
+    """
+    LRU-кэш результатов одной логики. maxsize — число записей, ttl — срок жизни в секундах (None — бессрочно).
+    Пока результат для ключа считается, повторные запросы ждут его, а не запускают вычисление снова
+    (и из потоков, и из корутин). Исключения не кэшируются и передаются всем ожидающим.
+    Отмена или таймаут ожидающего не затрагивают общее вычисление; если отменён сам ведущий вызов,
+    ожидающие не получают CancelledError — один из них вычисляет значение заново.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        if maxsize <= 0:
+            raise ValueError("maxsize должен быть > 0")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.coalesced = 0
+        self.uncacheable = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # --- внутреннее состояние ---
+    def _begin(self, key: str):
+        """('hit', значение) | ('wait', future) | ('lead', future) — под блокировкой."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires >= self.clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return "hit", value
+                del self._entries[key]
+                self.expirations += 1
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return "wait", future
+            self.misses += 1
+            future = self._inflight[key] = Future()
+            return "lead", future
+
+    def _finish(self, key: str, future: Future, value=None, error: Optional[BaseException] = None):
+        with self._lock:
+            del self._inflight[key]
+            if error is None:
+                expires = self.clock() + self.ttl if self.ttl is not None else float("inf")
+                self._entries[key] = (value, expires)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        if future.cancelled():
+            return
+        if error is None:
+            future.set_result(value)
+        else:
+            future.set_exception(error)
+
+    def _abandon(self, key: str, future: Future):
+        """Ведущий вызов прерван (отмена, KeyboardInterrupt): ключ освобождается, ожидающие повторяют запрос."""
+        with self._lock:
+            del self._inflight[key]
+        if not future.cancelled():
+            future.set_result(_ABANDONED)
+
+    def _key(self, data) -> Optional[str]:
+        try:
+            return stable_hash(data)
+        except UncacheableInput:
+            with self._lock:
+                self.uncacheable += 1
+            return None
+
+    # --- вызовы ---
+    def call(self, data, compute: Callable[[Any], Any]):
+        """compute(data) с мемоизацией (синхронно)."""
+        key = self._key(data)
+        if key is None:
+            return compute(data)
+        while True:
+            state, payload = self._begin(key)
+            if state == "hit":
+                return payload
+            if state == "wait":
+                value = payload.result()
+                if value is _ABANDONED:
+                    continue
+                return value
+            try:
+                value = compute(data)
+            except Exception as error:
+                self._finish(key, payload, error=error)
+                raise
+            except BaseException:
+                self._abandon(key, payload)
+                raise
+            self._finish(key, payload, value)
+            return value
+
+    async def call_async(self, data, compute: Callable[[Any], Any]):
+        """Асинхронный вариант: compute(data) — корутина; ожидание чужого вычисления не блокирует цикл."""
+        key = self._key(data)
+        if key is None:
+            return await compute(data)
+        while True:
+            state, payload = self._begin(key)
+            if state == "hit":
+                return payload
+            if state == "wait":
+                # shield: отмена/таймаут этого ожидающего не должны отменять общий future ведущего
+                value = await asyncio.shield(asyncio.wrap_future(payload))
+                if value is _ABANDONED:
+                    continue
+                return value
+            try:
+                value = await compute(data)
+            except Exception as error:
+                self._finish(key, payload, error=error)
+                raise
+            except BaseException:
+                self._abandon(key, payload)
+                raise
+            self._finish(key, payload, value)
+            return value
+
+    def purge_expired(self) -> int:
+        """Удаляет просроченные записи (иначе они вытесняются лениво при обращении)."""
+        now = self.clock()
+        with self._lock:
+            stale = [key for key, (_, expires) in self._entries.items() if expires < now]
+            for key in stale:
+                del self._entries[key]
+            self.expirations += len(stale)
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "coalesced": self.coalesced,
+            "uncacheable": self.uncacheable,
+        }
@@ -0,0 +1,371 @@
+# fdl_metrics.py
+# Σ-FDL::METRICS
+# Инструментирование горячих путей рантайма: счётчики и гистограммы задержек,
+# чтение из Python (snapshot) и экспорт в текстовом формате Prometheus с локального HTTP-адреса,
+# необязательный выборочный профилировщик стеков.
+# По умолчанию выключено: обёртка проверяет один флаг и сразу вызывает исходную функцию.
+
+import bisect
+import functools
+import inspect
+import sys
+import threading
+import time
+from collections import Counter as _Tally
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Границы корзин гистограмм задержек, секунды (10 мкс … 10 с)
+DEFAULT_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+DEFAULT_PORT = 9369
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _format_labels(key: LabelKey, extra: Sequence[Tuple[str, str]] = ()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+# === I. Метрики ===
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str = ""):
+        self.name = name
+        self.help = help
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, key: LabelKey = ()):
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def series(self) -> List[Dict]:
+        with self._lock:
+            return [{"labels": dict(key), "value": value} for key, value in self._values.items()]
+
+    def exposition(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{_format_labels(key)} {_format_value(value)}" for key, value in self._values.items()]
+
+
+class Histogram:
+    """Фиксированные корзины; в памяти — некумулятивные счётчики, при экспорте — накопленные (le)."""
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str = "", buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelKey, list] = {}   # ключ -> [счётчики корзин (+Inf последней), сумма, число]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, key: LabelKey = ()):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def _cumulative(self, counts: List[int]) -> List[Tuple[float, int]]:
+        total, out = 0, []
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            total += count
+            out.append((bound, total))
+        return out
+
+    def series(self) -> List[Dict]:
+        with self._lock:
+            return [{"labels": dict(key), "count": count, "sum": total,
+                     "buckets": {_format_value(bound): n for bound, n in self._cumulative(counts)}}
+                    for key, (counts, total, count) in self._series.items()]
+
+    def exposition(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for key, (counts, total, count) in self._series.items():
+                for bound, n in self._cumulative(counts):
+                    lines.append(f"{self.name}_bucket{_format_labels(key, [('le', _format_value(bound))])} {n}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(total)}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("histogram", "key", "start")
+
+    def __init__(self, histogram: Histogram, key: LabelKey):
+        self.histogram = histogram
+        self.key = key
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, self.key)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+# === II. Профилировщик ===
+class SamplingProfiler:
+    """
+    Фоновый поток раз в interval секунд снимает стеки остальных потоков (sys._current_frames)
+    и считает свёрнутые стеки «модуль:функция;…» — формат flamegraph.pl / speedscope.
+    hook(thread_id, stack) вызывается на каждый снимок (например, для отправки во внешний агент).
+    """
+
+    def __init__(self, interval: float = 0.005, max_depth: int = 64,
+                 hook: Optional[Callable[[int, Tuple[str, ...]], None]] = None):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.hook = hook
+        self.samples = 0
+        self._stacks: _Tally = _Tally()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="fdl-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    code = frame.f_code
+                    stack.append(f"{frame.f_globals.get('__name__', '?')}:{code.co_name}")
+                    frame = frame.f_back
+                stack = tuple(reversed(stack))
+                with self._lock:
+                    self._stacks[stack] += 1
+                    self.samples += 1
+                if self.hook is not None:
+                    self.hook(thread_id, stack)
+
+    def collapsed(self) -> str:
+        """Строки «кадр;кадр;… число» — вход для flamegraph."""
+        with self._lock:
+            return "\n".join(f"{';'.join(stack)} {count}" for stack, count in self._stacks.most_common())
+
+    def top(self, n: int = 20) -> List[Tuple[str, int]]:
+        """Самые частые верхние кадры (собственное время функций)."""
+        leaves: _Tally = _Tally()
+        with self._lock:
+            for stack, count in self._stacks.items():
+                if stack:
+                    leaves[stack[-1]] += count
+        return leaves.most_common(n)
+
+    def reset(self):
+        with self._lock:
+            self._stacks.clear()
+            self.samples = 0
+
+
+# === III. Реестр ===
+class MetricsRegistry:
+    def __init__(self):
+        self.enabled = False
+        self.profiler: Optional[SamplingProfiler] = None
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name: str, help: str, **options):
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = self._metrics[name] = cls(name, help, **options)
+        if not isinstance(metric, cls):
+            raise TypeError(f"Метрика {name} уже зарегистрирована как {metric.kind}")
+        if help and not metric.help:
+            metric.help = help                  # первая регистрация (timer, другой модуль) могла быть без описания
+        return metric
+
+    def counter(self, name: str, help: str = "") -> Counter:
+        return self._get(Counter, name, help)
+
+    def histogram(self, name: str, help: str = "", buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help, buckets=buckets)
+
+    # --- включение ---
+    def enable(self, profile_interval: Optional[float] = None,
+               profile_hook: Optional[Callable[[int, Tuple[str, ...]], None]] = None):
+        """Включает сбор метрик; profile_interval — дополнительно запустить выборочный профилировщик."""
+        self.enabled = True
+        if profile_interval:
+            if self.profiler is None:
+                self.profiler = SamplingProfiler(profile_interval, hook=profile_hook)
+            self.profiler.start()
+
+    def disable(self):
+        self.enabled = False
+        if self.profiler is not None:
+            self.profiler.stop()
+
+    def reset(self):
+        """Обнуляет значения; зарегистрированные метрики (и ссылки на них в декораторах) остаются."""
+        for metric in list(self._metrics.values()):
+            metric.clear()
+        if self.profiler is not None:
+            self.profiler.reset()
+
+    # --- замеры ---
+    def timer(self, name: str, **labels):
+        """with METRICS.timer("..._seconds", agent=...): — при выключенном сборе ничего не делает."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self.histogram(name), label_key(labels))
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        if self.enabled:
+            self.counter(name).inc(amount, label_key(labels))
+
+    # --- чтение ---
+    def snapshot(self) -> Dict[str, Dict]:
+        """{имя: {"type", "help", "series": [...]}} — для чтения из Python."""
+        metrics = list(self._metrics.values())
+        return {m.name: {"type": m.kind, "help": m.help, "series": m.series()} for m in metrics}
+
+    def render_prometheus(self) -> str:
+        """Текстовый формат экспозиции Prometheus 0.0.4."""
+        lines = []
+        for metric in sorted(self._metrics.values(), key=lambda m: m.name):
+            if metric.help:
+                lines.append(f"# HELP {metric.name} {metric.help.replace(chr(10), ' ')}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.exposition())
+        if self.profiler is not None:
+            lines.append("# TYPE fdl_profiler_samples_total counter")
+            lines.append(f"fdl_profiler_samples_total {self.profiler.samples}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> "MetricsServer":
+        """HTTP-сервер в фоне: /metrics — Prometheus, /profile — свёрнутые стеки профилировщика."""
+        return MetricsServer(self, host, port)
+
+
+class MetricsServer:
+    def __init__(self, registry: MetricsRegistry, host: str = "127.0.0.1", port: int = DEFAULT_PORT):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                if path == "/metrics":
+                    body, content_type = registry.render_prometheus(), "text/plain; version=0.0.4; charset=utf-8"
+                elif path == "/profile" and registry.profiler is not None:
+                    body, content_type = registry.profiler.collapsed() + "\n", "text/plain; charset=utf-8"
+                else:
+                    self.send_error(404)
+                    return
+                raw = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.url = f"http://{host}:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, name="fdl-metrics", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+METRICS = MetricsRegistry()
+
+
+def timed(name: str, help: str = "", registry: Optional[MetricsRegistry] = None, **labels):
+    """
+    Декоратор: длительность вызова в гистограмму name (секунды) с постоянными метками labels.
+    Гистограмма и ключ меток готовятся при декорировании; при выключенном реестре — только проверка флага.
+    """
+    registry = registry or METRICS
+
+    def decorate(fn):
+        histogram = registry.histogram(name, help)
+        key = label_key(labels)
+        clock = time.perf_counter
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                if not registry.enabled:
+                    return await fn(*args, **kwargs)
+                start = clock()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    histogram.observe(clock() - start, key)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not registry.enabled:
+                return fn(*args, **kwargs)
+            start = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                histogram.observe(clock() - start, key)
+        return wrapper
+    return decorate
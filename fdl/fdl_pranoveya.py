@@ -0,0 +1,152 @@
+# fdl_pranoveya.py
+# Σ-FDL::PRANOVEYA
+# Индекс семантических полей: разбор при загрузке, префиксное дерево слов-глифов и декодер по самому длинному совпадению
+
+import re
+from typing import Dict, Iterator, List, NamedTuple, Optional, Union
+
+FieldStructure = Union[str, Dict[str, str]]
+FIELD_SEPARATORS = re.compile(r"[;\n]")
+
+
+class SemanticMatch(NamedTuple):
+    start: int
+    end: int
+    word: str
+    meaning: str
+    field: str
+
+
+def parse_semantic_field(structure: FieldStructure) -> Dict[str, str]:
+    """
+    Поле как словарь {слово: смысл}. Строка вида 'ⴰⵔⴰⵎ = Свет; ⵣⴰⵎⵎⴻⵙⵉⵏⵉ = Истина'
+    (пары через ';' или перевод строки); словарь принимается с его строковыми парами.
+    """
+    if isinstance(structure, dict):
+        return {k: v for k, v in structure.items() if isinstance(k, str) and isinstance(v, str) and k}
+    if not isinstance(structure, str):
+        return {}
+    mapping = {}
+    for pair in FIELD_SEPARATORS.split(structure):
+        word, sep, meaning = pair.partition("=")
+        word, meaning = word.strip(), meaning.strip()
+        if sep and word:
+            mapping[word] = meaning
+    return mapping
+
+
+class SemanticIndex:
+    """
+    Префиксное дерево слов всех загруженных полей.
+    Поле разбирается один раз при загрузке; повторная загрузка поля заменяет только его слова.
+    Для декодирования дерево сворачивается в регулярное выражение (общие префиксы вынесены,
+    хвосты — жадные необязательные группы), поэтому поиск самого длинного совпадения идёт в C,
+    за время, линейное по длине текста при ограниченной длине слов.
+    Если слово есть в нескольких полях, действует поле, загруженное последним.
+    """
+
+    def __init__(self):
+        self.fields: Dict[str, Dict[str, str]] = {}
+        self._owners: Dict[str, Dict[str, str]] = {}   # слово -> {поле: смысл} в порядке загрузки
+        self._trie: Dict = {}
+        self._regex: Optional[re.Pattern] = None
+        self._rendered: Dict[str, Dict[str, str]] = {}  # шаблон -> {слово: готовая замена}
+
+    # --- загрузка ---
+    def load(self, field_id: str, structure: FieldStructure) -> int:
+        """Индексирует поле (заменяя прежнюю версию). Возвращает число слов."""
+        self.remove(field_id)
+        mapping = parse_semantic_field(structure)
+        self.fields[field_id] = mapping
+        for word, meaning in mapping.items():
+            owners = self._owners.get(word)
+            if owners is None:
+                owners = self._owners[word] = {}
+                self._insert(word)
+            owners[field_id] = meaning
+        self._invalidate()
+        return len(mapping)
+
+    def remove(self, field_id: str):
+        mapping = self.fields.pop(field_id, None)
+        if not mapping:
+            return
+        for word in mapping:
+            owners = self._owners[word]
+            owners.pop(field_id, None)
+            if not owners:
+                del self._owners[word]
+                self._prune(word)
+        self._invalidate()
+
+    def _invalidate(self):
+        self._regex = None
+        self._rendered.clear()
+
+    def _insert(self, word: str):
+        node = self._trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def _prune(self, word: str):
+        path = [self._trie]
+        for ch in word:
+            path.append(path[-1][ch])
+        del path[-1][""]
+        for depth in range(len(word), 0, -1):
+            if path[depth]:
+                break
+            del path[depth - 1][word[depth - 1]]
+
+    # --- декодирование ---
+    def _pattern(self, node: Dict) -> str:
+        # Ветви узла начинаются с разных символов, поэтому подходит не больше одной;
+        # жадный необязательный хвост сначала пробует более длинное слово, затем откатывается
+        branches = [re.escape(ch) + self._pattern(child) for ch, child in node.items() if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return "(?:" + body + ")?" if "" in node else body
+
+    def regex(self) -> Optional[re.Pattern]:
+        if self._regex is None and self._owners:
+            # Захватывающая группа нужна decode(): split() кладёт совпадения на нечётные позиции
+            self._regex = re.compile("(" + self._pattern(self._trie) + ")")
+        return self._regex
+
+    def meaning(self, word: str) -> Optional[SemanticMatch]:
+        owners = self._owners.get(word)
+        if not owners:
+            return None
+        field = next(reversed(owners))
+        return SemanticMatch(0, len(word), word, owners[field], field)
+
+    def find(self, text: str) -> Iterator[SemanticMatch]:
+        """Самые длинные совпадения слева направо, без перекрытий."""
+        regex = self.regex()
+        if regex is None:
+            return
+        owners = self._owners
+        for match in regex.finditer(text):
+            word = match[0]
+            field = next(reversed(owners[word]))
+            yield SemanticMatch(match.start(), match.end(), word, owners[word][field], field)
+
+    def decode(self, text: str, template: str = "[{meaning}]") -> str:
+        """Текст с заменой найденных слов на template.format(word=..., meaning=..., field=...)."""
+        regex = self.regex()
+        if regex is None:
+            return text
+        rendered = self._rendered.get(template)
+        if rendered is None:
+            rendered = self._rendered[template] = {}
+            for word, owners in self._owners.items():
+                field = next(reversed(owners))
+                rendered[word] = template.format(word=word, meaning=owners[field], field=field)
+        pieces = regex.split(text)
+        pieces[1::2] = map(rendered.__getitem__, pieces[1::2])
+        return "".join(pieces)
+
+    def __len__(self) -> int:
+        return len(self._owners)
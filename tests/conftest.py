@@ -0,0 +1,11 @@
+# conftest.py
+# Тесты импортируют модули по голым именам, как скрипты репозитория: core/, fdl/ и benchmarks/ в sys.path
+
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+for directory in ("core", "fdl", "benchmarks"):
+    path = os.path.join(ROOT, directory)
+    if path not in sys.path:
+        sys.path.insert(0, path)
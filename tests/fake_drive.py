@@ -0,0 +1,228 @@
+# fake_drive.py
+# Локальная подмена Drive API v3 для тестов DriveSync: хранилище в памяти, постраничные list,
+# лента изменений, возобновляемая загрузка и get_media с Range; fail_every — искусственные обрывы,
+# set_content — ответы, расходящиеся с метаданными
+
+import hashlib
+import os
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from protonovea_drive import CHUNK_SIZE
+
+
+class FakeMediaUpload:
+    """Совместим с MediaFileUpload по используемым методам: size(), getbytes(), chunksize(), mimetype()."""
+
+    def __init__(self, path: str, mimetype: str = "application/octet-stream", chunksize: int = CHUNK_SIZE,
+                 resumable: bool = True):
+        self._path = path
+        self._mimetype = mimetype
+        self._chunksize = chunksize
+        self._resumable = resumable
+
+    def size(self) -> int:
+        return os.path.getsize(self._path)
+
+    def getbytes(self, begin: int, length: int) -> bytes:
+        with open(self._path, "rb") as file:
+            file.seek(begin)
+            return file.read(length)
+
+    def chunksize(self) -> int:
+        return self._chunksize
+
+    def mimetype(self) -> str:
+        return self._mimetype
+
+    def resumable(self) -> bool:
+        return self._resumable
+
+
+class _FakeRequest:
+    def __init__(self, fn):
+        self._fn = fn
+        self.headers: Dict[str, str] = {}
+
+    def execute(self, num_retries: int = 0):
+        return self._fn(self.headers)
+
+
+class _FakeUploadRequest:
+    def __init__(self, drive: "FakeDriveService", body: Dict, media):
+        self._drive = drive
+        self._body = body
+        self._media = media
+        self.resumable_uri: Optional[str] = None
+        self.resumable_progress = 0
+
+    def next_chunk(self, num_retries: int = 0):
+        drive = self._drive
+        if self.resumable_uri is None:
+            self.resumable_uri = f"fake://upload/{uuid.uuid4().hex}"
+        drive._maybe_fail()
+        chunk = self._media.getbytes(self.resumable_progress, self._media.chunksize())
+        with drive._lock:
+            # Сервер принимает кусок с позиции клиента: неподтверждённый хвост прежней попытки отбрасывается
+            session = drive._sessions.setdefault(self.resumable_uri, bytearray())
+            del session[self.resumable_progress:]
+            session += chunk
+        self.resumable_progress += len(chunk)
+        if self.resumable_progress < self._media.size():
+            return {"progress": self.resumable_progress}, None
+        with drive._lock:
+            content = bytes(drive._sessions.pop(self.resumable_uri))
+        return None, drive.put(self._body["name"], content, self._media.mimetype(), self._body.get("parents"))
+
+    def execute(self, num_retries: int = 0):
+        response = None
+        while response is None:
+            _, response = self.next_chunk(num_retries)
+        return response
+
+
+class FakeDriveService:
+    """
+    Хранилище в памяти с интерфейсом service.files() / service.changes():
+    постраничные list, лента изменений с токенами, возобновляемая загрузка, get_media с Range.
+    fail_every=N — каждый N-й кусок передачи завершается ConnectionError (проверка докачки).
+    """
+
+    def __init__(self, page_size_limit: int = 100, fail_every: int = 0):
+        self.page_size_limit = page_size_limit
+        self.fail_every = fail_every
+        self._files: Dict[str, Dict] = {}
+        self._content: Dict[str, bytes] = {}
+        self._changes: List[str] = []          # id изменённых файлов; токен = номер изменения
+        self._sessions: Dict[str, bytearray] = {}
+        self._chunks = 0
+        self._lock = threading.RLock()
+        self.calls: List[str] = []
+
+    def _maybe_fail(self):
+        with self._lock:
+            self._chunks += 1
+            if self.fail_every and self._chunks % self.fail_every == 0:
+                raise ConnectionError("fake drive: обрыв соединения")
+
+    # --- изменение содержимого ---
+    def put(self, name: str, content: bytes, mime_type: str = "application/octet-stream",
+            parents: Optional[List[str]] = None, file_id: Optional[str] = None) -> Dict:
+        with self._lock:
+            file_id = file_id or uuid.uuid4().hex[:16]
+            meta = {
+                "id": file_id, "name": name, "mimeType": mime_type,
+                "md5Checksum": hashlib.md5(content).hexdigest(), "size": str(len(content)),
+                "modifiedTime": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime()),
+                "parents": parents or ["root"], "trashed": False,
+            }
+            self._files[file_id] = meta
+            self._content[file_id] = content
+            self._changes.append(file_id)
+            return dict(meta)
+
+    def trash(self, file_id: str):
+        with self._lock:
+            self._files[file_id]["trashed"] = True
+            self._changes.append(file_id)
+
+    def remove(self, file_id: str):
+        with self._lock:
+            self._files.pop(file_id, None)
+            self._content.pop(file_id, None)
+            self._changes.append(file_id)
+
+    def set_content(self, file_id: str, content: bytes):
+        """Подменяет содержимое без обновления метаданных: обрезанный или испорченный ответ get_media."""
+        with self._lock:
+            self._content[file_id] = content
+
+    # --- ресурсы API ---
+    def files(self):
+        return _FakeFiles(self)
+
+    def changes(self):
+        return _FakeChanges(self)
+
+
+class _FakeFiles:
+    def __init__(self, drive: FakeDriveService):
+        self.drive = drive
+
+    def list(self, q: str = "", pageSize: int = 100, pageToken: Optional[str] = None, fields: str = ""):
+        drive = self.drive
+
+        def run(headers):
+            with drive._lock:
+                drive.calls.append("files.list")
+                visible = [m for m in drive._files.values() if not ("trashed = false" in q and m["trashed"])]
+                start = int(pageToken or 0)
+                size = min(pageSize, drive.page_size_limit)
+                response = {"files": [dict(m) for m in visible[start:start + size]]}
+                if start + size < len(visible):
+                    response["nextPageToken"] = str(start + size)
+                return response
+        return _FakeRequest(run)
+
+    def get(self, fileId: str, fields: str = ""):
+        drive = self.drive
+
+        def run(headers):
+            with drive._lock:
+                drive.calls.append("files.get")
+                return dict(drive._files[fileId])
+        return _FakeRequest(run)
+
+    def create(self, body: Dict, media_body=None, fields: str = ""):
+        self.drive.calls.append("files.create")
+        return _FakeUploadRequest(self.drive, body, media_body)
+
+    def get_media(self, fileId: str):
+        drive = self.drive
+
+        def run(headers):
+            drive._maybe_fail()
+            with drive._lock:
+                drive.calls.append("files.get_media")
+                content = drive._content[fileId]
+            spec = headers.get("range")
+            if not spec:
+                return content
+            start, _, end = spec.split("=", 1)[1].partition("-")
+            return content[int(start):int(end) + 1 if end else None]
+        return _FakeRequest(run)
+
+
+class _FakeChanges:
+    def __init__(self, drive: FakeDriveService):
+        self.drive = drive
+
+    def getStartPageToken(self):
+        drive = self.drive
+        return _FakeRequest(lambda headers: {"startPageToken": str(len(drive._changes))})
+
+    def list(self, pageToken: str, pageSize: int = 100, fields: str = ""):
+        drive = self.drive
+
+        def run(headers):
+            with drive._lock:
+                drive.calls.append("changes.list")
+                start = int(pageToken)
+                size = min(pageSize, drive.page_size_limit)
+                window = drive._changes[start:start + size]
+                changes = []
+                for file_id in window:
+                    meta = drive._files.get(file_id)
+                    change = {"fileId": file_id, "removed": meta is None}
+                    if meta is not None:
+                        change["file"] = dict(meta)
+                    changes.append(change)
+                response = {"changes": changes}
+                if start + size < len(drive._changes):
+                    response["nextPageToken"] = str(start + size)
+                else:
+                    response["newStartPageToken"] = str(len(drive._changes))
+                return response
+        return _FakeRequest(run)
@@ -0,0 +1,61 @@
+# stub_telegram.py
+# Локальный HTTP-сервер с ответами в формате Bot API для тестов TelegramDispatcher
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+
+class StubTelegramServer:
+    """
+    HTTP-сервер на 127.0.0.1 (свободный порт), принимающий POST sendMessage.
+    script — очередь кодов ответа для следующих запросов (429 — с retry_after, 5xx — ошибка сервера);
+    после неё отвечает 200. Принятые (200) сообщения — в messages.
+    """
+
+    def __init__(self, script: Optional[List[int]] = None, retry_after: float = 0.05):
+        self.script = list(script or [])
+        self.retry_after = retry_after
+        self.messages: List[Dict] = []
+        self.requests = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                with stub._lock:
+                    stub.requests += 1
+                    status = stub.script.pop(0) if stub.script else 200
+                    if status == 200:
+                        stub.messages.append(body)
+                if status == 200:
+                    payload = {"ok": True, "result": {"message_id": len(stub.messages), "text": body.get("text")}}
+                elif status == 429:
+                    payload = {"ok": False, "error_code": 429, "description": "Too Many Requests",
+                               "parameters": {"retry_after": stub.retry_after}}
+                else:
+                    payload = {"ok": False, "error_code": status, "description": "Stub error"}
+                raw = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/sendMessage"
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+import workloads
+from fdl_compiler import FDLCompiler
+
+
+def test_workloads_are_deterministic():
+    assert workloads.fdl_source(50) == workloads.fdl_source(50)
+    assert workloads.text_corpus(5000) == workloads.text_corpus(5000)
+    assert workloads.text_corpus(5000, seed=1) != workloads.text_corpus(5000)
+    assert workloads.memory_entries(30) == workloads.memory_entries(30)
+    assert min(workloads.token_columns(100)[3]) > 0
+
+
+def test_fdl_source_compiles_with_requested_invalid_blocks():
+    compiler = FDLCompiler()
+    compiler.parse(workloads.fdl_source(200, invalid_ratio=0.0))
+    compiler.validate()
+    assert len(compiler.blocks) == 200 and not compiler.errors
+    compiler = FDLCompiler()
+    compiler.parse(workloads.fdl_source(200, invalid_ratio=1.0))
+    compiler.validate()
+    assert len(compiler.errors) == 200
+
+
+@pytest.mark.parametrize("size, label", [(1_000, "1k"), (1_500, "1.5k"), (2_000_000, "2M"), (1_234, "1234")])
+def test_size_label(size, label):
+    assert workloads.size_label(size) == label
+
+
+def test_suite_runs_and_flags_regressions(tmp_path):
+    import bench_suite
+
+    output = tmp_path / "run.json"
+    bench_suite.main(["--cases", "compiler", "--scale", "0.001", "--repeat", "1",
+                      "--baseline", str(tmp_path / "none.json"), "--output", str(output)])
+    results = json.loads(output.read_text(encoding="utf-8"))["results"]
+    result = dict(next(iter(results.values())))
+    baseline = {bench_suite.result_key(result): dict(result, throughput=result["throughput"] * 10)}
+    assert bench_suite.compare([result], baseline, 0.2)
+    assert bench_suite.compare([result], {bench_suite.result_key(result): result}, 0.2) == []
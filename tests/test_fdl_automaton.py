@@ -0,0 +1,38 @@
+import re
+
+from fdl_automaton import PhraseAutomaton, casefold_with_offsets
+
+
+def find_all(automaton, text):
+    matches, _ = automaton.scan(text.casefold())
+    return sorted((end - automaton.lengths[pid], end, automaton.patterns[pid]) for end, pid in matches)
+
+
+def naive(phrases, text):
+    folded = text.casefold()
+    return sorted((m.start(), m.start() + len(p), p) for p in {p.casefold() for p in phrases}
+                  for m in re.finditer(f"(?={re.escape(p)})", folded))
+
+
+def test_overlapping_and_nested_phrases_match_naive_search():
+    phrases = ["he", "she", "his", "hers", "Хаос", "ХАОС ПОРЯДОК", "ос"]
+    text = "ushers and хаос порядок, his shehe"
+    assert find_all(PhraseAutomaton(phrases), text) == naive(phrases, text)
+
+
+def test_scan_state_carries_across_chunks():
+    automaton = PhraseAutomaton(["граница"])
+    first, state = automaton.scan("…гран")
+    second, _ = automaton.scan("ица", state)
+    assert first == [] and second == [(3, 0)]
+
+
+def test_casefold_offsets_map_back_to_source():
+    folded, offsets = casefold_with_offsets("Straße")
+    assert folded == "strasse" and offsets[4:6] == [4, 4] and offsets[-1] == 6
+    assert casefold_with_offsets("Свет") == ("свет", None)
+
+
+def test_duplicate_foldings_share_a_pattern():
+    automaton = PhraseAutomaton(["Свет", "СВЕТ", ""])
+    assert len(automaton) == 1 and automaton.keys == [["Свет", "СВЕТ"]]
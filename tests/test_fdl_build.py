@@ -0,0 +1,55 @@
+import json
+import os
+
+from fdl_build import FDLProject, artifact_key
+
+SOURCE = """\
+[первый]
+замысел: протестировать систему
+форма: логический анализ
+поток: от агента к ядру: напрямую
+
+# комментарий между блоками
+
+[второй]
+замысел: второй
+форма: короткая
+поток: обратный
+"""
+
+
+def test_project_build_is_incremental(tmp_path):
+    src = tmp_path / "src"
+    (src / "nested").mkdir(parents=True)
+    (src / "a.fdl").write_text(SOURCE, encoding="utf-8")
+    (src / "nested" / "b.fdl").write_text("замысел: b\n", encoding="utf-8")
+    project = FDLProject(str(src), workers=1)
+
+    summary = project.build()
+    assert (summary["files"], summary["compiled"]) == (2, 2)
+    assert list(summary["errors"]) == ["nested/b.fdl"]
+    with open(project.artifact("a.fdl"), encoding="utf-8") as file:
+        assert json.loads(file.read())[1]["поток"] == "обратный"
+    assert project.artifact("nested/b.fdl") is None
+
+    assert project.build()["compiled"] == 0
+    (src / "nested" / "b.fdl").write_text(SOURCE, encoding="utf-8")
+    summary = project.build()
+    assert (summary["compiled"], summary["errors"]) == (1, {})
+    assert project.artifact("nested/b.fdl") == project.artifact("a.fdl")    # один артефакт на содержимое
+
+
+def test_artifact_key_depends_on_format():
+    assert artifact_key(b"x", "json") != artifact_key(b"x", "binary")
+
+
+def test_missing_artifact_is_rebuilt(tmp_path):
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "a.fdl").write_text(SOURCE, encoding="utf-8")
+    project = FDLProject(str(src), workers=1)
+    project.build()
+    os.remove(project.artifact("a.fdl"))
+    assert project.build()["compiled"] == 1
+    assert os.path.exists(project.artifact("a.fdl"))
+    assert project.build()["compiled"] == 0
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from fdl_compiler import FDLCompiler, decode_binary, encode_binary, split_blocks
+
+SOURCE = """\
+[первый]
+замысел: протестировать систему
+форма: логический анализ
+поток: от агента к ядру: напрямую
+
+# комментарий между блоками
+
+[второй]
+замысел: второй
+форма: короткая
+поток: обратный
+"""
+
+
+def compiled(source, fmt="compact"):
+    compiler = FDLCompiler()
+    compiler.parse(source)
+    compiler.validate()
+    return compiler, compiler.compile(fmt)
+
+
+def test_multiple_blocks_and_values_with_colons():
+    compiler, result = compiled(SOURCE)
+    assert [b.block_id for b in compiler.blocks] == ["первый", "второй"]
+    assert json.loads(result)[0]["поток"] == "от агента к ядру: напрямую"
+    assert compiler.blocks[1].positions["форма"] == (10, 1)
+
+
+def test_errors_carry_positions():
+    compiler, result = compiled("[x]\nзамысел: a\nформа: b\nбез двоеточия\n")
+    assert result is None
+    assert "x (строка 4, столбец 1): ожидалось 'поле: значение', получено 'без двоеточия'" in compiler.errors
+    assert any("отсутствует поле 'поток'" in error for error in compiler.errors)
+
+
+def test_headers_split_blocks_without_blank_lines():
+    assert [len(lines) for _, lines in split_blocks("[a]\nk: v\n[b]\nk: v\n# only\n\n# c\n")] == [2, 3]
+
+
+def test_reparse_only_reparses_changed_blocks():
+    compiler = FDLCompiler()
+    compiler.parse(SOURCE)
+    assert compiler.reparse(SOURCE.replace("короткая", "длинная")) == ["второй"]
+    assert compiler.stats == {"parsed": 3, "reused": 1}
+    assert compiler.blocks[1].structure["форма"] == "длинная" and not compiler.errors
+
+
+def test_binary_round_trip():
+    _, data = compiled(SOURCE, "binary")
+    assert decode_binary(data) == json.loads(compiled(SOURCE)[1])
+    assert decode_binary(encode_binary([{"ключ" * 50: "з" * 300}])) == [{"ключ" * 50: "з" * 300}]
+    with pytest.raises(ValueError):
+        decode_binary(b"nope")
@@ -0,0 +1,82 @@
+import xml.dom.minidom
+
+import numpy as np
+import pytest
+
+pytest.importorskip("matplotlib")
+
+import fdl_diagrams as diagrams
+
+SCENES = {
+    "metropolis": diagrams.metropolis_periphery_scene,
+    "concentric": diagrams.concentric_scene,
+    "actors": diagrams.actor_map_scene,
+}
+
+
+@pytest.mark.parametrize("name", sorted(SCENES))
+def test_render_each_scene_to_svg_and_png(name, tmp_path):
+    svg_path, png_path = diagrams.render(SCENES[name](), name, str(tmp_path))
+    document = xml.dom.minidom.parse(svg_path)
+    assert document.documentElement.tagName == "svg"
+    assert document.getElementsByTagName("text")          # svg.fonttype=none: подписи остаются текстом
+    with open(png_path, "rb") as file:
+        assert file.read(8) == b"\x89PNG\r\n\x1a\n"
+
+
+def test_svg_output_is_deterministic():
+    scene = diagrams.concentric_scene()
+    assert diagrams.render_bytes(scene, "svg") == diagrams.render_bytes(scene, "svg")
+
+
+def test_render_cache_skips_unchanged_scenes(tmp_path):
+    cache = diagrams.RenderCache(str(tmp_path / "cache"))
+    scene = diagrams.actor_map_scene(cache=cache)
+    first = diagrams.render(scene, "map", str(tmp_path), cache=cache)
+    assert (cache.hits, cache.misses) == (0, 3)          # раскладка + два формата
+    diagrams.actor_map_scene(cache=cache)
+    second = diagrams.render(scene, "map", str(tmp_path), cache=cache)
+    assert first == second and (cache.hits, cache.misses) == (3, 3)
+
+
+def test_style_change_invalidates_render_cache(tmp_path):
+    import matplotlib as mpl
+
+    cache = diagrams.RenderCache(str(tmp_path / "cache"))
+    scene = diagrams.concentric_scene()
+    diagrams.render(scene, "rings", str(tmp_path), formats=("svg",), cache=cache)
+    key = diagrams.scene_key(scene, "svg", 100)
+    with mpl.rc_context({"patch.edgecolor": "red", "font.size": 14}):
+        assert diagrams.scene_key(scene, "svg", 100) != key
+        diagrams.render(scene, "rings", str(tmp_path), formats=("svg",), cache=cache)
+        assert "#ff0000" in (tmp_path / "rings.svg").read_text(encoding="utf-8")
+    with mpl.rc_context({"keymap.quit": ["x"]}):                # не влияет на файл — ключ прежний
+        assert diagrams.scene_key(scene, "svg", 100) == key
+    assert cache.misses == 2
+
+
+def test_force_layout_is_deterministic_and_respects_pins():
+    edges = [(0, i) for i in range(1, 50)] + [(i, i + 1) for i in range(1, 49)]
+    pos = diagrams.force_layout(50, edges, iterations=40, fixed={0: (0.0, 0.0)})
+    assert pos.shape == (50, 2) and np.abs(pos).max() <= 1.0 + 1e-12
+    assert np.allclose(pos[0], 0.0)
+    assert np.array_equal(pos, diagrams.force_layout(50, edges, iterations=40, fixed={0: (0.0, 0.0)}))
+
+
+def test_large_actor_map_labels_only_the_best_connected():
+    actors = [f"n{i}" for i in range(300)]
+    scene = diagrams.actor_map_scene(actors, [("n1", "n2"), ("n1", "n3")], iterations=5, max_labels=3)
+    assert len(scene["points"]) == 301
+    assert [t[2] for t in scene["texts"]] == ["System / Field", "n1", "n2"]
+
+
+def test_simplify_svg_keeps_declaration_and_text():
+    svg = ('<?xml version="1.0" encoding="utf-8"?>\n<!-- c -->\n<svg version="1.1">\n'
+           '  <metadata>x</metadata>\n  <path d="M 1.23456 2.00001 L 3.5 4"/>\n'
+           '  <g transform="matrix(0.123456789 0 0 1 0 0)"/>\n  <text x="0.5">a="1.23456"</text>\n</svg>')
+    out = diagrams.simplify_svg(svg)
+    assert out.startswith('<?xml version="1.0"')
+    assert '<path d="M 1.23 2 L 3.5 4"/>' in out
+    assert 'transform="matrix(0.12346 0 0 1 0 0)"' in out
+    assert '>a="1.23456"</text>' in out
+    assert "metadata" not in out and "<!--" not in out
@@ -0,0 +1,70 @@
+import json
+import os
+
+from FDLInterfaceProtocol import FDLInterface
+from fdl_dialectic_log import DialecticalLog, antithesis_of, synthesis_of
+
+
+def test_spills_to_given_segment_and_reads_back(tmp_path):
+    path = str(tmp_path / "log.jsonl")
+    log = DialecticalLog(capacity=2, segment_path=path, flush_every=1)
+    for i in range(5):
+        log.append(f"t{i}")
+    log.append("x", "custom-a", "custom-s")
+    assert len(log) == 6 and log.spilled == 4
+    assert [t for t, _, _ in log] == ["t0", "t1", "t2", "t3", "t4", "x"]
+    assert log[0] == ("t0", antithesis_of("t0"), synthesis_of("t0", antithesis_of("t0")))
+    assert log[-1] == ("x", "custom-a", "custom-s")
+    assert [pos for pos, _ in log.search("t1")] == [1]
+    log.close()
+    assert len(DialecticalLog(capacity=2, segment_path=path)) == 4
+
+
+def test_without_segment_path_history_goes_to_temporary_file():
+    log = DialecticalLog(capacity=3, flush_every=1)
+    for i in range(10):
+        log.append(f"t{i}")
+    path = log.segment_path
+    assert path and os.path.exists(path)
+    assert len(log) == 10
+    assert [t for t, _, _ in log] == [f"t{i}" for i in range(10)]
+    log.close()
+    assert not os.path.exists(path) and len(log) == 3
+
+
+def test_temporary_segment_is_removed_with_the_log():
+    log = DialecticalLog(capacity=1, flush_every=1)
+    log.append("a")
+    log.append("b")
+    path = log.segment_path
+    assert os.path.exists(path)
+    del log
+    assert not os.path.exists(path)
+
+
+def test_given_segment_is_kept_on_close(tmp_path):
+    path = str(tmp_path / "log.jsonl")
+    log = DialecticalLog(capacity=1, segment_path=path, flush_every=100)
+    log.append("a")
+    log.append("b")
+    log.close()
+    del log
+    with open(path, encoding="utf-8") as file:
+        assert json.loads(file.read()) == {"t": "a"}
+
+
+def test_interface_default_log_keeps_everything():
+    fdl = FDLInterface(log_capacity=2)
+    for i in range(6):
+        fdl.interpret_input(f"шаг {i}")
+    assert [t for t, _, _ in fdl.dialectical_log] == [f"шаг {i}" for i in range(6)]
+    path = fdl.dialectical_log.segment_path
+    fdl.close()
+    assert not os.path.exists(path)
+
+
+def test_strings_are_shared_in_memory():
+    log = DialecticalLog(capacity=100)
+    for _ in range(50):
+        log.append("same")
+    assert log.memory_strings() == 1
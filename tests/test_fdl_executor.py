@@ -0,0 +1,106 @@
+import asyncio
+import time
+
+import pytest
+
+from FDLInterfaceProtocol import FDLInterfaceProtocol
+from fdl_executor import FDLExecutor
+
+
+@pytest.fixture
+def protocol():
+    protocol = FDLInterfaceProtocol()
+    protocol.register_agent("echo", lambda query: f"echo:{query}")
+
+    async def shout(query):
+        await asyncio.sleep(0.01)
+        return query.upper()
+
+    protocol.register_agent("shout", shout)
+    protocol.register_logic("double", lambda data: data * 2)
+    yield protocol
+    if protocol._executor is not None:
+        protocol._executor.close()
+
+
+def test_route_many_keeps_order_and_errors(protocol):
+    protocol.attach_filter(lambda text: text.strip())
+    results = protocol.route_many([("echo", " a "), ("shout", "b"), ("missing", "c")])
+    assert results[:2] == ["echo:a", "B"]
+    assert isinstance(results[2], ValueError)
+
+
+def test_route_many_inside_running_loop(protocol):
+    async def notebook_cell():
+        blocking = protocol.route_many([("echo", "x")])
+        awaited = await protocol.executor().route_many([("shout", "y")])
+        return blocking, awaited
+
+    assert asyncio.run(notebook_cell()) == (["echo:x"], ["Y"])
+
+
+def test_slow_sync_filter_does_not_stall_the_loop(protocol):
+    def slow_filter(text):
+        time.sleep(0.2)
+        return text
+
+    protocol.attach_filter(slow_filter)
+    executor = protocol.executor(default_agent_limit=8)
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        start = time.perf_counter()
+        results = await executor.route_many([("echo", str(i)) for i in range(4)])
+        elapsed = time.perf_counter() - start
+        task.cancel()
+        return results, elapsed, ticks
+
+    results, elapsed, ticks = asyncio.run(scenario())
+    assert results == [f"echo:{i}" for i in range(4)]
+    assert elapsed < 0.6      # фильтры выполнялись параллельно, а не 4 × 0.2 с подряд
+    assert ticks >= 5         # цикл событий не блокировался
+
+
+def test_explicit_zero_timeout_is_not_default(protocol):
+    def slow(query):
+        time.sleep(0.05)
+        return query
+
+    protocol.register_agent("slow", slow)
+    executor = FDLExecutor(protocol, default_timeout=5)
+    try:
+        with pytest.raises(TimeoutError):
+            asyncio.run(executor.route_agent("slow", "q", timeout=0))
+        with pytest.raises(TimeoutError):
+            asyncio.run(executor.invoke_logic("double", 2, timeout=0))
+        assert asyncio.run(executor.invoke_logic("double", 2)) == 4
+    finally:
+        executor.close()
+
+
+def test_agent_timeout_and_limits(protocol):
+    def slow(query):
+        time.sleep(0.1)
+        return query
+
+    protocol.register_agent("slow", slow)
+    executor = FDLExecutor(protocol, agent_timeouts={"slow": 0.02}, agent_limits={"echo": 1})
+    try:
+        results = asyncio.run(executor.route_many([("slow", 1), ("echo", 2)], filter_input=False))
+        assert isinstance(results[0], TimeoutError)
+        assert results[1] == "echo:2"
+    finally:
+        executor.close()
+
+
+def test_invoke_many(protocol):
+    executor = protocol.executor()
+    assert asyncio.run(executor.invoke_many([("double", 1), ("double", "ab")])) == [2, "abab"]
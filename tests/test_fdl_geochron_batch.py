@@ -0,0 +1,30 @@
+import datetime
+
+import numpy as np
+
+from fdl_geochron_batch import near_days, strong_flare_days
+from fdl_geochron_lunar import lunar_phase
+from fdl_geochron_navigator import Event, ResonanceMatrix
+
+
+def test_batch_correlation_matches_scalar_correlate():
+    matrix = ResonanceMatrix()
+    base = datetime.date(2024, 1, 1)
+    categories = ["social", "astro", "other", "geo", "unknown"]
+    events = [Event(f"e{i}", "r", categories[i % 5], base + datetime.timedelta(i % 40)) for i in range(200)]
+    flares = [{"max_class": "M1.2", "max_time": "2024-01-05T10:00Z"},
+              {"classType": "X", "begin_time": "2024-01-20T00:00Z"},
+              {"max_class": "C3", "max_time": "2024-01-07T00:00Z"}]
+    batch = matrix.correlate_batch(events, flares)
+    strong = {"2024-01-05", "2024-01-20"}
+    for i, event in enumerate(events):
+        solar = {"classType": "M"} if event.date.isoformat() in strong else {}
+        assert batch.report(i) == matrix.correlate(event, solar, lunar_phase(event.date).name)
+    assert batch.summary()["events"] == 200
+    assert all(report["resonance"] for report in batch.render())
+
+
+def test_flare_window():
+    days = strong_flare_days([{"max_class": "X1", "max_time": "1970-01-11"}])
+    assert days.tolist() == [10]
+    assert near_days(np.array([7, 8, 10, 12, 13]), days, 2).tolist() == [False, True, True, True, False]
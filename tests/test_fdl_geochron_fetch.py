@@ -0,0 +1,31 @@
+import json
+
+import pytest
+
+from fdl_geochron_fetch import FixtureBackend, SolarFeedClient
+
+
+def test_fetch_cache_ttl_etag_and_disk(tmp_path):
+    backend = FixtureBackend({"a.json": {"v": 1}})
+    client = SolarFeedClient(backend=backend, ttl=60, cache_dir=str(tmp_path))
+    assert client.get_json("a.json") == {"v": 1}
+    assert client.get_json("a.json") == {"v": 1}
+    assert len(backend.requests) == 1                      # второй ответ — из кэша
+
+    client.cache.ttl = 0
+    backend.fixtures["a.json"] = {"v": 2}
+    assert client.get_json("a.json") == {"v": 2}           # устаревшая запись перепроверена
+
+    restarted = SolarFeedClient(backend=FixtureBackend({}), ttl=0, cache_dir=str(tmp_path))
+    assert restarted.get_json("a.json") == {"v": 2}       # 404 → последняя копия с диска
+
+
+def test_malformed_body_is_not_cached(tmp_path):
+    backend = FixtureBackend({"a.json": {"v": 1}})
+    client = SolarFeedClient(backend=backend, ttl=0, cache_dir=str(tmp_path))
+    assert client.get_json("a.json") == {"v": 1}
+    backend.fixtures["a.json"] = b'{"v": 2'
+    with pytest.raises(json.JSONDecodeError):
+        client.get_json("a.json")
+    backend.fixtures.clear()
+    assert client.get_json("a.json") == {"v": 1}          # 404 → прежняя целая копия
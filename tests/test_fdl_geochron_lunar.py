@@ -0,0 +1,25 @@
+import datetime
+
+import numpy as np
+import pytest
+
+from fdl_geochron_lunar import lunar_phase, lunar_phase_range, lunar_phases
+
+
+@pytest.mark.parametrize("date, name", [
+    (datetime.date(2024, 1, 11), "New Moon"),
+    (datetime.date(2024, 1, 25), "Full Moon"),
+    (datetime.date(2024, 1, 18), "First Quarter"),
+    (datetime.date(2024, 2, 2), "Last Quarter"),
+])
+def test_lunar_phase_matches_known_dates(date, name):
+    assert lunar_phase(date).name == name
+
+
+def test_lunar_range_matches_single_dates():
+    start = datetime.date(2023, 12, 1)
+    days, names, illumination = lunar_phase_range(start, datetime.date(2024, 3, 1))
+    dates = [start + datetime.timedelta(i) for i in range(len(days))]
+    assert len(days) == 91 and str(days[0]) == "2023-12-01"
+    assert list(names) == [lunar_phase(d).name for d in dates]
+    assert np.allclose(illumination, lunar_phases(dates)[1])
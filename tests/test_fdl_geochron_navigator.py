@@ -0,0 +1,50 @@
+import asyncio
+import datetime
+
+import pytest
+
+from fdl_async import run_sync
+from fdl_geochron_fetch import FixtureBackend, SolarFeedClient
+from fdl_geochron_navigator import AstroParser
+
+FIXTURES = {"a.json": [{"flare": "M1"}], "b.json": {"kp": 3}}
+
+
+@pytest.fixture
+def parser():
+    return AstroParser(SolarFeedClient(backend=FixtureBackend(FIXTURES)))
+
+
+def test_fetch_feeds_outside_loop(parser):
+    result = parser.fetch_feeds(["a.json", "b.json", "missing.json"])
+    assert result["a.json"] == [{"flare": "M1"}]
+    assert result["b.json"] == {"kp": 3}
+    assert "error" in result["missing.json"]
+
+
+def test_fetch_feeds_inside_running_loop(parser):
+    async def notebook_cell():
+        synchronous = parser.fetch_feeds(["b.json"])
+        awaited = await parser.fetch_feeds_async(["a.json"])
+        return synchronous, awaited
+
+    synchronous, awaited = asyncio.run(notebook_cell())
+    assert synchronous == {"b.json": {"kp": 3}}
+    assert awaited == {"a.json": [{"flare": "M1"}]}
+
+
+def test_run_sync_propagates_errors_inside_loop():
+    async def boom():
+        raise KeyError("x")
+
+    async def cell():
+        with pytest.raises(KeyError):
+            run_sync(boom())
+
+    asyncio.run(cell())
+
+
+def test_lunar_phase_is_local(parser):
+    phase = parser.lunar_phase(datetime.date(2024, 1, 11))  # новолуние 11.01.2024
+    assert phase.illumination < 0.02
+    assert parser.fetch_lunar_phase(datetime.date(2024, 1, 25)) == parser.lunar_phase(datetime.date(2024, 1, 25)).name
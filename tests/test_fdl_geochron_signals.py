@@ -0,0 +1,45 @@
+import datetime
+
+import numpy as np
+import pytest
+
+from fdl_geochron_signals import SECOND, BioSignalStore, SignalSeries
+
+
+def naive_window(stamps, values, window):
+    last = stamps[-1]
+    selected = [v for t, v in zip(stamps, values) if t > last - window] or [values[-1]]
+    return len(selected), np.mean(selected), min(selected), max(selected)
+
+
+def test_extend_matches_append_and_naive_window():
+    rng = np.random.default_rng(7)
+    stamps = np.cumsum(rng.integers(0, 3 * SECOND, 2000)).astype(np.int64)
+    values = rng.normal(60, 10, 2000)
+    one, batch = SignalSeries("hr", capacity=512), SignalSeries("hr", capacity=512)
+    for t, v in zip(stamps, values):
+        one.append(int(t), float(v))
+    for part in np.array_split(np.arange(2000), 7):
+        batch.extend(stamps[part], values[part])
+    a, b = one.stats(), batch.stats()
+    for key in ("count", "min", "max", "last", "timestamp"):
+        assert a[key] == b[key]
+    assert a["mean"] == pytest.approx(b["mean"]) and a["ewma"] == pytest.approx(b["ewma"])
+    count, mean, low, high = naive_window(stamps.tolist(), values.tolist(), one.window)
+    assert (a["count"], a["min"], a["max"]) == (count, low, high) and a["mean"] == pytest.approx(mean)
+    assert len(one) == 512 and np.array_equal(one.range()["value"], values[-512:])
+    minutes_one, minutes_batch = one.range(resolution=60 * SECOND), batch.range(resolution=60 * SECOND)
+    assert np.array_equal(minutes_one["count"], minutes_batch["count"])
+    assert minutes_one["count"].sum() == 2000
+
+
+def test_store_rejects_out_of_order_and_queries_range():
+    store = BioSignalStore(capacity=16)
+    start = datetime.datetime(2024, 1, 1)
+    series = store.series("hrv", "ms")
+    series.extend([start + datetime.timedelta(seconds=s) for s in range(10)], list(range(10)))
+    with pytest.raises(ValueError):
+        series.append(start, 1.0)
+    window = store.range("hrv", start + datetime.timedelta(seconds=3), start + datetime.timedelta(seconds=6))
+    assert window["value"].tolist() == [3.0, 4.0, 5.0]
+    assert store.range("missing").size == 0 and store.types() == ["hrv"]
@@ -0,0 +1,47 @@
+import copy
+
+from fdl_glyph_engine import GlyphTranslator, TranslatorCache, WatchedDict, WatchedList
+
+
+def test_glyph_translator_single_pass_and_stream():
+    translator = GlyphTranslator({"𐰴": "[Свет]", "ab": "[AB]", "a": "[A]"}, filter_terms=["запрет"])
+    text = "𐰴 ab a запрет [Свет]"
+    assert translator.translate(text) == "[Свет] [AB] [A] [∅] [Свет]"
+    for size in (1, 2, 3, 7):
+        assert "".join(translator.translate_stream([text[i:i + size] for i in range(0, len(text), size)],
+                                                   chunk_size=size)) == translator.translate(text)
+
+
+def test_translator_cache_rebuilds_only_after_invalidate():
+    cache, builds = TranslatorCache(), []
+
+    def build():
+        builds.append(1)
+        return GlyphTranslator({})
+
+    cache.get(build)
+    cache.get(build)
+    cache.invalidate()
+    cache.get(build)
+    assert len(builds) == 2
+
+
+def test_watched_containers_report_every_edit():
+    changes = []
+    table = WatchedDict({"a": {"meaning": "x"}}, on_change=lambda: changes.append(1))
+    table["a"]["meaning"] = "y"
+    table["b"] = {"meaning": "z"}
+    table["b"]["meaning"] = "w"
+    table.update(c={})
+    table.setdefault("d", {})
+    table.pop("d")
+    del table["c"]
+    assert len(changes) == 7
+    assert type(copy.deepcopy(table)) is dict and type(copy.deepcopy(table)["a"]) is dict
+
+    terms = WatchedList(["a"], on_change=lambda: changes.append(1))
+    terms.append("b")
+    terms += ["c"]
+    terms[:] = ["d"]
+    terms.remove("d")
+    assert len(changes) == 11 and terms == [] and type(copy.copy(terms)) is list
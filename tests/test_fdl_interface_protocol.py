@@ -0,0 +1,70 @@
+import copy
+
+import pytest
+
+import FDLInterfaceProtocol as protocol
+from FDLInterfaceProtocol import FDLInterface
+
+
+@pytest.fixture(autouse=True)
+def restore_registry():
+    glyphs = copy.deepcopy(protocol.FDL_GLYPH_REGISTRY)
+    terms = list(protocol.SENSE_FILTER_TERMS)
+    yield
+    protocol.FDL_GLYPH_REGISTRY.clear()
+    protocol.FDL_GLYPH_REGISTRY.update(glyphs)
+    protocol.SENSE_FILTER_TERMS[:] = terms
+
+
+def test_process_input_decodes_glyphs_and_masks_terms():
+    assert protocol.fdl_process_input("𐰴 и власть") == "[Свет → svet-path] и [∅]"
+    assert protocol.apply_sense_filter("вина и насилие") == "[∅] и [∅]"
+
+
+def test_direct_term_append_rebuilds_translators():
+    assert protocol.apply_sense_filter("ложь") == "ложь"
+    protocol.SENSE_FILTER_TERMS.append("ложь")
+    assert protocol.apply_sense_filter("ложь") == "[∅]"
+    assert protocol.fdl_process_input("ложь") == "[∅]"
+
+
+def test_same_size_registry_replacement_rebuilds():
+    assert protocol.fdl_process_input("ⴰ") == "[Жизнь → bio-flow]"
+    protocol.FDL_GLYPH_REGISTRY["ⴰ"] = {"meaning": "Дыхание", "route": "breath"}
+    assert protocol.fdl_process_input("ⴰ") == "[Дыхание → breath]"
+    protocol.FDL_GLYPH_REGISTRY["ⴰ"]["meaning"] = "Ритм"
+    assert protocol.fdl_process_input("ⴰ") == "[Ритм → breath]"
+
+
+def test_register_glyph_and_set_terms():
+    protocol.register_glyph("Ж", "Жар", "fire")
+    protocol.set_sense_filter_terms(["страх"])
+    assert protocol.fdl_process_input("Ж страх власть") == "[Жар → fire] [∅] власть"
+
+
+def test_process_stream_matches_translate():
+    text = "𐰴𓂀 власть Ꙏ " * 500
+    assert "".join(protocol.fdl_process_stream([text[i:i + 7] for i in range(0, len(text), 7)])) == \
+        protocol.fdl_process_input(text)
+
+
+def test_semantic_fields():
+    assert protocol.decode_semantic_fields("ⴰⵔⴰⵎ ⵣⴰⵎⵎⴻⵙⵉⵏⵉ") == "[Свет] [Истина]"
+
+
+def test_interface_glyph_table_follows_direct_edits(tmp_path):
+    interface = FDLInterface(log_path=str(tmp_path / "log.jsonl"))
+    interface.register_glyph("𐰴", "Свет")
+    assert interface.apply_semantic_filter("𐰴") == "[Свет]"
+    interface.semantic_glyphs["𐰴"] = "Поток"
+    assert interface.apply_semantic_filter("𐰴") == "[Поток]"
+    interface.semantic_glyphs = {"𐰴": "Волна"}
+    assert interface.apply_semantic_filter("𐰴") == "[Волна]"
+    interface.close()
+
+
+def test_unchanged_registry_reuses_translator():
+    engine = protocol.glyph_engine()
+    assert protocol.glyph_engine() is engine
+    protocol.FDL_GLYPH_REGISTRY.pop("ⴰ")
+    assert protocol.glyph_engine() is not engine
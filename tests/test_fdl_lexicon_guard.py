@@ -0,0 +1,70 @@
+import io
+import threading
+
+from fdl_lexicon_guard import LexiconGuard
+
+SAMPLE = "The inclusive economy is part of our Sustainable Development plan."
+
+
+def test_scan_finds_triggers_case_insensitively():
+    findings = LexiconGuard().scan(SAMPLE)
+    assert set(findings) == {"inclusive economy", "sustainable development"}
+    assert findings["inclusive economy"].startswith("возможна подмена")
+
+
+def test_find_reports_original_offsets():
+    guard = LexiconGuard()
+    text = "ÄÖ smart society"
+    assert guard.find(text) == [(3, 16, "smart society")]
+
+
+def test_word_boundary():
+    guard = LexiconGuard(word_boundary=True)
+    guard.set_triggers({"ai": "x"})
+    assert guard.scan("said") == {}
+    assert guard.scan("an ai here") == {"ai": "x"}
+
+
+def test_direct_mutation_rebuilds_automaton():
+    guard = LexiconGuard()
+    guard.triggers["digital id"] = "проверить добровольность"
+    assert guard.scan("a digital id for all") == {"digital id": "проверить добровольность"}
+    del guard.triggers["inclusive economy"]
+    assert "inclusive economy" not in guard.scan(SAMPLE)
+    guard.triggers.update({"plan": "уточнить"})
+    assert guard.scan(SAMPLE)["plan"] == "уточнить"
+    guard.triggers = {"economy": "e"}
+    assert guard.scan(SAMPLE) == {"economy": "e"}
+    assert dict(guard.triggers) == {"economy": "e"}
+
+
+def test_scan_stream_across_chunk_boundaries():
+    guard = LexiconGuard()
+    text = ("filler " * 50 + "zero ownership ") * 20
+    hits = list(guard.scan_stream(io.BytesIO(text.encode()), chunk_size=16))
+    assert len(hits) == 20
+    assert {key for _, _, key in hits} == {"zero ownership"}
+
+
+def test_concurrent_swaps_keep_triggers_and_automaton_consistent():
+    guard = LexiconGuard()
+    sets = [{"inclusive economy": "A"}, {"sustainable development": "B", "plan": "C"}]
+    guard.set_triggers(sets[0])
+    stop = threading.Event()
+    results = []
+
+    def swapper():
+        i = 0
+        while not stop.is_set():
+            i += 1
+            guard.set_triggers(sets[i % 2])
+
+    thread = threading.Thread(target=swapper)
+    thread.start()
+    try:
+        for _ in range(2000):
+            results.append(guard.scan(SAMPLE))
+    finally:
+        stop.set()
+        thread.join()
+    assert all(findings in sets for findings in results)
@@ -0,0 +1,51 @@
+import io
+
+from fdl_lexicon_guard import LexiconGuard
+import fdl_lexicon_stream
+from fdl_lexicon_stream import iter_corpus, scan_files
+
+
+def test_stream_byte_offsets_match_source():
+    guard = LexiconGuard()
+    text = "Ёлка — smart society; ещё раз SMART SOCIETY."
+    data = text.encode("utf-8")
+    hits = list(guard.scan_stream(io.BytesIO(data), chunk_size=5))
+    assert [data[start:end].decode().lower() for start, end, _ in hits] == ["smart society"] * 2
+
+
+def test_scan_files_aggregates_corpus(tmp_path):
+    (tmp_path / "a.txt").write_text("zero ownership and zero ownership", encoding="utf-8")
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "b.txt").write_text("AI regulation, zero ownership", encoding="utf-8")
+    (tmp_path / "skip.bin").write_bytes(b"zero ownership")
+    guard = LexiconGuard()
+    report = scan_files(iter_corpus([str(tmp_path)], (".txt",)), guard.triggers, workers=2)
+    assert report["files"] == 2
+    assert report["triggers"]["zero ownership"]["count"] == 3
+    assert report["triggers"]["zero ownership"]["files"] == 2
+    assert report["triggers"]["AI regulation"]["comment"] == guard.triggers["AI regulation"]
+
+
+def test_paths_are_consumed_lazily(tmp_path, monkeypatch):
+    monkeypatch.setattr(fdl_lexicon_stream, "INFLIGHT_PER_WORKER", 2)
+    path = tmp_path / "doc.txt"
+    path.write_text("smart society", encoding="utf-8")
+    pulled = []
+
+    def paths():
+        for i in range(40):
+            pulled.append(i)
+            yield str(path)
+
+    seen = []
+    original = fdl_lexicon_stream._bounded_map
+
+    def spy(pool, fn, items, window):
+        for result in original(pool, fn, items, window):
+            seen.append(len(pulled))
+            yield result
+
+    monkeypatch.setattr(fdl_lexicon_stream, "_bounded_map", spy)
+    report = scan_files(paths(), {"smart society": ""}, workers=1)
+    assert report["triggers"]["smart society"]["count"] == 40
+    assert seen[0] <= 2
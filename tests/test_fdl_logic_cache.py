@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from fdl_logic_cache import LogicCache, UncacheableInput, stable_hash
+
+
+def test_stable_hash_ignores_key_order_and_distinguishes_types():
+    assert stable_hash({"a": 1, "b": [1, 2]}) == stable_hash({"b": [1, 2], "a": 1})
+    assert len({stable_hash(v) for v in (1, 1.0, True, "1", (1,), [1])}) == 6
+    assert stable_hash(("ab", "c")) != stable_hash(("a", "bc"))
+    with pytest.raises(UncacheableInput):
+        stable_hash(object())
+
+
+def test_lru_and_ttl():
+    now = [0.0]
+    cache = LogicCache(maxsize=2, ttl=10, clock=lambda: now[0])
+    calls = []
+
+    def compute(x):
+        calls.append(x)
+        return x * 2
+
+    assert [cache.call(x, compute) for x in (1, 2, 1, 3, 2)] == [2, 4, 2, 6, 4]
+    assert calls == [1, 2, 3, 2]          # 2 вытеснена при добавлении 3
+    now[0] = 11
+    cache.call(3, compute)
+    assert calls[-1] == 3
+    assert cache.stats()["expirations"] == 1
+
+
+def test_errors_are_not_cached():
+    cache = LogicCache()
+    with pytest.raises(ZeroDivisionError):
+        cache.call(0, lambda x: 1 / x)
+    assert cache.call(0, lambda x: "ok") == "ok"
+
+
+def test_uncacheable_input_is_computed_directly():
+    cache = LogicCache()
+    assert cache.call(object, lambda x: "ok") == "ok"
+    assert cache.stats()["uncacheable"] == 1
+
+
+def test_threads_coalesce():
+    cache = LogicCache()
+    calls = []
+
+    def compute(x):
+        calls.append(x)
+        time.sleep(0.05)
+        return x
+
+    threads = [threading.Thread(target=cache.call, args=("k", compute)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert calls == ["k"]
+
+
+def test_waiter_timeout_does_not_break_leader():
+    cache = LogicCache()
+
+    async def compute(x):
+        await asyncio.sleep(0.1)
+        return x + 1
+
+    async def scenario():
+        leader = asyncio.create_task(cache.call_async(1, compute))
+        await asyncio.sleep(0)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(cache.call_async(1, compute), 0.02)
+        late_waiter = asyncio.create_task(cache.call_async(1, compute))
+        return await leader, await late_waiter
+
+    assert asyncio.run(scenario()) == (2, 2)
+    assert cache.stats()["misses"] == 1
+
+
+def test_cancelled_leader_lets_waiters_recompute():
+    cache = LogicCache()
+    calls = []
+
+    async def compute(x):
+        calls.append(x)
+        await asyncio.sleep(0.05)
+        return x * 10
+
+    async def scenario():
+        leader = asyncio.create_task(cache.call_async(3, compute))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(cache.call_async(3, compute)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.gather(*waiters)
+
+    assert asyncio.run(scenario()) == [30, 30, 30]
+    assert calls == [3, 3]
+
+
+def test_real_errors_reach_async_waiters():
+    cache = LogicCache()
+
+    async def compute(x):
+        await asyncio.sleep(0.02)
+        raise KeyError(x)
+
+    async def scenario():
+        return await asyncio.gather(*(cache.call_async("k", compute) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(r, KeyError) for r in asyncio.run(scenario()))
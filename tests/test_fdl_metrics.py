@@ -0,0 +1,83 @@
+import asyncio
+import urllib.request
+
+import pytest
+
+from fdl_metrics import MetricsRegistry, timed
+
+
+@pytest.fixture
+def registry():
+    registry = MetricsRegistry()
+    yield registry
+    registry.disable()
+
+
+def test_timed_is_a_no_op_until_enabled(registry):
+    @timed("work_seconds", "Работа", registry=registry, op="sync")
+    def work(x):
+        return x * 2
+
+    @timed("work_seconds", registry=registry, op="async")
+    async def work_async(x):
+        return x + 1
+
+    assert work(2) == 4 and asyncio.run(work_async(1)) == 2
+    assert registry.snapshot()["work_seconds"]["series"] == []
+    registry.enable()
+    work(1)
+    work(1)
+    asyncio.run(work_async(1))
+    series = {s["labels"]["op"]: s for s in registry.snapshot()["work_seconds"]["series"]}
+    assert series["sync"]["count"] == 2 and series["async"]["count"] == 1
+
+
+def test_prometheus_exposition(registry):
+    registry.enable()
+    registry.inc("requests_total", agent='a"b')
+    registry.inc("requests_total", 2, agent='a"b')
+    histogram = registry.histogram("latency_seconds", "Задержка", buckets=(0.1, 1.0))
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    text = registry.render_prometheus()
+    assert 'requests_total{agent="a\\"b"} 3' in text
+    assert "# HELP latency_seconds Задержка" in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text and 'latency_seconds_bucket{le="+Inf"} 2' in text
+    assert "latency_seconds_count 2" in text
+    registry.reset()
+    assert "latency_seconds_count" not in registry.render_prometheus()
+
+
+def test_name_cannot_change_type(registry):
+    registry.counter("x")
+    with pytest.raises(TypeError):
+        registry.histogram("x")
+
+
+def test_later_registration_fills_missing_help(registry):
+    registry.enable()
+    with registry.timer("step_seconds"):
+        pass
+    registry.histogram("step_seconds", "Шаг")
+    registry.histogram("step_seconds", "Другое описание")
+    assert registry.snapshot()["step_seconds"]["help"] == "Шаг"
+
+
+def test_protocol_metrics_have_help():
+    import FDLInterfaceProtocol  # noqa: F401 — регистрирует метрики протокола и исполнителя
+    from fdl_metrics import METRICS
+
+    helps = {name: entry["help"] for name, entry in METRICS.snapshot().items()}
+    for name in ("fdl_interpret_input_seconds", "fdl_invoke_logic_seconds", "fdl_route_agent_seconds"):
+        assert helps[name]
+
+
+def test_metrics_endpoint(registry):
+    registry.enable()
+    registry.inc("hits_total")
+    server = registry.serve(port=0)
+    try:
+        with urllib.request.urlopen(server.url + "/metrics", timeout=5) as response:
+            assert "hits_total 1" in response.read().decode("utf-8")
+    finally:
+        server.close()
@@ -0,0 +1,14 @@
+from fdl_pranoveya import SemanticIndex, parse_semantic_field
+
+
+def test_semantic_index_longest_match_and_reload():
+    index = SemanticIndex()
+    assert index.load("f1", "ⴰⵔ = Короткое; ⴰⵔⴰⵎ = Свет\nлишнее") == 2
+    index.load("f2", {"ⴰⵔ": "Переопределено", 1: "x"})
+    assert index.decode("ⴰⵔⴰⵎ ⴰⵔ ⴰ") == "[Свет] [Переопределено] ⴰ"
+    assert [(m.word, m.field) for m in index.find("ⴰⵔⴰⵎⴰⵔ")] == [("ⴰⵔⴰⵎ", "f1"), ("ⴰⵔ", "f2")]
+    index.remove("f2")
+    assert index.decode("ⴰⵔ", "{word}:{meaning}:{field}") == "ⴰⵔ:Короткое:f1"
+    index.remove("f1")
+    assert len(index) == 0 and index.decode("ⴰⵔ") == "ⴰⵔ"
+    assert parse_semantic_field(42) == {}
@@ -0,0 +1,95 @@
+import datetime
+
+import pytest
+
+import FDLToken
+from FDLToken import FDLToken as Token, FDLTokenLedger, from_micros, to_micros
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "pure"])
+def numpy_mode(request, monkeypatch):
+    if not request.param:
+        monkeypatch.setattr(FDLToken, "NUMPY_ENABLED", False)
+    return request.param
+
+
+def test_token_value_formula():
+    assert Token(10, 0.8, 0.9, 3.5).token_value() == pytest.approx(10 * 0.8 * 0.9 / 3.5)
+    with pytest.raises(ValueError):
+        Token(1, 1, 1, 0).token_value()
+
+
+def test_micros_round_trip():
+    moment = datetime.datetime(2024, 2, 29, 13, 45, 1, 123456)
+    assert from_micros(to_micros(moment)) == moment
+
+
+def test_add_token_and_reports():
+    ledger = FDLTokenLedger()
+    token = Token(10, 0.8, 0.9, 3.5)
+    ledger.add_token(token)
+    assert ledger.report(0) == token.report()
+    assert ledger.get_all_reports() == [token.report()]
+    assert ledger.total_value() == pytest.approx(token.token_value())
+
+
+def test_bulk_matches_single(numpy_mode):
+    columns = ([10, 5, 7.5], [0.8, 0.9, 0.1], [0.9, 0.95, 1.0], [3.5, 2.0, 0.5])
+    stamps = [datetime.datetime(2024, 1, 1, h) for h in range(3)]
+    ledger = FDLTokenLedger()
+    assert ledger.add_tokens(*columns, timestamps=stamps) == 3
+    expected = sum(i * d * e / r for i, d, e, r in zip(*columns))
+    assert ledger.total_value() == pytest.approx(expected)
+    assert ledger.recompute_total() == pytest.approx(expected)
+    assert [r["timestamp"] for r in ledger.iter_reports()] == [s.isoformat() for s in stamps]
+    assert len({r["token_id"] for r in ledger.iter_reports()}) == 3
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"timestamps": [0, "bad"]},
+    {"resources_used": [1, 0]},
+    {"impulses": [1, "x"]},
+])
+def test_failed_bulk_insert_leaves_ledger_untouched(numpy_mode, kwargs):
+    ledger = FDLTokenLedger()
+    ledger.add_token(Token(10, 0.8, 0.9, 3.5))
+    before = (ledger.get_all_reports(), ledger.total_value())
+    columns = {"impulses": [1, 2], "semantic_density": [1, 1], "efficiency": [1, 1], "resources_used": [1, 1]}
+    kwargs = dict(kwargs)
+    timestamps = kwargs.pop("timestamps", None)
+    columns.update(kwargs)
+    with pytest.raises((ValueError, TypeError)):
+        ledger.add_tokens(timestamps=timestamps, **columns)
+    assert (ledger.get_all_reports(), ledger.total_value()) == before
+    assert len({len(ledger.timestamps), len(ledger.impulses), len(ledger.values), len(ledger.token_ids) // 16}) == 1
+
+
+def test_failed_add_token_leaves_ledger_untouched():
+    ledger = FDLTokenLedger()
+    bad = Token(1, 1, 1, 1)
+    bad.timestamp = "not a datetime"
+    with pytest.raises(TypeError):
+        ledger.add_token(bad)
+    assert len(ledger.timestamps) == len(ledger.values) == len(ledger.token_ids) == 0
+
+
+def test_tokens_sequence_routes_appends():
+    ledger = FDLTokenLedger()
+    token = Token(5, 0.9, 0.95, 2.0)
+    ledger.tokens.append(token)
+    ledger.tokens.extend([Token(1, 1, 1, 1)])
+    assert len(ledger.tokens) == 2
+    assert ledger.tokens[0].token_id == token.token_id
+    assert ledger.tokens[-1].token_value() == 1.0
+    assert [view.impulses for view in ledger.tokens[:2]] == [5, 1]
+    with pytest.raises(IndexError):
+        ledger.tokens[2]
+
+
+def test_csv_import(tmp_path):
+    path = tmp_path / "tokens.csv"
+    path.write_text("impulses,semantic_density,efficiency,resources_used,timestamp\n"
+                    "10,0.8,0.9,3.5,2024-01-01T00:00:00\n5,0.9,0.95,2.0,2024-01-02T00:00:00\n", encoding="utf-8")
+    ledger = FDLTokenLedger()
+    assert ledger.add_tokens_csv(str(path)) == 2
+    assert ledger.report(1)["timestamp"] == "2024-01-02T00:00:00"
@@ -0,0 +1,50 @@
+import datetime
+
+import pytest
+
+from FDLToken import FDLTokenLedger
+
+BASE = datetime.datetime(2024, 1, 1)
+
+
+def make_ledger(rows):
+    ledger = FDLTokenLedger()
+    ledger.add_tokens(
+        [r[1] for r in rows], [0.5] * len(rows), [1.0] * len(rows), [1.0] * len(rows),
+        timestamps=[BASE + datetime.timedelta(minutes=r[0]) for r in rows])
+    return ledger
+
+
+def test_query_engine_is_cached_and_incremental():
+    ledger = make_ledger([(0, 2), (30, 4)])
+    engine = ledger.query()
+    assert ledger.query() is engine
+    assert ledger.query(top_capacity=5) is not engine
+    assert ledger.query(top_capacity=5) is ledger.query(top_capacity=5)
+    assert engine.range_summary()["count"] == 2
+
+    ledger.add_tokens([6], [0.5], [1.0], [1.0], timestamps=[BASE + datetime.timedelta(minutes=90)])
+    assert engine.refresh() == 1
+    assert engine.refresh() == 0
+    assert ledger.query().range_summary()["count"] == 3
+
+
+def test_range_rollup_and_top():
+    ledger = make_ledger([(90, 6), (0, 2), (30, 4)])
+    query = ledger.query()
+    summary = query.range_summary(BASE, BASE + datetime.timedelta(hours=1))
+    assert summary == {"count": 2, "sum": pytest.approx(3.0), "mean": pytest.approx(1.5)}
+    assert [b["count"] for b in query.rollup("hour")] == [2, 1]
+    assert [view.impulses for view in query.top(2)] == [6, 4]
+    assert [view.impulses for view in query.top(1, start=BASE, end=BASE + datetime.timedelta(hours=1))] == [4]
+
+
+def test_percentiles_histogram_and_exact():
+    ledger = FDLTokenLedger()
+    ledger.add_tokens([1] * 101, [i / 100 for i in range(101)], [1.0] * 101, [1.0] * 101,
+                      timestamps=list(range(101)))
+    query = ledger.query()
+    assert query.percentiles("semantic_density", (50,))[50] == pytest.approx(0.5, abs=0.002)
+    assert query.percentiles("semantic_density", (50,), start=0, end=51)[50] == pytest.approx(0.25)
+    with pytest.raises(ValueError):
+        query.percentiles("impulses")
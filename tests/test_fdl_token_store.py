@@ -0,0 +1,101 @@
+import json
+import os
+
+import pytest
+
+from FDLToken import FDLToken, FDLTokenLedger
+from FDLTokenStore import HEADER_SIZE, RECORD_SIZE, FDLTokenStore, LedgerIntegrityError
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    path = str(tmp_path / "ledger.fdl")
+    store = FDLTokenStore(path)
+    ledger = FDLTokenLedger()
+    ledger.add_tokens(list(range(1, 101)), [0.5] * 100, [0.9] * 100, [2.0] * 100,
+                      timestamps=list(range(100)))
+    store.append_ledger(ledger)
+    store.close()
+    return path
+
+
+def flip_bit(path, record, byte=20):
+    with open(path, "r+b") as file:
+        file.seek(HEADER_SIZE + record * RECORD_SIZE + byte)
+        value = file.read(1)[0]
+        file.seek(-1, os.SEEK_CUR)
+        file.write(bytes([value ^ 1]))
+
+
+def test_round_trip(store_path):
+    store = FDLTokenStore(store_path)
+    assert len(store) == 100
+    assert store.verify(incremental=False) == 100
+    ledger = store.load_ledger()
+    assert ledger.total_value() == pytest.approx(sum(i * 0.5 * 0.9 / 2.0 for i in range(1, 101)))
+    assert store.row(99)["impulses"] == 100
+    token = FDLToken(3, 1, 1, 1)
+    store.append(token)
+    store.close()
+    assert len(FDLTokenStore(store_path)) == 101
+
+
+def test_torn_tail_is_dropped(store_path):
+    with open(store_path, "ab") as file:
+        file.write(b"\x01" * 40)
+    store = FDLTokenStore(store_path)
+    assert len(store) == 100
+    assert os.path.getsize(store_path) == HEADER_SIZE + 100 * RECORD_SIZE
+    store.close()
+
+
+def test_tampered_record_raises_and_keeps_file(store_path):
+    size = os.path.getsize(store_path)
+    flip_bit(store_path, 5)
+    with pytest.raises(LedgerIntegrityError, match="record 5"):
+        FDLTokenStore(store_path)
+    assert os.path.getsize(store_path) == size
+
+
+def test_tamper_before_checkpoint_is_caught_by_full_verify(store_path):
+    store = FDLTokenStore(store_path)
+    store.verify()
+    store.close()
+    flip_bit(store_path, 5)
+    store = FDLTokenStore(store_path)  # incremental: records up to the checkpoint are trusted
+    with pytest.raises(LedgerIntegrityError):
+        store.verify(incremental=False)
+    store.close()
+
+
+@pytest.mark.parametrize("checkpoint", [
+    {"count": 50, "chain": "00" * 32},
+    {"count": 500, "chain": "00" * 32},
+    "not json",
+])
+def test_mismatched_checkpoint_is_ignored(store_path, checkpoint):
+    with open(store_path + ".ckpt", "w", encoding="utf-8") as file:
+        file.write(checkpoint if isinstance(checkpoint, str) else json.dumps(checkpoint))
+    size = os.path.getsize(store_path)
+    store = FDLTokenStore(store_path)
+    assert len(store) == 100
+    assert store.verify() == 100
+    store.close()
+    assert os.path.getsize(store_path) == size
+
+
+def test_reports_stream_from_the_map(store_path, tmp_path, monkeypatch):
+    store = FDLTokenStore(store_path)
+    store.append(FDLToken(7, 0.25, 0.5, 3.0))
+    expected = list(store.load_ledger().iter_reports())
+
+    def no_ledger():
+        raise AssertionError("iter_reports must not load the ledger")
+
+    monkeypatch.setattr(store, "load_ledger", no_ledger)
+    assert list(store.iter_reports()) == expected
+    path = str(tmp_path / "reports.json")
+    store.export_reports(path)
+    with open(path, encoding="utf-8") as file:
+        assert json.load(file) == expected
+    store.close()
@@ -0,0 +1,122 @@
+import os
+
+import pytest
+
+from protonovea_drive import DriveSync
+from tests.fake_drive import FakeDriveService, FakeMediaUpload
+
+CHUNK = 256 * 1024
+
+
+@pytest.fixture
+def drive():
+    return FakeDriveService(page_size_limit=3)
+
+
+@pytest.fixture
+def sync(drive, tmp_path):
+    return DriveSync(lambda: drive, manifest_path=str(tmp_path / "manifest.json"),
+                     media_upload=FakeMediaUpload, chunk_size=CHUNK, workers=1)
+
+
+def test_full_listing_pages_then_changes_feed(drive, sync):
+    ids = [drive.put(f"f{i}.txt", b"x" * i)["id"] for i in range(8)]
+    summary = sync.sync()
+    assert summary["mode"] == "full" and summary["added"] == 8
+    assert summary["pages"] == 3                     # 8 файлов по 3 на страницу
+    drive.calls.clear()
+
+    drive.put("new.txt", b"new")
+    drive.put("f0.txt", b"changed", file_id=ids[0])
+    drive.trash(ids[1])
+    drive.remove(ids[2])
+    summary = sync.sync()
+    assert (summary["mode"], summary["added"], summary["updated"], summary["removed"]) == ("changes", 1, 1, 2)
+    assert "files.list" not in drive.calls
+    files = sync.load_manifest()["files"]
+    assert len(files) == 7 and files[ids[0]]["size"] == "7"
+
+    assert sync.sync()["pages"] == 1 and len(sync.load_manifest()["files"]) == 7
+
+
+def test_resumable_upload_continues_after_failure(drive, sync, tmp_path):
+    path = tmp_path / "big.bin"
+    content = os.urandom(CHUNK * 4 + 123)
+    path.write_bytes(content)
+    drive.fail_every = 3
+    with pytest.raises(ConnectionError):
+        sync.upload(str(path))
+    saved = sync._load_transfers()["upload:" + os.path.abspath(path)]
+    assert saved["progress"] == 2 * CHUNK
+
+    drive.fail_every = 0
+    meta = sync.upload(str(path))
+    assert drive._content[meta["id"]] == content
+    assert sync._load_transfers() == {}
+
+
+def test_download_resumes_with_range(drive, sync, tmp_path):
+    content = os.urandom(CHUNK * 5)
+    file_id = drive.put("data.bin", content)["id"]
+    target = str(tmp_path / "data.bin")
+    drive.fail_every = 4
+    with pytest.raises(ConnectionError):
+        sync.download(file_id, target)
+    assert os.path.getsize(target + ".part") == 3 * CHUNK
+
+    drive.fail_every = 0
+    drive.calls.clear()
+    sync.download(file_id, target)
+    assert drive.calls.count("files.get_media") == 2     # только недостающие куски
+    with open(target, "rb") as file:
+        assert file.read() == content
+    assert not os.path.exists(target + ".part") and sync._load_transfers() == {}
+
+
+def test_download_restarts_when_remote_file_changed(drive, sync, tmp_path):
+    file_id = drive.put("data.bin", os.urandom(CHUNK * 4))["id"]
+    target = str(tmp_path / "data.bin")
+    drive.fail_every = 3
+    with pytest.raises(ConnectionError):
+        sync.download(file_id, target)
+
+    drive.fail_every = 0
+    replacement = os.urandom(CHUNK * 4)                    # тот же размер, другое содержимое
+    drive.put("data.bin", replacement, file_id=file_id)
+    sync.download(file_id, target)
+    with open(target, "rb") as file:
+        assert file.read() == replacement
+
+
+def test_short_download_keeps_part_for_resume(drive, sync, tmp_path):
+    content = os.urandom(CHUNK * 4)
+    file_id = drive.put("data.bin", content)["id"]
+    target = str(tmp_path / "data.bin")
+    drive.set_content(file_id, content[:CHUNK * 2])       # сервер отдаёт меньше, чем size
+    with pytest.raises(IOError):
+        sync.download(file_id, target)
+    assert not os.path.exists(target) and os.path.getsize(target + ".part") == 2 * CHUNK
+
+    drive.set_content(file_id, content)
+    drive.calls.clear()
+    sync.download(file_id, target)
+    assert drive.calls.count("files.get_media") == 2
+    with open(target, "rb") as file:
+        assert file.read() == content
+
+
+def test_download_with_wrong_md5_is_discarded(drive, sync, tmp_path):
+    file_id = drive.put("data.bin", os.urandom(CHUNK * 2))["id"]
+    target = str(tmp_path / "data.bin")
+    drive.set_content(file_id, os.urandom(CHUNK * 2))      # тот же размер, md5 не совпадает
+    with pytest.raises(IOError):
+        sync.download(file_id, target)
+    assert not os.path.exists(target) and not os.path.exists(target + ".part")
+    assert sync._load_transfers() == {}
+
+
+def test_download_many_reports_per_target(drive, sync, tmp_path):
+    first = drive.put("a", b"alpha")["id"]
+    results = sync.download_many({first: str(tmp_path / "a"), "missing": str(tmp_path / "b")})
+    assert results[0]["ok"] and not results[1]["ok"]
+    assert (tmp_path / "a").read_bytes() == b"alpha"
@@ -0,0 +1,45 @@
+from difflib import SequenceMatcher
+
+from protonovea_index import MemoryIndex, entry_text, trigrams
+
+KNOWLEDGE = [
+    "Вектор гармонии настраивается через баланс потоков",
+    "Гармония смысла",
+    "Резонанс громады и цифровые мосты",
+    {"тема": "свет", "смысл": "поток гармонии"},
+    "Совершенно другая тема про экономику",
+]
+
+
+def test_fuzzy_search_matches_brute_force_ranking():
+    index = MemoryIndex.build({"knowledge": KNOWLEDGE}, min_overlap=0.0)
+    query = "гармония потоков"
+    brute = sorted(((SequenceMatcher(None, entry_text(e).casefold(), query).ratio(), i)
+                    for i, e in enumerate(KNOWLEDGE)), key=lambda pair: (-pair[0], pair[1]))
+    results = index.search(query, k=3)
+    assert [entry for _, entry in results[:2]] == [KNOWLEDGE[i] for _, i in brute[:2]]
+    assert [score for score, _ in results[:2]] == [round(score, 4) for score, _ in brute[:2]]
+    # Без общих триграмм запись не становится кандидатом, даже если SequenceMatcher дал бы ей балл
+    assert KNOWLEDGE[2] not in [entry for _, entry in results]
+
+
+def test_find_requires_every_token_and_sees_new_entries():
+    index = MemoryIndex.build({"knowledge": KNOWLEDGE})
+    assert index.find("ГАРМОНИИ баланс") == [KNOWLEDGE[0]]
+    assert index.find("нет такого") == []
+    index.add("knowledge", "Новый баланс")
+    assert index.find("баланс") == [KNOWLEDGE[0], "Новый баланс"]
+
+
+def test_history_between_handles_out_of_order_timestamps():
+    history = [{"timestamp": t, "data": t} for t in
+               ("2024-01-03T00:00", "2024-01-01T00:00", "2024-01-02T00:00", "2024-01-05T00:00")]
+    index = MemoryIndex.build({"history": history})
+    assert [e["data"] for e in index.history_between("2024-01-02", "2024-01-04")] == \
+        ["2024-01-02T00:00", "2024-01-03T00:00"]
+    assert len(index.history_between()) == 4
+    assert index.search("2024-01-05", section="history", k=1)[0][1] == history[3]
+
+
+def test_trigrams_pad_short_words():
+    assert trigrams(["ab"]) == {" ab", "ab "}
@@ -0,0 +1,73 @@
+import os
+
+import pytest
+
+from protonovea_memory import ProtonoveaMemory
+
+
+@pytest.fixture(params=["json", "journal"])
+def memory(request, tmp_path):
+    memory = ProtonoveaMemory(request.param, memory_file=str(tmp_path / "memory.json"))
+    yield memory
+    memory.close()
+
+
+def test_store_and_search(memory):
+    memory.store_knowledge("Вектор гармонии настраивается через баланс потоков")
+    memory.store_knowledge("Резонанс громады")
+    assert memory.find("гармонии") == ["Вектор гармонии настраивается через баланс потоков"]
+    memory.store_knowledge("Гармония смысла")
+    assert memory.search("гармония", k=5)[0][1] == "Гармония смысла"
+
+
+def test_journal_survives_reopen(tmp_path):
+    path = str(tmp_path / "memory.json")
+    memory = ProtonoveaMemory("journal", memory_file=path)
+    for i in range(50):
+        memory.store_knowledge(f"знание {i}")
+    memory.store_history("запрос")
+    memory.close()
+
+    reopened = ProtonoveaMemory("journal", memory_file=path)
+    assert reopened.memory["knowledge"] == [f"знание {i}" for i in range(50)]
+    assert reopened.memory["history"][0]["data"] == "запрос"
+    reopened.close()
+
+
+def test_torn_journal_tail_is_dropped(tmp_path):
+    path = str(tmp_path / "memory.json")
+    memory = ProtonoveaMemory("journal", memory_file=path)
+    memory.store_knowledge("целая запись")
+    memory.close()
+    with open(memory.journal.journal_path, "ab") as file:
+        file.write(b'{"seq": 2, "op": "knowl')
+
+    reopened = ProtonoveaMemory("journal", memory_file=path)
+    assert reopened.memory["knowledge"] == ["целая запись"]
+    reopened.close()
+
+
+def test_failed_append_is_not_indexed(tmp_path):
+    memory = ProtonoveaMemory("journal", memory_file=str(tmp_path / "memory.json"))
+    memory.store_knowledge("сохранённое знание")
+    assert memory.find("знание") == ["сохранённое знание"]
+    memory.close()
+    with pytest.raises(ValueError):
+        memory.store_knowledge("потерянное знание")
+    assert memory.find("знание") == ["сохранённое знание"]
+    assert memory.memory["knowledge"] == ["сохранённое знание"]
+
+
+def test_failed_save_is_not_indexed(tmp_path, monkeypatch):
+    memory = ProtonoveaMemory("json", memory_file=str(tmp_path / "memory.json"))
+    memory.store_knowledge("сохранённое знание")
+    assert memory.find("знание") == ["сохранённое знание"]
+
+    def full_disk():
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(memory, "save_memory", full_disk)
+    with pytest.raises(OSError):
+        memory.store_knowledge("несохранённое знание")
+    assert memory.find("знание") == ["сохранённое знание"]
+    assert os.path.exists(memory.memory_file)
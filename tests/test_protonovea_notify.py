@@ -0,0 +1,152 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from protonovea_core import Protonovea
+from protonovea_notify import TelegramDispatcher, TokenBucket, format_digest
+from tests.stub_telegram import StubTelegramServer
+
+
+def dispatch(server, scenario, **options):
+    options = {"rate": 100.0, "burst": 10, "digest_window": 0.05, "backoff_base": 0.01, **options}
+    dispatcher = TelegramDispatcher(server.url, "@chat", **options)
+
+    async def run():
+        async with dispatcher:
+            await scenario(dispatcher)
+
+    try:
+        asyncio.run(run())
+    finally:
+        dispatcher.close()
+    return dispatcher
+
+
+def test_access_events_are_coalesced_into_one_digest():
+    async def scenario(dispatcher):
+        for i in range(5):
+            dispatcher.record_access("request_access", f"user{i % 2}", "ok")
+
+    with StubTelegramServer() as server:
+        dispatcher = dispatch(server, scenario)
+    assert server.requests == 1
+    text = server.messages[0]["text"]
+    assert "5 событий" in text and "user0 ×3" in text
+    assert dispatcher.stats()["sent"] == 1
+
+
+def test_digest_max_flushes_early():
+    async def scenario(dispatcher):
+        for i in range(7):
+            dispatcher.record_access("secure_response", "u", str(i))
+
+    with StubTelegramServer() as server:
+        dispatch(server, scenario, digest_max=3, digest_window=10)
+    assert [m["text"].splitlines()[0] for m in server.messages] == [
+        "🔐 Сводка доступа: 3 событий", "🔐 Сводка доступа: 3 событий", "🔐 Сводка доступа: 1 событий"]
+
+
+def test_429_waits_for_retry_after():
+    async def scenario(dispatcher):
+        dispatcher.notify("hello")
+
+    with StubTelegramServer(script=[429], retry_after=0.2) as server:
+        started = time.monotonic()
+        dispatcher = dispatch(server, scenario, rate=1000.0, burst=1)
+        elapsed = time.monotonic() - started
+    assert [m["text"] for m in server.messages] == ["hello"]
+    assert dispatcher.deliveries[-1].attempts == 2 and dispatcher.retries == 1
+    assert elapsed >= 0.2
+
+
+def test_5xx_is_retried_with_backoff_then_gives_up():
+    async def scenario(dispatcher):
+        dispatcher.notify("first")
+        dispatcher.notify("second")
+
+    with StubTelegramServer(script=[500, 503, 502, 500, 500]) as server:
+        dispatcher = dispatch(server, scenario, max_retries=2)
+    first, second = dispatcher.deliveries
+    assert (first.ok, first.attempts) == (False, 3) and "HTTP 502" in first.error
+    assert (second.ok, second.attempts) == (True, 3)
+    assert dispatcher.stats()["failed"] == 1 and dispatcher.retries == 4
+
+
+def test_4xx_is_not_retried():
+    async def scenario(dispatcher):
+        dispatcher.notify("bad")
+
+    with StubTelegramServer(script=[400]) as server:
+        dispatcher = dispatch(server, scenario)
+    assert server.requests == 1 and dispatcher.failed == 1
+
+
+def test_queue_overflow_is_counted_as_dropped():
+    async def scenario(dispatcher):
+        accepted = [dispatcher.notify(str(i)) for i in range(5)]
+        assert accepted == [True, True, False, False, False]
+
+    with StubTelegramServer() as server:
+        dispatcher = dispatch(server, scenario, queue_size=2)
+    assert dispatcher.dropped == 3 and len(server.messages) == 2
+
+
+def test_notify_from_another_thread():
+    results = []
+
+    async def scenario(dispatcher):
+        thread = threading.Thread(target=lambda: results.append(dispatcher.notify("from thread")))
+        thread.start()
+        thread.join()
+        await asyncio.sleep(0.05)
+
+    with StubTelegramServer() as server:
+        dispatch(server, scenario)
+    assert [m["text"] for m in server.messages] == ["from thread"]
+    assert results == [None]                              # из другого потока исход неизвестен
+
+
+def test_delivery_history_is_bounded():
+    async def scenario(dispatcher):
+        for i in range(5):
+            dispatcher.notify(str(i))
+
+    with StubTelegramServer() as server:
+        dispatcher = dispatch(server, scenario, history=2)
+    assert [d.text for d in dispatcher.deliveries] == ["3", "4"]
+    assert dispatcher.sent == 5
+
+
+def test_core_counts_events_for_a_stopped_dispatcher_as_dropped():
+    dispatcher = TelegramDispatcher("http://127.0.0.1:9/", "@chat")
+    core = Protonovea(notifier=dispatcher)
+    assert core.request_access("Андрей", "тест").startswith("✅")
+    assert dispatcher.dropped == 1
+    assert dispatcher.notify("direct") is False and dispatcher.dropped == 2
+    dispatcher.close()
+
+
+def test_events_after_stop_are_dropped():
+    async def scenario(dispatcher):
+        assert dispatcher.record_access("request_access", "u", "ok") is True
+
+    with StubTelegramServer() as server:
+        dispatcher = dispatch(server, scenario)
+    assert dispatcher.record_access("request_access", "u", "late") is False
+    assert dispatcher.dropped == 1 and len(server.messages) == 1
+
+
+def test_token_bucket_pause():
+    now = [0.0]
+    bucket = TokenBucket(rate=2, capacity=1, clock=lambda: now[0])
+    assert bucket.delay() == 0
+    bucket.pause(1.0)
+    assert bucket.delay() == pytest.approx(1.0)
+
+
+def test_format_digest_lists_every_event():
+    text = format_digest(["a\tu1\tx", "b\tu1\t", "a\tu2\ty"])
+    assert text.splitlines()[1] == "a: 2, b: 1"
+    assert text.splitlines()[-2:] == ["• u1 [b]", "• u2 [a] y"]
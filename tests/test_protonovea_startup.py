@@ -0,0 +1,8 @@
+import sys
+
+import bench_startup
+
+
+def test_core_startup_does_not_load_heavy_modules():
+    sample = bench_startup.run_child(sys.executable)
+    assert sample["loaded"] == []
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from svet_shell import DEFICIT, HARMONY, MESSAGES, OVERLOAD, SVET
+
+
+def scalar_states(svet, readings):
+    states = []
+    for value in readings:
+        svet.balance(value)
+        states.append(svet.state)
+    return states
+
+
+READINGS = [100, 125, 118, 110, 70, 85, float("nan"), 95, 121, float("nan"), 119, 100]
+
+
+@pytest.mark.parametrize("margin", [0.0, 5.0, 20.0])
+def test_batch_matches_scalar_path(margin):
+    expected = scalar_states(SVET(margin=margin), READINGS)
+    states, _ = SVET(margin=margin).balance_batch(READINGS)
+    assert states.tolist() == expected
+
+
+def test_nan_keeps_previous_state():
+    svet = SVET()
+    svet.balance(130)
+    assert svet.balance(float("nan")) == MESSAGES[OVERLOAD]
+    assert SVET().classify([50, np.nan, np.nan]).tolist() == [DEFICIT, DEFICIT, DEFICIT]
+
+
+def test_hysteresis_holds_state_near_thresholds():
+    assert SVET(margin=5).classify([125, 117, 114, 78, 83, 86]).tolist() == \
+        [OVERLOAD, OVERLOAD, HARMONY, DEFICIT, DEFICIT, HARMONY]
+    with pytest.raises(ValueError):
+        SVET(margin=30)
+
+
+def test_transitions_and_counts():
+    svet = SVET()
+    _, events = svet.balance_batch([100, 130, 130, 60], timestamps=[0, 1, 2, 3])
+    assert [(e.index, e.timestamp, e.previous, e.state) for e in events] == [
+        (1, 1.0, "harmony", "overload"), (3, 3.0, "overload", "deficit")]
+    assert svet.stats() == {"state": "deficit", "readings": 4, "deficit": 1, "harmony": 1, "overload": 2}
+
+
+def test_stream_continues_state_across_chunks():
+    svet = SVET()
+    clock = iter([1000.0, 1001.0])
+    events = list(svet.balance_stream([[100, 130], [130, 100]], rate=10, clock=lambda: next(clock)))
+    assert [(e.index, e.state) for e in events] == [(1, "overload"), (3, "harmony")]
+    assert events[1].timestamp == pytest.approx(1000.3)